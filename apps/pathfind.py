@@ -16,6 +16,7 @@ import pynt.input.commandline
 import pynt.xmlns
 import pynt.algorithm
 import pynt.algorithm.output
+import pynt.algorithm.batch
 import pynt.output.dot
 
 # Helper script to create a network with the GLIF example pynt.
@@ -193,7 +194,7 @@ def getAlgorithmClassByName(name=None):
     if matches == None:
         logger.error("%s is not a valid module name. Revert to default algorithm %s" % (modulename, algClass.__name__))
     if matches.group(1):
-        modulename = matches.group(1)
+        modulename = matches.group(1)[:-1]  # strip the trailing dot
     name = matches.group(3)
     try:
         algmod = pyclbr.readmodule(modulename)
@@ -265,10 +266,37 @@ def GetOptions(argv=None):
                       help="Write output in consecutive files")
     parser.add_option("-s", "--step", dest="stepsize", action="store",type="int", default=1, 
                       help="The stepsize for the consecutive output files (default=1)")
+    parser.add_option("-b", "--batch", dest="batchfile", action="store", metavar="FILE", default=None,
+                      help="Solve all path requests in FILE (- for stdin), and write the results as JSON lines")
+    parser.add_option("--batch-output", dest="batchoutput", action="store", metavar="FILE", default=None,
+                      help="File to write the batch results to (default: stdout)")
+    parser.add_option("-p", "--processes", dest="processes", action="store", type="int", default=None,
+                      help="Number of worker processes for batch requests (default: number of CPUs)")
     (options, args) = parser.parse_args(args=argv[1:])
     options.verbosity -= options.quietness
     return (options, args)
 
+def RunBatch(options):
+    """Solve all requests in the batch file on the loaded network. The algorithm given on the 
+    command line is the default for requests which do not specify one."""
+    algorithmclass = getAlgorithmClassByName(options.algorithm)
+    defaults = {"algorithm": "%s.%s" % (algorithmclass.__module__, algorithmclass.__name__)}
+    if options.batchfile == "-":
+        infile = sys.stdin
+    else:
+        infile = open(options.batchfile)
+    if options.batchoutput == None:
+        outfile = sys.stdout
+    else:
+        outfile = open(options.batchoutput, "w")
+    try:
+        pynt.algorithm.batch.RunBatch(infile, outfile, options.processes, defaults)
+    finally:
+        if infile is not sys.stdin:
+            infile.close()
+        if outfile is not sys.stdout:
+            outfile.close()
+
 def Main(argv=None):
     (options, args) = GetOptions(argv)
     
@@ -296,6 +324,10 @@ def Main(argv=None):
     # Now, verbosity may be increased
     pynt.logger.SetLogLevel(options.verbosity)
     
+    if options.batchfile != None:
+        RunBatch(options)
+        return
+    
     # Instantiate algorithm
     algorithmclass = getAlgorithmClassByName(options.algorithm)
     logger.log(25, "Using %s to find a path from %s to %s" % (algorithmclass.__name__, pfdemo.sourcecp.getURIdentifier(), pfdemo.destinationcp.getURIdentifier()))
@@ -8,12 +8,18 @@ in the first place. They are not designed for speed."""
 import logging
 import sys
 import time
+import heapq
 
 # local modules
 import pynt.elements
 import pynt.layers
 import pynt.paths
 import pynt.algorithm.output
+import pynt.algorithm.frontier
+import pynt.algorithm.states
+import pynt.algorithm.neighbours
+import pynt.algorithm.resultcache
+import pynt.algorithm.reachability
 
 
 
@@ -36,7 +42,8 @@ class InvalidPath(Exception):
 class BaseAlgorithm(object):
     """Algorithm for path finding and path walking. This is an implementation of a bread first 
     search algorithm, very much geared towards networks. In particular, """
-    outerleaves     = None
+    outerleaves     = None  # Frontier with the paths that are not yet examined
+    tiebreaklast    = True  # on equal metric, examine the last added leaf first (False: the first added leaf)
     progressPrinters = None
     # tree = None
     kshortestpath   = 1     # return first solution only
@@ -47,13 +54,62 @@ class BaseAlgorithm(object):
     solution        = None  # algorithm-specific, for example a Path or list of Path objects
     _runalgorithm   = False # True if algorithm was run
     progressfunc    = None  # Callback function, called for each step as progressfunc(count, path, leaves, note)
+    cacheneighbours = True  # cache the result of getNextCCpList() per (cp, direction). Disable if it depends on prevcp.
+    neighbourcache  = None  # NeighbourCache; shared by all instances of the class without custom metrics
+    astar           = False # A* search: examine leaves in order of metric plus a lower bound of the remaining metric
+    lowerbounds     = None  # dict of cp: lower bound of the metric from cp to the destination (only used for A*)
+    resultcache     = None  # ResultCache for the solutions of findShortestPath(); set on a class to share it between instances
+    timelimit       = None  # stop the search after this many seconds (None: no limit)
+    expansionlimit  = None  # stop the search after examining this many paths (None: no limit)
+    budgetinterval  = 16    # check the time limit once every this many examined paths
+    deadline        = None  # time at which the search is stopped (set when the search starts)
+    fallback        = None  # search to continue with if a budget ran out before all solutions were found: None, "greedy" or "beam"
+    beamwidth       = 4     # number of paths kept per step by the beam fallback search
+    fallbacklimit   = 1000  # maximum number of paths examined by the fallback search
+    status          = None  # "complete" if the search was completed, "timeout" or "expansionlimit" if it was stopped, "beam" if leaves were spilled
+    beamsize        = None  # beam search: keep at most this many outer leaves per band in memory (None: keep all leaves)
+    beamband        = None  # width of the metric bands of the beam search (None: one band per number of hops)
+    spilldirectory  = None  # directory for the outer leaves spilled by the beam search (None: system default)
+    resuming        = False # True while a spilled leaf is rebuilt (and its hops are validated again)
+    reachability    = None  # ReachabilityMap, if the search runs from the source to all connection points
+    reachabletargets = None # set of connection points after which the one-to-many search may stop (None: all)
     def __init__(self):
-        self.outerleaves = []
+        self.outerleaves = self.createFrontier()
         # self.tree = []
         self.custommetrics = {}
         self.solution    = []
         self.setPrinter(pynt.algorithm.output.defaultProgressPrinter())
     
+    def createFrontier(self):
+        """Return a new, empty, Frontier to store the outer leaves of the search tree."""
+        if self.astar:
+            key = self.getEstimatedMetric
+        else:
+            key = None
+        if self.beamsize:
+            return pynt.algorithm.frontier.BeamFrontier(self, self.beamsize, self.beamband, self.spilldirectory, 
+                    lastmatch=self.tiebreaklast, key=key)
+        return pynt.algorithm.frontier.Frontier(lastmatch=self.tiebreaklast, key=key)
+    
+    def setBeam(self, beamsize=100, beamband=None, spilldirectory=None):
+        """Use a beam search: keep at most beamsize outer leaves in memory per number of hops,
+        or, if beamband is set, per metric band of that width. Other leaves are spilled to a 
+        temporary file in spilldirectory, and resumed when no leaves are left in memory. 
+        Use beamsize=None to keep all leaves in memory. Since spilled leaves are resumed late, the 
+        solutions are not guaranteed to be the shortest; if leaves were spilled, the status is set
+        to "beam". Must be called before the algorithm is run."""
+        assert(len(self.outerleaves) == 0)
+        self.beamsize = beamsize
+        self.beamband = beamband
+        self.spilldirectory = spilldirectory
+        self.outerleaves = self.createFrontier()
+    
+    def setAStar(self, astar=True):
+        """Use A* search instead of uniform cost search. Must be called before the algorithm is run."""
+        assert(len(self.outerleaves) == 0)
+        self.astar = bool(astar)
+        self.outerleaves = self.createFrontier()
+    
     def setPrinter(self, output):
         assert(isinstance(output, pynt.algorithm.output.ProgressPrinter))
         self.progressPrinters = [output]
@@ -76,6 +132,10 @@ class BaseAlgorithm(object):
         if startcp.getLayer() != endcp.getLayer():
             logger.error("Layers of end points %s and %s do not match: %s and %s" % (startcp, endcp, startcp.getLayer(), endcp.getLayer()))
     
+    def setSource(self, startcp):
+        """Set the source only, for findReachable()"""
+        self.sourcecp = startcp
+    
     def setConstraints(self, metriclimit=40.0):
         self.metriclimit = metriclimit
     
@@ -86,6 +146,7 @@ class BaseAlgorithm(object):
         """Changes the metric of a specific connectionClass (and its children)"""
         assert(issubclass(connectionClass, pynt.paths.Connection))
         self.custommetrics[connectionClass] = float(metric)
+        self.neighbourcache = None  # the cached connections have the old metric
     
     def getCustomMetric(self, connectionClass):
         pass
@@ -108,29 +169,226 @@ class BaseAlgorithm(object):
     
     def findShortestPath(self):
         if not self._runalgorithm:
-            starthop = self.createHop(self.sourcecp, pynt.paths.StartingPoint(), pynt.paths.Path())
-            self.outerleaves.append(starthop.getPath())
-            self.breadthfirstsearch()
+            if self.resultcache == None:
+                self.runAlgorithm()
+            else:
+                key = self.getResultCacheKey()
+                solution = self.resultcache.get(key)
+                if solution == None:
+                    self.runAlgorithm()
+                    if self.isComplete():
+                        self.resultcache.add(key, list(self.solution), self.getSolutionElements())
+                else:
+                    self.solution = list(solution)
+                    self.status = "complete"
             self._runalgorithm = True
         return self.solution
     
+    def runAlgorithm(self):
+        """Search the solutions, and store them in self.solution"""
+        if self.astar:
+            self.lowerbounds = self.getLowerBounds()
+        starthop = self.createHop(self.sourcecp, pynt.paths.StartingPoint(), pynt.paths.Path())
+        self.outerleaves.append(starthop.getPath())
+        self.breadthfirstsearch()
+        if (not self.isComplete()) and self.fallback and (len(self.solution) < self.kshortestpath):
+            self.fallbackSearch()
+        if self.beamsize:
+            # spilled leaves are resumed out of metric order
+            self.solution.sort(key=pynt.algorithm.frontier.pathMetric)
+            self.closeBeam()
+    
+    def closeBeam(self):
+        """Remove the spilled leaves of a beam search. If leaves were spilled, the solutions may
+        not be the shortest, and the status of a completed search is set to "beam"."""
+        if self.outerleaves.getSpilledTotal() and self.isComplete():
+            self.status = "beam"
+        self.outerleaves.close()
+    
+    def findReachable(self, targets=None):
+        """Search from the source to all connection points, instead of to the destination.
+        Returns a ReachabilityMap with the first valid arrival (with an empty stack) at each
+        connection point, and thus its metric and predecessor. If targets are given, the search
+        stops once all of them are reached; otherwise it stops at the metric limit, the budget, 
+        or when no leaves are left. Can not be combined with A* search, since the lower bounds 
+        are those to the destination."""
+        if self.astar:
+            raise ValueError("findReachable() can not be used with A* search")
+        self.reachability = pynt.algorithm.reachability.ReachabilityMap(self.sourcecp)
+        if targets == None:
+            self.reachabletargets = None
+        else:
+            self.reachabletargets = set(targets)
+        starthop = self.createHop(self.sourcecp, pynt.paths.StartingPoint(), pynt.paths.Path())
+        self.outerleaves.append(starthop.getPath())
+        self.breadthfirstsearch()
+        if self.beamsize:
+            self.closeBeam()
+        self._runalgorithm = True
+        return self.reachability
+    
+    def getReachability(self):
+        return self.reachability
+    
+    def setBudget(self, timelimit=None, expansionlimit=None, fallback=None):
+        """Limit the search to timelimit seconds and expansionlimit examined paths. If a budget 
+        runs out, the search returns the solutions found so far, and sets the status to "timeout"
+        or "expansionlimit". If not enough solutions were found, the fallback ("greedy" or "beam") 
+        search continues from the remaining leaves. Solutions of an incomplete search are not 
+        guaranteed to be the shortest."""
+        if fallback not in (None, "greedy", "beam"):
+            raise ValueError("Unknown fallback search %r; use None, 'greedy' or 'beam'" % (fallback))
+        self.timelimit = timelimit
+        self.expansionlimit = expansionlimit
+        self.fallback = fallback
+    
+    def getStatus(self):
+        return self.status
+    
+    def isComplete(self):
+        """Return True if the search was not stopped by a budget, and no leaves of a beam
+        search were spilled (so the solutions are the shortest)."""
+        return self.status == "complete"
+    
+    def startBudget(self):
+        """Start the clock for the time limit. Returns the number of examined paths after which
+        the budget must be checked (see budgetExhausted())."""
+        self.status = "complete"
+        if self.timelimit != None:
+            self.deadline = time.time() + self.timelimit
+        else:
+            self.deadline = None
+        return self.getNextBudgetCheck(0)
+    
+    def getNextBudgetCheck(self, count):
+        """Return the number of examined paths at which the budget must be checked again.
+        The clock is only read once every budgetinterval paths, to keep the overhead low."""
+        nextcheck = sys.maxint
+        if self.deadline != None:
+            nextcheck = count + self.budgetinterval
+        if self.expansionlimit != None:
+            nextcheck = min(nextcheck, self.expansionlimit)
+        return nextcheck
+    
+    def budgetExhausted(self, count):
+        """Return True, and set the status, if the time or expansion budget ran out after 
+        count examined paths."""
+        logger = logging.getLogger("pynt.algorithm")
+        if (self.expansionlimit != None) and (count >= self.expansionlimit):
+            self.status = "expansionlimit"
+        elif (self.deadline != None) and (time.time() >= self.deadline):
+            self.status = "timeout"
+        else:
+            return False
+        logger.warning("Search stopped after %d iterations (%s); %d paths found" % (count, self.status, len(self.solution)))
+        return True
+    
+    def fallbackSearch(self):
+        """Continue an incomplete search from the remaining outer leaves, to find at least some 
+        solutions. The greedy search follows the path closest to the destination (by the lower 
+        bound of the remaining metric, see getLowerBounds()); the beam search keeps the beamwidth 
+        paths with the smallest estimated metric at each step. Dead ends continue with the next 
+        best leaves. At most fallbacklimit paths are examined."""
+        logger = logging.getLogger("pynt.algorithm")
+        if self.lowerbounds == None:
+            self.lowerbounds = self.getLowerBounds()
+        lowerbounds = self.lowerbounds
+        if self.fallback == "beam":
+            width = self.beamwidth
+            def key(path):
+                return (self.getEstimatedMetric(path), path.getMetric())
+        else:
+            width = 1
+            def key(path):
+                return (lowerbounds[path.getLastHop().getConnectionPoint()], path.getMetric())
+        # Only leaves from which the destination can be reached
+        leaves = [path for path in self.outerleaves if path.getLastHop().getConnectionPoint() in lowerbounds]
+        leaves.sort(key=key)
+        found = len(self.solution)
+        count = 0
+        beam = []
+        while (count < self.fallbacklimit) and (len(self.solution) < self.kshortestpath):
+            if not beam:
+                # start (again) with the next best leaves
+                beam = leaves[:width]
+                leaves = leaves[width:]
+                if not beam:
+                    break
+            newbeam = []
+            for path in beam:
+                if self.isSolution(path):
+                    # a leaf of the stopped search may already be a solution
+                    if path not in self.solution:
+                        self.solution.append(path)
+                    continue
+                count += 1
+                for newpath in self.getValidExtendedPaths(path):
+                    if newpath.getMetric() > self.metriclimit:
+                        continue
+                    if self.isSolution(newpath):
+                        if newpath not in self.solution:
+                            self.solution.append(newpath)
+                    else:
+                        newbeam.append(newpath)
+            newbeam.sort(key=key)
+            beam = newbeam[:width]
+        self.solution.sort(key=pynt.algorithm.frontier.pathMetric)
+        logger.log(25, "%s fallback search found %d paths after %d iterations" % (self.fallback, len(self.solution) - found, count))
+    
+    def setResultCache(self, resultcache):
+        """Use the given ResultCache (or None to disable caching) for findShortestPath()"""
+        self.resultcache = resultcache
+    
+    def getResultCacheKey(self):
+        """Return the key for the result cache: the algorithm class, the URIs of the endpoints,
+        the constraints and the beam parameters."""
+        custommetrics = self.custommetrics.items()
+        custommetrics.sort()
+        return (self.__class__, self.sourcecp.getURIdentifier(), self.destinationcp.getURIdentifier(),
+                self.kshortestpath, self.metriclimit, self.astar, tuple(custommetrics),
+                self.beamsize, self.beamband)
+    
+    def getSolutionElements(self):
+        """Return a list of the network elements the solution paths depend on: the connection 
+        points and their devices, and the switch matrices, adaptation functions and broadcast
+        segments of the connections between them."""
+        elements = []
+        for path in self.solution:
+            for hop in path:
+                cp = hop.getConnectionPoint()
+                elements.append(cp)
+                if cp.getDevice() != None:
+                    elements.append(cp.getDevice())
+                connection = hop.getPreviousConnection()
+                for attribute in ("switchmatrix", "adaptationfunction", "segment"):
+                    element = getattr(connection, attribute, None)
+                    if element != None:
+                        elements.append(element)
+        return elements
+    
     def breadthfirstsearch(self):
         logger = logging.getLogger("pynt.algorithm")
         logger.log(25, "Starting breadth first search algorithm")
         c = 0
+        nextbudgetcheck = self.startBudget()
         self.printProgressHeader()
         while True:
             note = ""
             if len(self.outerleaves) == 0:
                 logger.warning("No more leaves to parse after %d iterations; %d paths found" % (c,len(self.solution)))
                 break
-            # walk all outerleaves, finding the one with the smallest metric
+            # get the outer leaf with the smallest metric
             logger.debug("Find smallest metric of %d outer leaves" % len(self.outerleaves))
             smallmetricpath  = self.getSmallestMetricLeaf()
+            if self.beyondBeamLimit(smallmetricpath):
+                continue
             logger.debug("Examining path %s" % smallmetricpath)
             # if this is the destination hop, and the stack is empty:
             #   store in solution.
-            if smallmetricpath.getLastHop().getConnectionPoint() == self.destinationcp:
+            if self.reachability != None:
+                # one-to-many search: record the first arrival at each connection point
+                self.reachability.add(smallmetricpath)
+            elif smallmetricpath.getLastHop().getConnectionPoint() == self.destinationcp:
                 stack = smallmetricpath.getStack()
                 if stack.isempty():
                     # we reached our goal!
@@ -140,7 +398,7 @@ class BaseAlgorithm(object):
                     logger.warning("Reached end-node %s with non-empty stack %s. Continuing." % (self.destinationcp, stack))
             # stop algorithm if len (solution) > k. we're done, and have success.
             #   (give warning if it is the destination, but stack is not empty)
-            if self.stopAlgorithm(smallmetricpath.getMetric()):
+            if self.stopAlgorithm(self.getEstimatedMetric(smallmetricpath)):
                 break
             # else:
             # call getValidNextHopList for the hop with smallest metric
@@ -158,6 +416,10 @@ class BaseAlgorithm(object):
                 if len(newpaths) > 1:
                     note += " (branching)"        
                 self.printProgress(c, smallmetricpath, note)
+                if c >= nextbudgetcheck:
+                    if self.budgetExhausted(c):
+                        break
+                    nextbudgetcheck = self.getNextBudgetCheck(c)
         self.printProgressFooter()
     
     def printProgressHeader(self):
@@ -191,6 +453,9 @@ class BaseAlgorithm(object):
         ##self.getequalmetricsolutions = False  # get all solutions of the same metric
         if len(self.solution) >= self.kshortestpath:
             return True
+        if (self.reachabletargets != None) and self.reachability.containsAll(self.reachabletargets):
+            logger.log(25, "Reached all %d targets; %d connection points reachable" % (len(self.reachabletargets), len(self.reachability)))
+            return True
         #if getequallengthsolution:
         #    return # not written
         if currentmetric > self.metriclimit:
@@ -198,18 +463,71 @@ class BaseAlgorithm(object):
             return True
         return False
     
+    def beyondBeamLimit(self, path):
+        """Return True, and remove the leaf, if a beam search reached a leaf beyond the metric 
+        limit while other leaves are still spilled. The beam only keeps the best leaves per band,
+        so the spilled leaves may be shorter than the leaves in memory."""
+        if (not self.beamsize) or (not self.outerleaves.getSpillCount()):
+            return False
+        if self.getEstimatedMetric(path) <= self.metriclimit:
+            return False
+        self.outerleaves.remove(path)
+        return True
+    
+    def getEstimatedMetric(self, path):
+        """Return the metric of the path. For A* search, add the lower bound of the remaining 
+        metric to the destination. Since that lower bound is never too high, no solution can 
+        have a lower metric than this estimate."""
+        if self.lowerbounds == None:
+            return path.getMetric()
+        return path.getMetric() + self.lowerbounds.get(path.getLastHop().getConnectionPoint(), 0.0)
+    
+    def getLowerBounds(self):
+        """Return a dict with for each connection point a lower bound of the metric to the 
+        destination. This is calculated with a reverse Dijkstra over all connections found 
+        by getNextCCpList() in any direction, ignoring labels and adaptation stacks. Since 
+        these connections are a superset of the connections used by the search, the bound 
+        is never higher than the actual metric. Connection points which can't reach the 
+        destination are not in the dict."""
+        logger = logging.getLogger("pynt.algorithm")
+        reverseconnections = self.getReverseConnections()
+        # reverse Dijkstra, starting at the destination
+        lowerbounds = {}
+        count = 0  # tie breaker, so that the connection points themselves are never compared
+        heap = [(0.0, count, self.destinationcp)]
+        while len(heap) > 0:
+            (metric, c, cp) = heapq.heappop(heap)
+            if cp in lowerbounds:
+                continue
+            lowerbounds[cp] = metric
+            for (connection, prevcp) in reverseconnections.get(cp, []):
+                if prevcp not in lowerbounds:
+                    count += 1
+                    heapq.heappush(heap, (metric + connection.getMetric(), count, prevcp))
+        logger.debug("Calculated lower bounds for %d of %d connection points" % (len(lowerbounds), len(reverseconnections)))
+        return lowerbounds
+    
+    def getReverseConnections(self):
+        """Return a dict with for each connection point, reachable from the source, a list of 
+        (connection, previous connection point) tuples of all connections towards it. 
+        The connections are found by getNextCCpList() in any direction."""
+        alldirections = [pynt.paths.directionInternal, pynt.paths.directionExternal]
+        reverseconnections = {self.sourcecp: []}
+        todo = [self.sourcecp]
+        while len(todo) > 0:
+            cp = todo.pop()
+            for (connection, nextcp) in self.getCachedNextCCpList(cp, None, alldirections):
+                if nextcp not in reverseconnections:
+                    reverseconnections[nextcp] = []
+                    todo.append(nextcp)
+                reverseconnections[nextcp].append((connection, cp))
+        return reverseconnections
+    
     def getSmallestMetricLeaf(self):
-        """return the leaf with the smallest metric"""
-        if len(self.outerleaves) == 0:
-            return None
-        smallestleaf  = self.outerleaves[0]
-        smallestmetric = self.outerleaves[0].getMetric()  # get a starting value
-        for leaf in self.outerleaves:  # leaves is a list of Paths
-            if leaf.getMetric() <= smallestmetric:  # < gives first match, <= gives last match
-                # we want last match, since that looks most like previous one (looks better in path finding vizualisation)
-                smallestleaf  = leaf
-                smallestmetric = leaf.getMetric()
-        return smallestleaf
+        """return the leaf with the smallest metric. On equal metric, the frontier returns the 
+        last match (see tiebreaklast), since that looks most like previous one (looks better 
+        in path finding vizualisation)"""
+        return self.outerleaves.peek()
     
     def getValidExtendedPaths(self, path):
         """Returns a list of possible paths, one distance longer then the given Path, 
@@ -225,14 +543,16 @@ class BaseAlgorithm(object):
         else:
             prevcp = None
         alloweddirections = self.getAllowedNextDirections(path)
-        nextccps = self.getNextCCpList(curcp, prevcp, alloweddirections)
+        nextccps = self.getCachedNextCCpList(curcp, prevcp, alloweddirections)
+        if self.lowerbounds != None:
+            # A* search: skip connection points from which the destination can't be reached
+            nextccps = [(connection, nextcp) for (connection, nextcp) in nextccps if nextcp in self.lowerbounds]
         nexthops = []
         validpaths = []
         if len(nextccps) > 1:
-            # we will branch the tree. Make sure each branch uses it's own values by smart-copying the path
+            # we will branch the tree. Each branch shares the hops of the path so far; 
+            # createHop() gives each new hop it's own stack (see createHop())
             logger.info("Branching path %s in %d branches" % (path, len(nextccps)))
-            # Note: copying a path is a time-consuming operation, and should be avoided if possible.
-            path = path.copy()
         for (nextconnection, nextcp) in nextccps:
             nexthop = None
             try:
@@ -252,6 +572,26 @@ class BaseAlgorithm(object):
     def getAllowedNextDirections(self, path):
         return path.getLastHop().getPreviousConnection().nextdirection
     
+    def getNeighbourCache(self):
+        if self.neighbourcache == None:
+            if self.custommetrics:
+                self.neighbourcache = pynt.algorithm.neighbours.NeighbourCache()
+            else:
+                self.neighbourcache = pynt.algorithm.neighbours.GetClassCache(self.__class__)
+        return self.neighbourcache
+    
+    def getCachedNextCCpList(self, cp, prevcp=None, direction=[pynt.paths.directionInternal, pynt.paths.directionExternal]):
+        """Return getNextCCpList(cp, prevcp, direction), using the neighbour cache if cacheneighbours is set.
+        The cached value is only used if the topology did not change in the mean time."""
+        if not self.cacheneighbours:
+            return self.getNextCCpList(cp, prevcp, direction)
+        cache = self.getNeighbourCache()
+        ccplist = cache.get(cp, direction)
+        if ccplist == None:
+            ccplist = self.getNextCCpList(cp, prevcp, direction)
+            cache.set(cp, direction, ccplist)
+        return ccplist
+    
     def getNextCCpList(self, cp, prevcp=None, direction=[pynt.paths.directionInternal, pynt.paths.directionExternal]):
         """Return a list of possible (connection, connection point) (c+cp), one distance from the given connection point.
         The only filter we have is a custom direction object, which is typically a list, but is algorithm-specific.
@@ -456,9 +796,9 @@ class BaseAlgorithm(object):
         #assert isinstance(connection, pynt.paths.SwitchMatrixConnection)
         #switchmatrix = connection.switchmatrix
         #print "Processing %s / %s:\n  %s" % (switchmatrix, cp, stack)
-        for i in range(0,len(path)-2): # loop from first to one-but-last connection point.
-            if path[i].getConnectionPoint() == lastcp:
-                visitedstack = path[i].getStack()
+        for hop in path.getHops()[:-2]: # loop from first to one-but-last connection point.
+            if hop.getConnectionPoint() == lastcp:
+                visitedstack = hop.getStack()
                 if stack.issubset(visitedstack): # we already visited this cp before with same stack
                     return True
         return False
@@ -474,11 +814,12 @@ class BaseAlgorithm(object):
         lastcp = lasthop.getConnectionPoint()
         prevcp = path[-2].getConnectionPoint()
         # fill hops with hops with the same connection point at the last connection point
+        pathhops = path.getHops()
         hops = [lasthop]
-        for i in range(1,len(path)-1):
-            if path[i].getConnectionPoint() == lastcp:
-                if prevcp not in [path[i-1].getConnectionPoint(), path[i+1].getConnectionPoint()]: # different next/previous hop: it is a merge
-                    hops.append(path[i])
+        for i in range(1,len(pathhops)-1):
+            if pathhops[i].getConnectionPoint() == lastcp:
+                if prevcp not in [pathhops[i-1].getConnectionPoint(), pathhops[i+1].getConnectionPoint()]: # different next/previous hop: it is a merge
+                    hops.append(pathhops[i])
                     ismerge = True
         if ismerge:
             # First connectionpoint after merge of two channels
@@ -518,23 +859,22 @@ class BaseAlgorithm(object):
         return True
     def createHop(self, nextcp, nextconnection, path):
         """Return a hop object, given the path, next connection and next connection point.
-        Note that the hop will contain pointers to all previous . If you branch the path,
-        you must make a copy of the path (in particular of all LayerProperties in the stacks 
-        of each hop in the path), before handing it to this function. See Path.copy()"""
+        Note that the hop will contain pointers to all previous hops, which are shared with 
+        other branches. The stack is copy-on-write: the new hop always gets it's own copy of 
+        the stack, but the LayerProperties in it are shared with previous hops. Always call 
+        stack.duplicateLowestLayer() before modifying a LayerProperty."""
         assert(isinstance(nextcp, pynt.elements.ConnectionPoint))
         assert(isinstance(nextconnection, pynt.paths.Connection))
         assert(isinstance(path, pynt.paths.Path))
         logger = logging.getLogger("pynt.algorithm")
-        stack  = path.getStack()
+        stack  = pynt.paths.Stack(path.getStack()[:])  # make a copy of the stack (but not of the layer properties)
         logger.debug("Creating Hop of (%s) %s %s" % (nextconnection.getDescription(), type(nextcp).__name__, nextcp.getURIdentifier()))
-        if isinstance(nextconnection, pynt.paths.AdaptationConnection):      # increase the stack (always create a copy!)
+        if isinstance(nextconnection, pynt.paths.AdaptationConnection):      # increase the stack
             stackelt = self.getLayerProperty(nextconnection, nextcp)
-            stack = pynt.paths.Stack(stack[:])  # make a copy of the stack.
             stack.append(stackelt)
             # print ("Interface %s: " % nextcp), stack.getLowestLayer().LabelsToStr()
         elif isinstance(nextconnection, pynt.paths.DeAdaptationConnection):    # decrease the stack
             try:
-                stack = pynt.paths.Stack(stack[:])  # make a copy of the stack.
                 stackelt = stack.pop()
             except IndexError:
                 raise InvalidPath("Can not de-adapt; stack is empty")
@@ -709,6 +1049,31 @@ class PFAdaptation(PathFind):
 
 class PFAvailable(PathFind):
     """Path find, taking topology, adaptation, and available labels into account."""
+    dominancepruning = False  # prune paths with a state dominated by an earlier expanded state
+    expandedstates  = None  # StateTable with the expanded states, if dominancepruning is set
+    def setDominancePruning(self, dominancepruning=True):
+        """Skip paths which end in a state (connection point, stack and labels) which is 
+        dominated by an earlier expanded state with equal or lower metric. See pynt.algorithm.states."""
+        self.dominancepruning = bool(dominancepruning)
+    def getResultCacheKey(self):
+        return PathFind.getResultCacheKey(self) + (self.dominancepruning,)
+    def getValidExtendedPaths(self, path):
+        if not self.dominancepruning:
+            return PathFind.getValidExtendedPaths(self, path)
+        logger = logging.getLogger("pynt.algorithm")
+        if self.expandedstates == None:
+            self.expandedstates = pynt.algorithm.states.StateTable()
+        if self.expandedstates.isDominated(path):
+            logger.info("Terminate path %s: state is dominated by an earlier expanded path" % (path))
+            return []
+        self.expandedstates.add(path)
+        validpaths = []
+        for newpath in PathFind.getValidExtendedPaths(self, path):
+            if self.expandedstates.isDominated(newpath):
+                logger.info("Terminate path %s: state is dominated by an earlier expanded path" % (newpath))
+            else:
+                validpaths.append(newpath)
+        return validpaths
     def getNextCCpList(self, cp, prevcp=None, direction=[pynt.paths.directionInternal, pynt.paths.directionExternal]):
         """Return a list of possible (connection, connection point) (c+cp), one distance from the given connection point.
         The only filter we have is a custom direction object, which is typically a list, but is algorithm-specific.
@@ -796,14 +1161,10 @@ class PFAvailable(PathFind):
                     #    newlabels = labelsofar
                     logging.debug("Label switching at %s: %s (%s) & %s (%s) = %s" % (switchmatrix.getName(), labelsofar, prevhop.getConnectionPoint(), curcplabels, lastcp, newlabels))
                     # print "Label switching at %s: %s (%s) & %s (%s) = %s" % (switchmatrix.getName(), labelsofar, prevhop.getConnectionPoint(), curcplabels, lastcp, newlabels)
+                    # Copy the current layer property, so that we don't overwrite the labels 
+                    # of previous interfaces. (the stack is already copied by createHop())
+                    curlayerproperties = stack.duplicateLowestLayer()
                     if newlabels != labelsofar:
-                        # Copy the stack, and the current layer property, so that we don't overwrite 
-                        # the labels of prevoious interfaces.
-                        hop.duplicateStack()
-                        stack = hop.getStack()
-                        stack.duplicateLowestLayer()
-                        curlayerproperties = stack.getLowestLayer()
-                        # Now we can change the labels.
                         # TODO: this is wrong. If the switch has external labels, those need to be set too, to the intersection of the curent and new value.
                         curlayerproperties.setInternalLabelSet(newlabels)
                 if newlabels.isempty():
@@ -822,6 +1183,7 @@ class PFAvailable(PathFind):
                     return False
                 # TODO: This overwrites earlier labels. That is not good if swapping is possible.
                 if newlabels != labelsofar:
+                    curlayerproperties = stack.duplicateLowestLayer()
                     curlayerproperties.setInternalLabelSet(newlabels)
         elif isinstance(connection, pynt.paths.ConnectedToConnection):
             # TODO: For linkTo: use ingress/egress labels
@@ -835,10 +1197,17 @@ class PFAvailable(PathFind):
                     raise InvalidPath("Incompatible Label sets %s and %s" % (labelsofar, curcplabels))
                 # TODO: This overwrites earlier labels. That is not good if swapping is possible.
                 if newlabels != labelsofar:
+                    curlayerproperties = stack.duplicateLowestLayer()
                     curlayerproperties.setEgressLabelSet(newlabels)
         logger.debug("Path is valid: %s: no irregularities found" % (path))
         return True
     
+class PFAStar(PFAvailable):
+    """Path find, like PFAvailable, but using A* search: leaves are examined in order of their 
+    metric plus a lower bound of the remaining metric to the destination."""
+    astar = True
+
+
 
 # TODO: move PathWalk to own module
 
@@ -849,17 +1218,21 @@ class PathWalk(BaseAlgorithm):
         print "Try  Hops  Metric Outerleaves in tree"
         print "---- ----- ------ -------------------------------------------------------"
         c = 0
+        nextbudgetcheck = self.startBudget()
         while True:
             note = ""
             if len(self.outerleaves) == 0:
                 logger.warning("No more leaves to parse; %d paths found" % len(self.solution))
                 return False # return without a solution
-            # walk all outerleaves, finding the one with the smallest metric
+            # get the outer leaf with the smallest metric
             logger.debug("Find smallest metric of %d outer leaves" % len(self.outerleaves))
             smallmetricpath  = self.getSmallestMetricLeaf()
+            if self.beyondBeamLimit(smallmetricpath):
+                continue
             logger.info("Examining path %s" % smallmetricpath)
             if smallmetricpath.getMetric() > self.metriclimit:
                 logger.warning("Reached metric limit %.2f; %d paths found" % (self.metriclimit, len(self.solution)))
+                return False
             else:
                 newpaths = self.getValidExtendedPaths(smallmetricpath)
                 for newpath in newpaths:
@@ -873,6 +1246,10 @@ class PathWalk(BaseAlgorithm):
                 if len(newpaths) > 1:
                     note += " (branching)"
                 print "%4d %4d %6.2f %d %s %s" % (c, len(smallmetricpath), smallmetricpath.getMetric(), len(self.outerleaves), len(self.outerleaves)*'.', note)
+                if c >= nextbudgetcheck:
+                    if self.budgetExhausted(c):
+                        return False
+                    nextbudgetcheck = self.getNextBudgetCheck(c)
 
     def getNextCCpList(self, cp, prevcp=None, direction=[pynt.paths.directionInternal, pynt.paths.directionExternal]):
         """Return a list of possible (connection, connection point) (c+cp), one distance from the given connection point.
@@ -915,7 +1292,10 @@ class PFShortestPathOnce(PFTest):
         """Checks if a path goes through an switch matrix that has been used before
         *in this or any other path* with the same stack and the same or a subset of available labels 
         as the first time (if the link did not work the first try, it won't work now)
+        A resumed beam search leaf was recorded when it was first validated, so it is not checked.
         """
+        if self.resuming:
+            return False
         lasthop = path.getLastHop()
         cp = lasthop.getConnectionPoint()
         stack = path.getStack()
@@ -942,6 +1322,9 @@ class PFExplicitDirection(PFTest):
 class PFNoLoopback(PFTest):
     # WARNING: this algorithm may return false negatives.
     # loopbacks are OK for potential interfaces at switchmatrices with label switching capability
+    # we want FIRST match, and handle it in a FIFO queue: first finish earliest branches, before continuing on deeper branches
+    tiebreaklast = False
+    cacheneighbours = False  # getNextCCpList() depends on prevcp
     def getNextCCpList(self, cp, prevcp=None, direction=[pynt.paths.directionInternal, pynt.paths.directionExternal]):
         # remove directional checks
         ccplist = PFAvailable.getNextCCpList(self, cp)
@@ -950,22 +1333,12 @@ class PFNoLoopback(PFTest):
             if (nextcp == prevcp) and (not isinstance(nextconn, pynt.paths.SwitchMatrixConnection)):
                 ccplist.remove(ccp)
         return ccplist
-    def getSmallestMetricLeaf(self):
-        """return the leaf with the smallest metric"""
-        if len(self.outerleaves) == 0:
-            return None
-        smallestleaf  = self.outerleaves[0]
-        smallestmetric = self.outerleaves[0].getMetric()  # get a starting value
-        for leaf in self.outerleaves:  # leaves is a list of Paths
-            if leaf.getMetric() < smallestmetric:  # < gives first match, <= gives last match
-                # we want FIRST match, and handle it in a FIFO queue: first finish earliest branches, before continuing on deeper branches
-                smallestleaf  = leaf
-                smallestmetric = leaf.getMetric()
-        return smallestleaf
     def visitedMatrixBefore(self, path):
         return False
 
 class PFUnrestrictedFlooding(PFTest):
+    # we want FIRST match, and handle it in a FIFO queue: first finish earliest branches, before continuing on deeper branches
+    tiebreaklast = False
     def getNextCCpList(self, cp, prevcp=None, direction=[pynt.paths.directionInternal, pynt.paths.directionExternal]):
         # remove directional checks
         return PFAvailable.getNextCCpList(self, cp, prevcp=None)
@@ -974,18 +1347,6 @@ class PFUnrestrictedFlooding(PFTest):
         This routine checks if the last interface is already used.
         """
         return True
-    def getSmallestMetricLeaf(self):
-        """return the leaf with the smallest metric"""
-        if len(self.outerleaves) == 0:
-            return None
-        smallestleaf  = self.outerleaves[0]
-        smallestmetric = self.outerleaves[0].getMetric()  # get a starting value
-        for leaf in self.outerleaves:  # leaves is a list of Paths
-            if leaf.getMetric() < smallestmetric:  # < gives first match, <= gives last match
-                # we want FIRST match, and handle it in a FIFO queue: first finish earliest branches, before continuing on deeper branches
-                smallestleaf  = leaf
-                smallestmetric = leaf.getMetric()
-        return smallestleaf
     def visitedMatrixBefore(self, path):
         return False
 
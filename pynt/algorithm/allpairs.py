@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""All-pairs shortest paths over the graph of interfaces, switch matrices, devices and
+broadcast segments, as walked by the Dijkstra algorithm, and with the same metric: the metric
+of a connection is the sum of the metrics of both nodes (see Dijkstra._getMetric()).
+
+The graph is taken from a TopologySnapshot and compiled into a sparse (CSR) matrix, and the
+distance and predecessor matrices are computed with scipy.sparse.csgraph, in one call instead
+of one Dijkstra search per pair. Since the matrices grow with the square of the number of
+nodes, the rows can be limited to a list of source nodes (for example the devices).
+
+A ShortestPathMatrix can be saved to a .npz file, and loaded again without recomputing. The
+nodes are stored by URI, and are looked up in the loaded network when a path is returned.
+Note that a loaded matrix is not updated if the topology changes."""
+
+# standard modules
+import logging
+
+# other modules
+try:
+    import numpy
+    import scipy.sparse
+    import scipy.sparse.csgraph
+except ImportError:
+    raise ImportError("Modules numpy and scipy are not available. They can be downloaded from http://www.scipy.org/\n")
+
+# local modules
+import pynt.xmlns
+import pynt.algorithm.snapshot
+
+
+def GetGraphMatrix(snapshot):
+    """Return the connections of a TopologySnapshot as a sparse (CSR) matrix of metrics.
+    The rows and columns are the node IDs of the snapshot."""
+    size = len(snapshot)
+    metrics = numpy.array(snapshot.metrics, dtype=numpy.float64)
+    rows = []
+    columns = []
+    for connectiontype in snapshot.connectiontypes:
+        offsets = numpy.array(snapshot.offsets[connectiontype], dtype=numpy.int64)
+        rows.append(numpy.repeat(numpy.arange(size, dtype=numpy.int64), numpy.diff(offsets)))
+        columns.append(numpy.array(snapshot.targets[connectiontype], dtype=numpy.int64))
+    rows = numpy.concatenate(rows)
+    columns = numpy.concatenate(columns)
+    # a connection may be listed more than once (e.g. as connected and as member); a COO
+    # matrix would add the metrics of duplicate entries, so remove them first
+    (keys, first) = numpy.unique(rows * size + columns, return_index=True)
+    rows = rows[first]
+    columns = columns[first]
+    return scipy.sparse.csr_matrix((metrics[rows] + metrics[columns], (rows, columns)), shape=(size, size))
+
+
+def ComputeAllPairs(subjects=None, sources=None, snapshot=None):
+    """Return a ShortestPathMatrix with the shortest paths from each source (by default all
+    nodes) to all nodes. The graph is taken from snapshot, or else from a new TopologySnapshot
+    limited to the subjects."""
+    logger = logging.getLogger("pynt.algorithm")
+    if snapshot == None:
+        snapshot = pynt.algorithm.snapshot.TopologySnapshot(subjects)
+    graph = GetGraphMatrix(snapshot)
+    if sources == None:
+        sourceids = numpy.arange(len(snapshot), dtype=numpy.int64)
+    else:
+        sourceids = numpy.array([snapshot.getNodeId(source) for source in sources if source in snapshot], dtype=numpy.int64)
+    (distances, predecessors) = scipy.sparse.csgraph.dijkstra(graph, directed=True, indices=sourceids, return_predecessors=True)
+    logger.debug("Computed shortest paths from %d sources to %d nodes" % (len(sourceids), len(snapshot)))
+    uris = [node.getURIdentifier() for node in snapshot.nodes]
+    return ShortestPathMatrix(uris, sourceids, distances, predecessors, nodes=snapshot.nodes)
+
+
+def LoadAllPairs(filename):
+    """Return the ShortestPathMatrix saved in a .npz file (see ShortestPathMatrix.save())."""
+    data = numpy.load(filename)
+    return ShortestPathMatrix(list(data["uris"]), data["sources"], data["distances"], data["predecessors"])
+
+
+class ShortestPathMatrix(object):
+    """Distance and predecessor matrices, with a row per source and a column per node."""
+    uris            = None  # list of node ID: URI
+    ids             = None  # dict of URI: node ID
+    nodes           = None  # list of node ID: RDF object, or None if not yet looked up
+    sources         = None  # array of row: node ID
+    rows            = None  # dict of node ID: row
+    distances       = None  # 2D array of row, node ID: metric (inf if not reachable)
+    predecessors    = None  # 2D array of row, node ID: previous node ID (negative for the source or if not reachable)
+    def __init__(self, uris, sources, distances, predecessors, nodes=None):
+        self.uris = uris
+        self.ids = {}
+        for (nodeid, uri) in enumerate(uris):
+            self.ids[uri] = nodeid
+        if nodes == None:
+            nodes = len(uris) * [None]
+        self.nodes = list(nodes)
+        self.sources = sources
+        self.rows = {}
+        for (row, nodeid) in enumerate(sources):
+            self.rows[int(nodeid)] = row
+        self.distances = distances
+        self.predecessors = predecessors
+
+    def save(self, filename):
+        """Save the matrices to a (compressed) .npz file."""
+        numpy.savez_compressed(filename, uris=numpy.array(self.uris), sources=self.sources,
+                distances=self.distances, predecessors=self.predecessors)
+
+    def getNodeId(self, node):
+        """Return the node ID of an RDF object, or None if it is not in the matrix."""
+        return self.ids.get(node.getURIdentifier())
+
+    def getNode(self, nodeid):
+        """Return the RDF object of a node ID."""
+        node = self.nodes[nodeid]
+        if node == None:
+            (namespace, identifier) = pynt.xmlns.splitURI(self.uris[nodeid])
+            node = pynt.xmlns.GetRDFObject(identifier, namespace)
+            self.nodes[nodeid] = node
+        return node
+
+    def getIds(self, source, target):
+        """Return (row, node ID) for a source and target, or (None, None) if either is unknown
+        or source is not one of the sources."""
+        sourceid = self.getNodeId(source)
+        targetid = self.getNodeId(target)
+        if (sourceid == None) or (targetid == None) or (sourceid not in self.rows):
+            return (None, None)
+        return (self.rows[sourceid], targetid)
+
+    def getDistance(self, source, target):
+        """Return the metric of the shortest path from source to target, or None."""
+        (row, targetid) = self.getIds(source, target)
+        if row == None:
+            return None
+        distance = self.distances[row, targetid]
+        if numpy.isinf(distance):
+            return None
+        return float(distance)
+
+    def getPath(self, source, target):
+        """Return the shortest path from source to target as a list of RDF objects, or None."""
+        (row, targetid) = self.getIds(source, target)
+        if (row == None) or numpy.isinf(self.distances[row, targetid]):
+            return None
+        predecessors = self.predecessors[row]
+        path = []
+        nodeid = targetid
+        while nodeid >= 0:
+            path.append(self.getNode(nodeid))
+            nodeid = predecessors[nodeid]
+        path.reverse()
+        return path
+
+    def getDistances(self, source):
+        """Return a dict of reachable RDF object: metric from source."""
+        sourceid = self.getNodeId(source)
+        if sourceid not in self.rows:
+            return {}
+        distances = {}
+        row = self.distances[self.rows[sourceid]]
+        for nodeid in numpy.flatnonzero(numpy.isfinite(row)):
+            distances[self.getNode(nodeid)] = float(row[nodeid])
+        return distances
+
+    def __len__(self):
+        return len(self.uris)
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""Bandwidth-aware routing on a TopologySnapshot: the widest (maximum bottleneck) path, and
+the path with the fewest hops that can carry a given bandwidth.
+
+The usable capacity of a node is the largest bandwidth that can be reserved on it, taking
+into account the available capacity, the maximum and minimum reservable capacity and the
+granularity (see getUsableCapacity()). A node without any capacity information (like a device
+or switch matrix) does not limit the bandwidth. The capacity of a connection is the smallest
+usable capacity of both nodes. These are computed once, in arrays parallel to the CSR arrays
+of the snapshot, so the searches only compare numbers.
+
+Call updateCapacities() after reservations, to recompute the capacities without compiling a
+new snapshot. isCurrent() returns False after any change of the network elements, including
+changes in available capacity."""
+
+# standard modules
+import array
+import collections
+import heapq
+import math
+
+# local modules
+import pynt.elements
+import pynt.algorithm.snapshot
+
+
+unlimited = float("inf")
+
+
+def getUsableCapacity(node):
+    """Return the largest bandwidth that can be reserved on a node. The available capacity
+    (or else the capacity) is limited by the maximum reservable capacity, and rounded down to
+    a multiple of the granularity. If this is smaller than the minimum reservable capacity,
+    nothing can be reserved. Returns unlimited if the node has no capacity information."""
+    capacity = None
+    if hasattr(node, "getAvailableCapacity"):
+        capacity = node.getAvailableCapacity()
+    if (capacity == None) and hasattr(node, "getCapacity"):
+        capacity = node.getCapacity()
+    if hasattr(node, "getMaximumReservableCapacity") and (node.getMaximumReservableCapacity() != None):
+        if capacity == None:
+            capacity = node.getMaximumReservableCapacity()
+        else:
+            capacity = min(capacity, node.getMaximumReservableCapacity())
+    if capacity == None:
+        return unlimited
+    if hasattr(node, "getGranularity") and node.getGranularity():
+        granularity = node.getGranularity()
+        capacity = math.floor(capacity / granularity + 1e-9) * granularity
+    if hasattr(node, "getMinimumReservableCapacity") and (node.getMinimumReservableCapacity() != None):
+        if capacity < node.getMinimumReservableCapacity():
+            return 0.0
+    return capacity
+
+
+class BandwidthRouter(object):
+    """Widest path and minimum hop routing within a bandwidth, on a TopologySnapshot."""
+    snapshot        = None  # the TopologySnapshot
+    nodecapacities  = None  # array of node ID: usable capacity
+    edgecapacities  = None  # dict of connection type: array of capacities, parallel to the targets of the snapshot
+    changecount     = None  # pynt.elements.changecounter at the time the capacities were computed
+    def __init__(self, snapshot=None, subjects=None):
+        if snapshot == None:
+            snapshot = pynt.algorithm.snapshot.TopologySnapshot(subjects)
+        self.snapshot = snapshot
+        self.updateCapacities()
+
+    def updateCapacities(self):
+        """(Re)compute the usable capacity of all nodes and connections of the snapshot."""
+        snapshot = self.snapshot
+        self.changecount = pynt.elements.changecounter
+        self.nodecapacities = array.array('d', [getUsableCapacity(node) for node in snapshot.nodes])
+        nodecapacities = self.nodecapacities
+        self.edgecapacities = {}
+        for connectiontype in snapshot.connectiontypes:
+            offsets = snapshot.offsets[connectiontype]
+            targets = snapshot.targets[connectiontype]
+            capacities = array.array('d')
+            for v1 in xrange(len(snapshot.nodes)):
+                for i in xrange(offsets[v1], offsets[v1+1]):
+                    capacities.append(min(nodecapacities[v1], nodecapacities[targets[i]]))
+            self.edgecapacities[connectiontype] = capacities
+
+    def isCurrent(self):
+        """Return True if no network element changed since the capacities were computed, and
+        the topology did not change since the snapshot was taken."""
+        return self.snapshot.isTopologyCurrent() and (self.changecount == pynt.elements.changecounter)
+
+    def getAdjacency(self):
+        """Return a list of (offsets, targets, capacities) arrays per connection type."""
+        snapshot = self.snapshot
+        return [(snapshot.offsets[connectiontype], snapshot.targets[connectiontype], self.edgecapacities[connectiontype])
+                for connectiontype in snapshot.connectiontypes]
+
+    def getPath(self, predecessors, targetid):
+        path = []
+        while targetid >= 0:
+            path.append(self.snapshot.nodes[targetid])
+            targetid = predecessors[targetid]
+        path.reverse()
+        return path
+
+    def findWidestPath(self, source, target):
+        """Return (bandwidth, path): the path from source to target with the largest bottleneck
+        capacity, and that capacity. On equal bandwidth, the path with the fewest hops is
+        returned. Returns (0.0, None) if the target can not be reached."""
+        sourceid = self.snapshot.getNodeId(source)
+        targetid = self.snapshot.getNodeId(target)
+        if (sourceid == None) or (targetid == None):
+            return (0.0, None)
+        adjacency = self.getAdjacency()
+        widths = {sourceid: self.nodecapacities[sourceid]}
+        hops = {sourceid: 0}
+        predecessors = {sourceid: -1}
+        # max heap of bandwidth (min heap of -bandwidth), then min hops
+        q = [(-widths[sourceid], 0, sourceid)]
+        visited = set()
+        while q:
+            (width, hopcount, v1) = heapq.heappop(q)
+            if v1 in visited:
+                continue
+            visited.add(v1)
+            if v1 == targetid:
+                break
+            width = -width
+            for (offsets, targets, capacities) in adjacency:
+                for i in xrange(offsets[v1], offsets[v1+1]):
+                    v2 = targets[i]
+                    if v2 in visited:
+                        continue
+                    w = min(width, capacities[i])
+                    if w <= 0.0:
+                        continue
+                    if (v2 not in widths) or (w > widths[v2]) or ((w == widths[v2]) and (hopcount + 1 < hops[v2])):
+                        widths[v2] = w
+                        hops[v2] = hopcount + 1
+                        predecessors[v2] = v1
+                        heapq.heappush(q, (-w, hopcount + 1, v2))
+        if targetid not in visited:
+            return (0.0, None)
+        return (widths[targetid], self.getPath(predecessors, targetid))
+
+    def findMinimumHopPath(self, source, target, bandwidth):
+        """Return the path from source to target with the fewest hops of which each connection
+        can carry bandwidth, or None if there is no such path. This is a breadth first search
+        over the connections with enough capacity."""
+        sourceid = self.snapshot.getNodeId(source)
+        targetid = self.snapshot.getNodeId(target)
+        if (sourceid == None) or (targetid == None):
+            return None
+        if self.nodecapacities[sourceid] < bandwidth:
+            return None
+        adjacency = self.getAdjacency()
+        predecessors = {sourceid: -1}
+        q = collections.deque([sourceid])
+        while q:
+            v1 = q.popleft()
+            if v1 == targetid:
+                return self.getPath(predecessors, targetid)
+            for (offsets, targets, capacities) in adjacency:
+                for i in xrange(offsets[v1], offsets[v1+1]):
+                    v2 = targets[i]
+                    if (v2 in predecessors) or (capacities[i] < bandwidth):
+                        continue
+                    predecessors[v2] = v1
+                    q.append(v2)
+        return None
+
+    def getPathBandwidth(self, path):
+        """Return the bottleneck capacity of a path (a list of RDF objects in the snapshot)."""
+        width = unlimited
+        for node in path:
+            nodeid = self.snapshot.getNodeId(node)
+            if nodeid == None:
+                return 0.0
+            width = min(width, self.nodecapacities[nodeid])
+        return width
+
+    def admits(self, path, bandwidth):
+        """Return True if bandwidth can be reserved on each node of the path (admission control)."""
+        return self.getPathBandwidth(path) >= bandwidth
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""Batch path finding: solve many (source, destination, constraints) requests on a topology
+which is loaded only once.
+
+Requests are read from a file with one request per line, either as a JSON object:
+    {"id": "r1", "source": URI, "destination": URI, "algorithm": "PFAvailable", "bandwidth": 10}
+or as whitespace separated values:
+    SOURCEURI DESTINATIONURI [name=value ...]
+Supported constraints are algorithm, kshortestpath, metriclimit, bandwidth (only for the
+Dijkstra algorithms), timelimit, expansionlimit and fallback (not for the Dijkstra algorithms;
+see BaseAlgorithm.setBudget()) and id. Empty lines and lines starting with # are skipped.
+
+The requests are distributed over a multiprocessing pool. The worker processes are forked after
+the topology is loaded, so they share the network elements of the parent process, and do not
+have to parse the topology again. Results are written as soon as they are available, as JSON
+lines, in the order of the requests."""
+
+# standard modules
+import sys
+import time
+import logging
+import itertools
+try:
+    import json
+except ImportError:
+    import simplejson as json  # python 2.5 or older
+try:
+    import multiprocessing
+except ImportError:
+    multiprocessing = None  # python 2.5 or older: requests are solved one by one
+
+# local modules
+import pynt.xmlns
+import pynt.algorithm
+import pynt.algorithm.output
+import pynt.algorithm.dijkstra
+
+
+def GetAlgorithmClass(name):
+    """Return the algorithm class with the given name. The name is a class in pynt.algorithm
+    (e.g. "PFAvailable") or a full dotted name (e.g. "pynt.algorithm.dijkstra.Dijkstra")."""
+    if isinstance(name, type):
+        return name
+    if "." in name:
+        (modulename, classname) = name.rsplit(".", 1)
+    else:
+        (modulename, classname) = ("pynt.algorithm", name)
+    # the from list of __import__ must contain str, not unicode (as read from JSON)
+    module = __import__(str(modulename), globals(), locals(), [str(classname)])
+    klass = getattr(module, classname, None)
+    if not (isinstance(klass, type) and issubclass(klass, pynt.algorithm.BaseAlgorithm)):
+        raise ValueError("%s is not a valid algorithm class" % (name))
+    return klass
+
+
+def GetConnectionPoint(uri):
+    """Return the network element with the given URI"""
+    (namespace, identifier) = pynt.xmlns.splitURI(uri)
+    return pynt.xmlns.GetRDFObject(identifier, namespace=namespace)
+
+
+def ParseRequest(line, defaults=None):
+    """Parse a request line. Returns a dict, or None for empty and comment lines."""
+    line = line.strip()
+    if (not line) or line.startswith("#"):
+        return None
+    request = {}
+    if defaults:
+        request.update(defaults)
+    if line.startswith("{"):
+        for (name, value) in json.loads(line).items():
+            if isinstance(value, unicode):
+                value = value.encode("utf-8")
+            request[str(name)] = value
+    else:
+        fields = line.split()
+        if len(fields) < 2:
+            raise ValueError("Request %r must contain a source and destination" % (line))
+        request["source"] = fields[0]
+        request["destination"] = fields[1]
+        for field in fields[2:]:
+            (name, value) = field.split("=", 1)
+            request[name] = value
+    for name in ("source", "destination"):
+        if name not in request:
+            raise ValueError("Request %r has no %s" % (line, name))
+    return request
+
+
+def ReadRequests(infile, defaults=None):
+    """Return an iterator of request dicts read from a file object."""
+    count = 0
+    for line in infile:
+        request = ParseRequest(line, defaults)
+        if request != None:
+            count += 1
+            request.setdefault("id", count)
+            yield request
+
+
+def SolveRequest(request):
+    """Solve a single request. Returns a result dict with the id, source, destination,
+    algorithm, status ("ok", "nopath" or "error"), the paths found (each with a metric
+    and a list of hop URIs), and the time in seconds. If the search was stopped by a time or
+    expansion limit, search is set to "timeout" or "expansionlimit"."""
+    logger = logging.getLogger("pynt.algorithm")
+    starttime = time.time()
+    result = {"id": request.get("id"), "source": request["source"], "destination": request["destination"]}
+    try:
+        algorithmclass = GetAlgorithmClass(request.get("algorithm", "PFAvailable"))
+        result["algorithm"] = algorithmclass.__name__
+        sourcecp = GetConnectionPoint(request["source"])
+        destinationcp = GetConnectionPoint(request["destination"])
+        paths = []
+        if issubclass(algorithmclass, pynt.algorithm.dijkstra.Dijkstra):
+            algorithm = algorithmclass(outfile=None)
+            algorithm.setEndpoints(sourcecp, destinationcp)
+            bandwidth = request.get("bandwidth")
+            if bandwidth != None:
+                bandwidth = float(bandwidth)
+            k = int(request.get("kshortestpath", 1))
+            if k > 1:
+                solutions = algorithm.findKShortestPaths(k, bandwidth=bandwidth)
+            else:
+                solutions = [algorithm.findShortestPath(bandwidth=bandwidth)]
+            for solution in solutions:
+                if solution:
+                    paths.append({"metric": algorithm.getPathMetric(solution, bandwidth),
+                            "hops": [cp.getURIdentifier() for cp in solution]})
+        else:
+            algorithm = algorithmclass()
+            algorithm.setPrinter(pynt.algorithm.output.NoPrinter())
+            algorithm.setEndpoints(sourcecp, destinationcp)
+            if "kshortestpath" in request:
+                algorithm.kshortestpath = int(request["kshortestpath"])
+            if "metriclimit" in request:
+                algorithm.setMetricLimit(float(request["metriclimit"]))
+            timelimit = request.get("timelimit")
+            if timelimit != None:
+                timelimit = float(timelimit)
+            expansionlimit = request.get("expansionlimit")
+            if expansionlimit != None:
+                expansionlimit = int(expansionlimit)
+            algorithm.setBudget(timelimit, expansionlimit, request.get("fallback"))
+            for solution in algorithm.findShortestPath():
+                paths.append({"metric": solution.getMetric(),
+                        "hops": [hop.getConnectionPoint().getURIdentifier() for hop in solution]})
+            if not algorithm.isComplete():
+                result["search"] = algorithm.getStatus()
+        result["paths"] = paths
+        if paths:
+            result["status"] = "ok"
+        else:
+            result["status"] = "nopath"
+    except Exception, e:
+        logger.warning("Request %s failed: %s" % (request.get("id"), e))
+        result["status"] = "error"
+        result["error"] = "%s: %s" % (e.__class__.__name__, e)
+    result["time"] = time.time() - starttime
+    return result
+
+
+def SolveRequests(requests, processes=None, chunksize=1):
+    """Return an iterator of results (see SolveRequest) for an iterable of requests, in the
+    same order. The requests are solved in a pool of worker processes, forked from this
+    process; processes=None uses the number of CPUs, processes=1 solves all requests in
+    this process. Results are returned as soon as they are available."""
+    if (multiprocessing == None) or (processes == 1):
+        return itertools.imap(SolveRequest, requests)
+    pool = multiprocessing.Pool(processes)
+    results = pool.imap(SolveRequest, requests, chunksize)
+    # No more requests are added; the workers stop once all requests are solved.
+    pool.close()
+    return results
+
+
+def RunBatch(infile, outfile=sys.stdout, processes=None, defaults=None):
+    """Read requests from infile, and write the results as JSON lines to outfile.
+    The topology must be loaded before calling this function. Returns the number of requests."""
+    logger = logging.getLogger("pynt.algorithm")
+    starttime = time.time()
+    count = 0
+    for result in SolveRequests(ReadRequests(infile, defaults), processes):
+        outfile.write(json.dumps(result, sort_keys=True) + "\n")
+        outfile.flush()
+        count += 1
+    logger.log(25, "Solved %d path finding requests in %.2f seconds" % (count, time.time() - starttime))
+    return count
@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+"""Bidirectional path finding. The search runs forward from the source (exactly like
+PFAvailable) and backward from the destination, and joins both halves where they meet.
+
+The backward search walks the connections in reverse: a forward DeAdaptation pushes a layer
+on the (backward) stack, and a forward Adaptation pops it. The backward search only keeps
+track of the layers and adaptation functions in the stack; labels and loops are not checked.
+It thus finds a superset of all path ends. When a forward path and a backward path end at the
+same connection point with the same stack layout, the forward path is extended along the
+backward path with the regular createHop() and IsValidPath() checks, so each solution is a
+valid PFAvailable path.
+
+The search stops when the smallest forward metric plus the smallest backward metric exceeds
+the metric of the k-th solution. Each half of the search then only explores paths up to
+(about) half the metric of the solution."""
+
+# standard modules
+import logging
+
+# local modules
+import pynt.paths
+import pynt.algorithm
+import pynt.algorithm.frontier
+
+
+def directionList(direction):
+    if isinstance(direction, pynt.paths.Direction):
+        return [direction]
+    return direction
+
+
+class ReversePath(object):
+    """The end of a path, as found by the backward search. It points to the ReversePath one
+    step closer to the destination."""
+    cp              = None  # The connection point
+    nextconnection  = None  # The (forward) connection from this cp to the next cp, or None at the destination
+    nextpath        = None  # The ReversePath, starting at the next cp, or None at the destination
+    stack           = None  # tuple of (layer, adaptation function), with the layout of the stack at cp
+    metric          = 0.0   # The total metric from this cp to the destination
+    length          = 1     # The number of connection points, including cp and the destination
+    def __init__(self, cp, stack, nextconnection=None, nextpath=None):
+        self.cp             = cp
+        self.stack          = stack
+        self.nextconnection = nextconnection
+        self.nextpath       = nextpath
+        if nextpath != None:
+            self.metric     = nextpath.metric + nextconnection.getMetric()
+            self.length     = nextpath.length + 1
+    def getMetric(self):
+        return self.metric
+    def getConnectionPoint(self):
+        return self.cp
+    def __len__(self):
+        return self.length
+    def __str__(self):
+        cps = []
+        path = self
+        while path != None:
+            cps.append(path.cp.getName())
+            path = path.nextpath
+        return "<ReversePath %s metric=%0.2f>" % (cps, self.metric)
+
+
+def stackLayout(stack):
+    """Return the layout of a Stack, as a tuple of (layer, adaptation function)."""
+    layout = []
+    for layerprop in stack:
+        layout.append((layerprop.getLayer(), layerprop.adaptationfunction))
+    return tuple(layout)
+
+
+class PFBidirectional(pynt.algorithm.PFAvailable):
+    """Path find, like PFAvailable, using a bidirectional search."""
+    reverseleaves       = None  # Frontier with the ReversePaths that are not yet examined
+    reverseconnections  = None  # dict of cp: list of (connection, previous cp)
+    forwardexamined     = None  # dict of cp: list of examined (forward) Paths ending at cp
+    reverseexamined     = None  # dict of cp: list of examined ReversePaths starting at cp
+    candidates          = None  # dict of path signature: Path, with all solutions found so far
+    def __init__(self):
+        pynt.algorithm.PFAvailable.__init__(self)
+        self.reverseleaves  = pynt.algorithm.frontier.Frontier(lastmatch=self.tiebreaklast)
+        self.forwardexamined = {}
+        self.reverseexamined = {}
+        self.candidates      = {}
+
+    def setAStar(self, astar=True):
+        if astar:
+            raise NotImplementedError("%s does not support A* search" % (self.__class__.__name__))
+
+    def runAlgorithm(self):
+        self.reverseconnections = self.getReverseConnections()
+        starthop = self.createHop(self.sourcecp, pynt.paths.StartingPoint(), pynt.paths.Path())
+        self.outerleaves.append(starthop.getPath())
+        if self.destinationcp in self.reverseconnections:
+            stack = ((self.destinationcp.getLayer(), None),)
+            self.reverseleaves.append(ReversePath(self.destinationcp, stack))
+        self.breadthfirstsearch()
+        if (not self.isComplete()) and self.fallback and (len(self.solution) < self.kshortestpath):
+            self.fallbackSearch()
+
+    def breadthfirstsearch(self):
+        logger = logging.getLogger("pynt.algorithm")
+        logger.log(25, "Starting bidirectional search algorithm")
+        c = 0
+        nextbudgetcheck = self.startBudget()
+        self.printProgressHeader()
+        while True:
+            path = self.outerleaves.peek()
+            reversepath = self.reverseleaves.peek()
+            if (path == None) or (reversepath == None):
+                logger.info("No more leaves to parse after %d iterations; %d paths found" % (c,len(self.candidates)))
+                break
+            # Any solution which is not found yet has at least this metric
+            if self.stopAlgorithm(path.getMetric() + reversepath.getMetric()):
+                break
+            c += 1
+            if path.getMetric() <= reversepath.getMetric():
+                note = self.examineForwardPath(path)
+                self.printProgress(c, path, note)
+            else:
+                self.examineReversePath(reversepath)
+            if c >= nextbudgetcheck:
+                if self.budgetExhausted(c):
+                    break
+                nextbudgetcheck = self.getNextBudgetCheck(c)
+        self.solution = self.getSortedCandidates()[:self.kshortestpath]
+        for solution in self.solution:
+            logger.log(25, "Destination reached in %d hops: %s" % (len(solution), solution))
+        self.printProgressFooter()
+
+    def stopAlgorithm(self, currentmetric):
+        """Return True if the algorithm may stop: if all solutions with a metric up to currentmetric are found."""
+        logger = logging.getLogger("pynt.algorithm")
+        candidates = self.getSortedCandidates()
+        if (len(candidates) >= self.kshortestpath) and (currentmetric >= candidates[self.kshortestpath-1].getMetric()):
+            return True
+        if currentmetric > self.metriclimit:
+            logger.warning("Reached metric limit %.2f; %d paths found" % (self.metriclimit, len(candidates)))
+            return True
+        return False
+
+    def getSortedCandidates(self):
+        candidates = []
+        for path in self.candidates.values():
+            if path.getMetric() <= self.metriclimit:
+                candidates.append((path.getMetric(), path))
+        candidates.sort()
+        return [path for (metric, path) in candidates]
+
+    def examineForwardPath(self, path):
+        """Extend the path, and join it with the examined reverse paths."""
+        note = ""
+        self.outerleaves.remove(path)
+        cp = path.getLastHop().getConnectionPoint()
+        self.forwardexamined.setdefault(cp, []).append(path)
+        for reversepath in self.reverseexamined.get(cp, []):
+            if self.joinPaths(path, reversepath):
+                note += " (solution)"
+        newpaths = self.getValidExtendedPaths(path)
+        for newpath in newpaths:
+            self.outerleaves.append(newpath)
+            cp = newpath.getLastHop().getConnectionPoint()
+            for reversepath in self.reverseexamined.get(cp, []):
+                if self.joinPaths(newpath, reversepath):
+                    note += " (solution)"
+        if len(newpaths) > 1:
+            note += " (branching)"
+        return note
+
+    def examineReversePath(self, reversepath):
+        """Extend the reverse path, and join it with the examined forward paths."""
+        self.reverseleaves.remove(reversepath)
+        self.reverseexamined.setdefault(reversepath.cp, []).append(reversepath)
+        for path in self.forwardexamined.get(reversepath.cp, []):
+            self.joinPaths(path, reversepath)
+        for newpath in self.getExtendedReversePaths(reversepath):
+            self.reverseleaves.append(newpath)
+            for path in self.forwardexamined.get(newpath.cp, []):
+                self.joinPaths(path, newpath)
+
+    def getExtendedReversePaths(self, reversepath):
+        """Return a list of ReversePaths, one connection longer (towards the source) than
+        the given ReversePath. Only the adaptation stack and the direction are checked."""
+        reversepaths = []
+        for (connection, prevcp) in self.reverseconnections.get(reversepath.cp, []):
+            if reversepath.nextconnection != None:
+                # the next connection must be allowed after this connection
+                if reversepath.nextconnection.direction not in directionList(connection.nextdirection):
+                    continue
+            stack = reversepath.stack
+            if isinstance(connection, pynt.paths.AdaptationConnection):
+                # the adaptation pushed the lowest layer on the stack
+                if (len(stack) < 2) or (stack[-1][1] != connection.adaptationfunction):
+                    continue
+                stack = stack[:-1]
+            elif isinstance(connection, pynt.paths.DeAdaptationConnection):
+                # the de-adaptation popped a layer from the stack
+                stack = stack + ((prevcp.getLayer(), connection.adaptationfunction),)
+            reversepaths.append(ReversePath(prevcp, stack, connection, reversepath))
+        return reversepaths
+
+    def joinPaths(self, path, reversepath):
+        """Try to extend the (forward) path along the reverse path to the destination.
+        Adds the resulting path to the candidates if it is a valid solution.
+        Returns True if a new solution was found."""
+        logger = logging.getLogger("pynt.algorithm")
+        if path.getMetric() + reversepath.getMetric() > self.metriclimit:
+            return False
+        if stackLayout(path.getStack()) != reversepath.stack:
+            return False
+        if (reversepath.nextconnection != None) and (reversepath.nextconnection.direction \
+                not in directionList(self.getAllowedNextDirections(path))):
+            return False
+        while reversepath.nextpath != None:
+            try:
+                hop = self.createHop(reversepath.nextpath.cp, reversepath.nextconnection, path)
+                if not self.IsValidPath(hop.getPath()):
+                    return False
+            except pynt.algorithm.InvalidPath, e:
+                logger.debug("Can not join path %s with %s: %s" % (path, reversepath, e))
+                return False
+            path = hop.getPath()
+            reversepath = reversepath.nextpath
+        if not self.isSolution(path):
+            return False
+        signature = tuple([(hop.getConnectionPoint(), hop.getPreviousConnection().__class__) for hop in path])
+        if signature in self.candidates:
+            return False
+        logger.info("Found solution %s" % (path))
+        self.candidates[signature] = path
+        return True
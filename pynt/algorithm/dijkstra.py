@@ -1,14 +1,28 @@
 import logging
 import sys
 import heapq
+try:
+    import multiprocessing
+except ImportError:
+    multiprocessing = None  # python 2.5 or older: domains are processed one by one
 
 import pynt.algorithm.output
 import pynt.output.dot
 import pynt.elements
 import pynt.xmlns
+import pynt.algorithm.snapshot
+import pynt.algorithm.bandwidth
+import pynt.algorithm.hierarchy
 
 infinity = "infinity"
 
+# Disjointness of the paths returned by Dijkstra.findDisjointPaths()
+disjointmodes = ("link", "device", "srlg")
+
+# Intra-domain neighbours of the edge devices of each domain, per bandwidth, as used by DijkstraSemiAbstract.
+# dict of (AdminDomain, bandwidth): (namespace version, dict of Device: list of Devices)
+semiabstractcache = {}
+
 class Dijkstra(pynt.algorithm.BaseAlgorithm):
     """A shortest path algorithm based on Dijkstra's algorithm.
     
@@ -16,6 +30,7 @@ class Dijkstra(pynt.algorithm.BaseAlgorithm):
     gathered from OSPF output. There is no progress printing; the solution is formed when 
     the algorithm is done running.
     """
+    abstractgraph = False   # True if getNeighbors() walks an abstracted graph, instead of the network elements
     
     def __init__(self, outfile=sys.stdout, subject=None):
         if subject == None:
@@ -33,6 +48,11 @@ class Dijkstra(pynt.algorithm.BaseAlgorithm):
         self.setPrinter(DijkstraDotSolutionPrinter(outfile=outfile, subject=subject))
         # self.setPrinter(DijkstraEROSolutionPrinter(outfile=outfile, subject=subject))
         self.intraDomain = False
+        self.bannededges = set()
+        self.targets = []
+        self.snapshot = None
+        self.bandwidthrouter = None
+        self.hierarchy = None
         
     def setPrinter(self, output):
         # assert(isinstance(output, pynt.algorithm.output.ProgressPrinter))
@@ -49,6 +69,67 @@ class Dijkstra(pynt.algorithm.BaseAlgorithm):
         logger = logging.getLogger("pynt.algorithm")
         self.sourcecp = startcp
         self.destinationcp = endcp
+    
+    def setBannedEdges(self, edges):
+        """Set the connections that may not be used, as a list of (cp, cp) tuples. A banned
+        connection is not used in either direction. The RDF objects are not modified."""
+        self.bannededges = set()
+        for (cp1, cp2) in edges:
+            self.addBannedEdge(cp1, cp2)
+    def addBannedEdge(self, cp1, cp2):
+        self.bannededges.add((cp1, cp2))
+        self.bannededges.add((cp2, cp1))
+    def getBannedEdges(self):
+        return self.bannededges
+    
+    def createSnapshot(self):
+        """Compile the current topology (limited to the subjects) into a TopologySnapshot,
+        and search on that snapshot instead of the live object graph."""
+        if self.abstractgraph or self.intraDomain:
+            raise NotImplementedError("%s can not search on a topology snapshot" % (self.__class__.__name__))
+        self.snapshot = pynt.algorithm.snapshot.TopologySnapshot(self.subjects, metric=self._getMetric)
+        return self.snapshot
+    def setSnapshot(self, snapshot):
+        self.snapshot = snapshot
+    def getSnapshot(self):
+        return self.snapshot
+    
+    def getBandwidthRouter(self):
+        """Return a BandwidthRouter on the snapshot. A snapshot is taken if there is none yet, 
+        or if the topology changed. The capacities of the router are recomputed if network
+        elements changed (e.g. after reservations)."""
+        if (self.snapshot == None) or not self.snapshot.isTopologyCurrent():
+            self.createSnapshot()
+        if (self.bandwidthrouter == None) or (self.bandwidthrouter.snapshot != self.snapshot):
+            self.bandwidthrouter = pynt.algorithm.bandwidth.BandwidthRouter(self.snapshot)
+        elif not self.bandwidthrouter.isCurrent():
+            self.bandwidthrouter.updateCapacities()
+        return self.bandwidthrouter
+    
+    def createHierarchy(self):
+        """Contract the snapshot (taken if there is none yet, or if the topology changed) into
+        a ContractionHierarchy, and use it for searches without bandwidth or banned connections.
+        searchPath() updates the hierarchy if the metric of interfaces changes."""
+        if (self.snapshot == None) or not self.snapshot.update():
+            self.createSnapshot()
+        self.hierarchy = pynt.algorithm.hierarchy.ContractionHierarchy(self.snapshot, metric=self._getMetric)
+        return self.hierarchy
+    def setHierarchy(self, hierarchy):
+        self.hierarchy = hierarchy
+    def getHierarchy(self):
+        return self.hierarchy
+    
+    def findWidestPath(self, startid=None, endid=None):
+        """Return (bandwidth, path): the path with the largest bottleneck capacity, and that
+        capacity. See pynt.algorithm.bandwidth."""
+        self.setEndpointIds(startid, endid)
+        return self.getBandwidthRouter().findWidestPath(self.sourcecp, self.destinationcp)
+    
+    def findMinimumHopPath(self, startid=None, endid=None, bandwidth=None):
+        """Return the path with the fewest hops which can carry bandwidth, or None. 
+        See pynt.algorithm.bandwidth."""
+        self.setEndpointIds(startid, endid)
+        return self.getBandwidthRouter().findMinimumHopPath(self.sourcecp, self.destinationcp, bandwidth or 0.0)
         
     def getNeighbors(self, cp):
         if isinstance(cp, pynt.elements.Interface):
@@ -127,34 +208,505 @@ class Dijkstra(pynt.algorithm.BaseAlgorithm):
             return 1
         
 
-    def findShortestPath(self, startid=None, endid=None, bandwidth=None):
-        if self.intraDomain:
-            self.restrictedGraph = self.getRestrictedGraph()
+    def getPathMetric(self, path, bandwidth=None):
+        """Return the total metric of a path (a list of connection points)"""
+        metric = 0
+        for i in range(1, len(path)):
+            m = self.getMetric(path[i-1], path[i], bandwidth)
+            if m == infinity:
+                return infinity
+            metric += m
+        return metric
+
+    def setEndpointIds(self, startid=None, endid=None):
         if startid:
             self.sourcecp = pynt.xmlns.GetRDFObject(startid)
         if endid:
             self.destinationcp = pynt.xmlns.GetRDFObject(endid)
-        q = [(0, self.sourcecp, ())]
+
+    def initSearch(self, startid=None, endid=None, bandwidth=None):
+        """Prepare the graph before one or more searches between the endpoints."""
+        if self.intraDomain:
+            self.restrictedGraph = self.getRestrictedGraph()
+        self.setEndpointIds(startid, endid)
+
+    def finishSearch(self):
+        """Clean up the graph after the searches between the endpoints are done."""
+        pass
+
+    def shortestPathTree(self, source, target=None, bandwidth=None, bannededges=None, bannednodes=None):
+        """Run Dijkstra's algorithm from source. Returns (metrics, predecessors): a dict of
+        cp: metric from the source, and a dict of cp: previous cp on the shortest path (None
+        for the source). If a target is given, the search stops once the target is reached;
+        otherwise the shortest path to every reachable cp is found.
+        Connections in bannededges (a set of (cp, cp) tuples) and the connection points in
+        bannednodes are skipped."""
+        if bannededges == None:
+            bannededges = self.bannededges
+        if bannednodes == None:
+            bannednodes = ()
+        if self.snapshot != None:
+            # the metrics and capacities of the snapshot are recomputed if elements changed
+            if self.snapshot.update():
+                return self.snapshot.shortestPathTree(source, target, bandwidth, bannededges, bannednodes)
+            logger = logging.getLogger("pynt.algorithm")
+            logger.info("Topology changed since the snapshot was taken; searching the network elements instead")
+        metrics = {source: 0}
+        predecessors = {source: None}
+        # The counter breaks ties between equal metrics, so connection points are never compared.
+        counter = 0
+        q = [(0, counter, source)]
         visited = set()
         while q:
-            (cost, v1, path) = heapq.heappop(q)
-            if v1 not in visited:
-                visited.add(v1)
-                path += (v1,)
-                if v1 == self.destinationcp:
-                    return list(path)
-                for v2 in self.getNeighbors(v1):
-                    if v2 not in visited:
-                        m = self.getMetric(v1,v2,bandwidth)
-                        if not m == infinity:
-                            heapq.heappush(q, (cost+m, v2, path))
-        return None
+            (cost, c, v1) = heapq.heappop(q)
+            if v1 in visited:
+                # stale entry: v1 was already reached with a lower metric
+                continue
+            visited.add(v1)
+            if v1 == target:
+                break
+            for v2 in self.getNeighbors(v1):
+                if (v2 in visited) or (v2 in bannednodes) or ((v1, v2) in bannededges):
+                    continue
+                m = self.getMetric(v1,v2,bandwidth)
+                if m == infinity:
+                    continue
+                if (v2 not in metrics) or (cost + m < metrics[v2]):
+                    metrics[v2] = cost + m
+                    predecessors[v2] = v1
+                    counter += 1
+                    heapq.heappush(q, (cost + m, counter, v2))
+        return (metrics, predecessors)
+
+    def getPredecessorPath(self, predecessors, target):
+        """Return the path to target as a list of connection points, or None if target was not reached."""
+        if target not in predecessors:
+            return None
+        path = []
+        while target != None:
+            path.append(target)
+            target = predecessors[target]
+        path.reverse()
+        return path
+
+    def searchPath(self, source, target, bandwidth=None, bannededges=None, bannednodes=None):
+        """Return the shortest path from source to target as a list of connection points, or None.
+        Connections in bannededges (a set of (cp, cp) tuples) and the connection points in
+        bannednodes are skipped."""
+        if bannededges == None:
+            bannededges = self.bannededges
+        if (self.hierarchy != None) and not (bandwidth or bannededges or bannednodes):
+            # contracts the hierarchy again if the metric of nodes changed
+            if self.hierarchy.update():
+                return self.hierarchy.findShortestPath(source, target)
+            logger = logging.getLogger("pynt.algorithm")
+            logger.info("Topology changed since the contraction hierarchy was made; searching without it")
+        (metrics, predecessors) = self.shortestPathTree(source, target, bandwidth, bannededges, bannednodes)
+        return self.getPredecessorPath(predecessors, target)
+
+    def findShortestPath(self, startid=None, endid=None, bandwidth=None):
+        if self.resultcache != None:
+            self.setEndpointIds(startid, endid)
+            key = self.getResultCacheKey(bandwidth)
+            path = self.resultcache.get(key)
+            if path != None:
+                # an empty list means that no path was found
+                return path[:] or None
+        self.initSearch(startid, endid, bandwidth)
+        try:
+            path = self.searchPath(self.sourcecp, self.destinationcp, bandwidth)
+        finally:
+            self.finishSearch()
+        if self.resultcache != None:
+            self.resultcache.add(key, (path or [])[:], path or [], bandwidth=bandwidth)
+        return path
+
+    def getResultCacheKey(self, bandwidth=None):
+        """Return the key for the result cache: the algorithm class, the URIs of the endpoints,
+        the bandwidth, the banned connections and the subjects."""
+        bannededges = [(cp1.getURIdentifier(), cp2.getURIdentifier()) for (cp1, cp2) in self.bannededges]
+        bannededges.sort()
+        subjects = None
+        if self.subjects != None:
+            subjects = [subject.getURI() for subject in self.subjects]
+            subjects.sort()
+            subjects = tuple(subjects)
+        return (self.__class__, self.sourcecp.getURIdentifier(), self.destinationcp.getURIdentifier(),
+                bandwidth, tuple(bannededges), subjects, self.intraDomain)
+
+    def findAllShortestPaths(self, startid=None, targets=None, bandwidth=None):
+        """Return the shortest paths from the source to many targets, using a single search.
+        Returns a dict of target: path (a list of connection points) for each reachable target.
+        If no targets are given, a path is returned for every reachable connection point."""
+        if targets == None:
+            self.targets = []
+        else:
+            self.targets = list(targets)
+        self.initSearch(startid, None, bandwidth)
+        try:
+            (metrics, predecessors) = self.shortestPathTree(self.sourcecp, None, bandwidth)
+        finally:
+            self.finishSearch()
+            self.targets = []
+        if targets == None:
+            targets = predecessors.keys()
+        paths = {}
+        for target in targets:
+            path = self.getPredecessorPath(predecessors, target)
+            if path != None:
+                paths[target] = path
+        return paths
+
+    def getEndpoints(self):
+        """Return the source, destination and other targets of the current search"""
+        endpoints = []
+        for endp in [self.sourcecp, self.destinationcp] + self.targets:
+            if (endp != None) and (endp not in endpoints):
+                endpoints.append(endp)
+        return endpoints
+
+    def findKShortestPaths(self, k, startid=None, endid=None, bandwidth=None):
+        """Return up to k loopless paths from source to destination, ordered by metric.
+        This is Yen's algorithm: each next path deviates from one of the previous paths at a
+        spur node, after which a shortest (spur) path is searched, avoiding the root path and
+        the connections already taken by previous paths with the same root."""
+        self.initSearch(startid, endid, bandwidth)
+        try:
+            self.solution = self.yenKShortestPaths(k, bandwidth)
+        finally:
+            self.finishSearch()
+        return self.solution
+
+    def yenKShortestPaths(self, k, bandwidth=None):
+        logger = logging.getLogger("pynt.algorithm")
+        paths = []
+        path = self.searchPath(self.sourcecp, self.destinationcp, bandwidth)
+        if path == None:
+            return paths
+        paths.append(path)
+        candidates = []     # heap of (metric, counter, path)
+        seen = set([tuple(path)])
+        counter = 0
+        # A spur path only changes if one of its connections gets banned, so remember the
+        # spur path of each root path, with the connections banned at that time.
+        spurpaths = {}      # dict of root path: (set of banned edges, spur path)
+        while len(paths) < k:
+            previous = paths[-1]
+            for i in range(len(previous) - 1):
+                root = tuple(previous[:i+1])
+                spurnode = previous[i]
+                banned = set()
+                for path in paths:
+                    if tuple(path[:i+1]) == root:
+                        banned.add((path[i], path[i+1]))
+                (oldbanned, spur) = spurpaths.get(root, (None, None))
+                if (oldbanned == None) or (not oldbanned.issubset(banned)) or \
+                        (spur and ((spurnode, spur[1]) in banned)):
+                    spur = self.searchPath(spurnode, self.destinationcp, bandwidth, 
+                            self.bannededges | banned, set(root[:-1]))
+                    spurpaths[root] = (banned, spur)
+                if spur == None:
+                    continue
+                path = list(root[:-1]) + spur
+                if tuple(path) in seen:
+                    continue
+                seen.add(tuple(path))
+                counter += 1
+                heapq.heappush(candidates, (self.getPathMetric(path, bandwidth), counter, path))
+            if not candidates:
+                break
+            paths.append(heapq.heappop(candidates)[2])
+        logger.debug("Found %d of %d shortest paths, with %d spur paths computed" % (len(paths), k, len(spurpaths)))
+        return paths
+
+    def findDisjointPaths(self, startid=None, endid=None, bandwidth=None, disjoint="link"):
+        """Return two disjoint paths from source to destination with the smallest total metric,
+        ordered by metric. If no disjoint pair exists, only the shortest path is returned. The
+        two paths always differ in at least one connection.
+        disjoint is the required disjointness:
+        - "link": no interface (and thus no fibre) is used by both paths
+        - "device": no device is used by both paths, except the devices of the endpoints
+        - "srlg": as "device", and no shared risk group (see getRiskGroups()) is used by both paths
+        This is Suurballe's algorithm: a second search on the residual graph of the shortest path,
+        with reduced metrics. The shared risk groups are checked afterwards; if the pair shares
+        a risk group, the best pair of one path and the shortest path avoiding its risk groups
+        is returned instead. Shared risk group disjointness is thus not guaranteed to be optimal."""
+        if disjoint not in disjointmodes:
+            raise ValueError("Unknown disjointness %r; use one of %s" % (disjoint, ", ".join(disjointmodes)))
+        self.initSearch(startid, endid, bandwidth)
+        try:
+            self.solution = self.suurballePaths(disjoint, bandwidth)
+            if (disjoint == "srlg") and (len(self.solution) == 2):
+                self.solution = self.riskDisjointPaths(self.solution, bandwidth)
+        finally:
+            self.finishSearch()
+        self.solution.sort(key=lambda path: self.getPathMetric(path, bandwidth))
+        return self.solution
+
+    def getSearchNeighbors(self, cp):
+        """Return the neighbours of cp, from the snapshot if the topology did not change."""
+        if (self.snapshot != None) and self.snapshot.isTopologyCurrent():
+            return self.snapshot.getNeighbours(cp)
+        return self.getNeighbors(cp) or []
+
+    def getDisjointUnit(self, cp, disjoint):
+        """Return the unit which may be used by only one of the disjoint paths. For device
+        disjointness, a device and its switch matrices form a single unit, the device.
+        The endpoints are always a unit of their own."""
+        if (disjoint != "link") and (cp not in (self.sourcecp, self.destinationcp)):
+            if isinstance(cp, pynt.elements.SwitchMatrix) and cp.getDevice():
+                return cp.getDevice()
+        return cp
+
+    def getUnitMembers(self, unit, disjoint):
+        if (disjoint != "link") and isinstance(unit, pynt.elements.Device):
+            return [unit] + unit.getSwitchMatrices()
+        return [unit]
+
+    def getUnitEdges(self, unit, disjoint, bandwidth=None):
+        """Return a list of (neighbouring unit, metric) for a unit."""
+        metrics = {}
+        for cp in self.getUnitMembers(unit, disjoint):
+            for neighbor in self.getSearchNeighbors(cp):
+                nextunit = self.getDisjointUnit(neighbor, disjoint)
+                if (nextunit == unit) or ((cp, neighbor) in self.bannededges):
+                    continue
+                m = self.getMetric(cp, neighbor, bandwidth)
+                if m == infinity:
+                    continue
+                if (nextunit not in metrics) or (m < metrics[nextunit]):
+                    metrics[nextunit] = m
+        return metrics.items()
+
+    def suurballePaths(self, disjoint="link", bandwidth=None):
+        """Return up to two disjoint paths from source to destination, as lists of connection
+        points. Each unit (see getDisjointUnit()) is split in an in and out node, connected by
+        an edge with capacity 1 (or 2 for the endpoints, and for devices and switch matrices if
+        only links must be disjoint). Both searches stop at the destination."""
+        logger = logging.getLogger("pynt.algorithm")
+        source = self.getDisjointUnit(self.sourcecp, disjoint)
+        target = self.getDisjointUnit(self.destinationcp, disjoint)
+        endpoints = set([source, target])
+        shared = set([source, target])
+        if disjoint != "link":
+            for cp in (self.sourcecp, self.destinationcp):
+                if isinstance(cp, pynt.elements.Interface) and cp.getDevice():
+                    shared.add(cp.getDevice())
+        unitedges = {}  # the unit graph is built while searching, and shared by both searches
+        def edges(node):
+            (unit, out) = node
+            if not out:
+                if (disjoint == "link") and not isinstance(unit, pynt.elements.ConnectionPoint):
+                    return [((unit, 1), 0, 2)]
+                elif unit in shared:
+                    return [((unit, 1), 0, 2)]
+                return [((unit, 1), 0, 1)]
+            if unit not in unitedges:
+                unitedges[unit] = self.getUnitEdges(unit, disjoint, bandwidth)
+            # the split units keep the paths apart; only a direct connection between the
+            # endpoints can not be used twice.
+            if unit in endpoints:
+                return [((nextunit, 0), m, 1 + (nextunit not in endpoints)) for (nextunit, m) in unitedges[unit]]
+            return [((nextunit, 0), m, 2) for (nextunit, m) in unitedges[unit]]
+        start = (source, 1)
+        end = (target, 0)
+        # first search: the shortest path, and the potentials for the reduced metrics
+        (metrics, predecessors) = self.residualSearch(start, end, edges)
+        if end not in predecessors:
+            return []
+        first = self.getPredecessorPath(predecessors, end)
+        limit = metrics[end]
+        potentials = {}
+        for (node, metric) in metrics.iteritems():
+            potentials[node] = min(metric, limit)
+        flow = {}
+        reverse = {}    # dict of node: list of (node, metric) of the reversed edges with flow
+        for i in range(len(first) - 1):
+            (node1, node2) = (first[i], first[i+1])
+            flow[(node1, node2)] = 1
+            for (nextnode, m, capacity) in edges(node1):
+                if nextnode == node2:
+                    reverse.setdefault(node2, []).append((node1, -m))
+                    break
+        def residualedges(node):
+            result = []
+            for (nextnode, m, capacity) in edges(node):
+                if flow.get((node, nextnode), 0) < capacity:
+                    result.append((nextnode, m))
+            return result + reverse.get(node, [])
+        # second search: on the residual graph, with reduced metrics
+        (metrics, predecessors) = self.residualSearch(start, end, residualedges, potentials, limit)
+        if end not in predecessors:
+            logger.info("No disjoint path found from %s to %s" % (self.sourcecp, self.destinationcp))
+            return [self.expandUnitPath(self.getNodeUnits(first), disjoint, bandwidth)]
+        second = self.getPredecessorPath(predecessors, end)
+        for i in range(len(second) - 1):
+            (node1, node2) = (second[i], second[i+1])
+            if flow.get((node2, node1), 0) > 0:
+                # the second path cancels an edge of the first path
+                flow[(node2, node1)] -= 1
+            else:
+                flow[(node1, node2)] = flow.get((node1, node2), 0) + 1
+        successors = {}
+        for ((node1, node2), count) in flow.iteritems():
+            successors.setdefault(node1, []).extend(count * [node2])
+        paths = []
+        for i in range(2):
+            nodes = [start]
+            while nodes[-1] != end:
+                nodes.append(successors[nodes[-1]].pop())
+            paths.append(self.expandUnitPath(self.getNodeUnits(nodes), disjoint, bandwidth))
+        if getPathConnections(paths[0]) == getPathConnections(paths[1]):
+            # e.g. endpoints on the same device: both paths only use units with capacity 2
+            logger.info("No disjoint path found from %s to %s" % (self.sourcecp, self.destinationcp))
+            return paths[:1]
+        return paths
+
+    def getNodeUnits(self, nodes):
+        """Return the list of units of a list of (unit, out) nodes of the split graph."""
+        units = []
+        for (unit, out) in nodes:
+            if (not units) or (units[-1] != unit):
+                units.append(unit)
+        return units
+
+    def residualSearch(self, start, end, edges, potentials=None, limit=0):
+        """Dijkstra's algorithm from start to end, on the graph given by edges(node), a function
+        which returns (node, metric) or (node, metric, capacity) tuples. With potentials, the
+        reduced metric (metric + potential of node - potential of next node) is used; nodes
+        without potential have the given limit as potential."""
+        metrics = {start: 0}
+        predecessors = {start: None}
+        counter = 0
+        q = [(0, counter, start)]
+        visited = set()
+        while q:
+            (cost, c, v1) = heapq.heappop(q)
+            if v1 in visited:
+                continue
+            visited.add(v1)
+            if v1 == end:
+                break
+            for edge in edges(v1):
+                (v2, m) = edge[:2]
+                if v2 in visited:
+                    continue
+                if potentials != None:
+                    m += potentials.get(v1, limit) - potentials.get(v2, limit)
+                if (v2 not in metrics) or (cost + m < metrics[v2]):
+                    metrics[v2] = cost + m
+                    predecessors[v2] = v1
+                    counter += 1
+                    heapq.heappush(q, (cost + m, counter, v2))
+        return (metrics, predecessors)
+
+    def expandUnitPath(self, units, disjoint, bandwidth=None):
+        """Return the path of connection points through a list of units. A device unit is
+        replaced by the member (the device or one of its switch matrices) that connects the
+        previous and next connection point with the smallest metric."""
+        path = []
+        for i in range(len(units)):
+            unit = units[i]
+            if i == 0:
+                path.append(self.sourcecp)
+            elif i == len(units) - 1:
+                path.append(self.destinationcp)
+            elif len(self.getUnitMembers(unit, disjoint)) == 1:
+                path.append(unit)
+            else:
+                best = None
+                for member in self.getUnitMembers(unit, disjoint):
+                    neighbors = self.getSearchNeighbors(member)
+                    if (path[-1] not in neighbors) or (units[i+1] not in neighbors):
+                        continue
+                    m = self.getMetric(path[-1], member, bandwidth)
+                    if m == infinity:
+                        continue
+                    m2 = self.getMetric(member, units[i+1], bandwidth)
+                    if m2 == infinity:
+                        continue
+                    if (best == None) or (m + m2 < best[0]):
+                        best = (m + m2, member)
+                if best != None:
+                    path.append(best[1])
+                else:
+                    # no single member connects both: walk through the device
+                    path.extend((self.searchPath(path[-1], units[i+1], bandwidth) or [])[1:-1])
+        return path
+
+    def getRiskGroups(self, cp):
+        """Return the set of shared risk groups of a connection point: the Location of its
+        device, and for interfaces the lowest server layer interfaces (the fibre) and the
+        interfaces connected to them. E.g. two lambdas on the same fiber share a risk group."""
+        groups = set()
+        device = getElementDevice(cp)
+        if device and device.getLocation():
+            groups.add(device.getLocation())
+        if isinstance(cp, pynt.elements.Interface):
+            servers = [server for server in cp.getServerStackInterfaces() if not server.getServerStackInterfaces()]
+            for server in servers or [cp]:
+                groups.add(server)
+                groups.update(server.getConnectedInterfacesOnly())
+        return groups
+
+    def getPathRiskGroups(self, path):
+        groups = set()
+        for cp in path:
+            groups.update(self.getRiskGroups(cp))
+        return groups
+
+    def riskDisjointPaths(self, paths, bandwidth=None):
+        """Return a pair of device disjoint paths which share no risk group, except the risk
+        groups of the endpoints and their devices. paths is a device disjoint pair."""
+        logger = logging.getLogger("pynt.algorithm")
+        endpointdevices = set()
+        endpointgroups = set()
+        for cp in (self.sourcecp, self.destinationcp):
+            endpointgroups.update(self.getRiskGroups(cp))
+            if getElementDevice(cp):
+                endpointdevices.add(getElementDevice(cp))
+                endpointgroups.update(self.getRiskGroups(getElementDevice(cp)))
+        pathgroups = [self.getPathRiskGroups(path) - endpointgroups for path in paths]
+        if not (pathgroups[0] & pathgroups[1]):
+            return paths
+        if (self.snapshot != None) and self.snapshot.isTopologyCurrent():
+            nodes = self.snapshot.nodes
+        else:
+            nodes = []
+            for klass in pynt.algorithm.snapshot.TopologySnapshot.nodeclasses:
+                nodes.extend(pynt.xmlns.GetAllRDFObjects(klass=klass))
+        riskgroups = {}
+        for cp in nodes:
+            if (cp not in (self.sourcecp, self.destinationcp)) and (getElementDevice(cp) not in endpointdevices):
+                riskgroups[cp] = self.getRiskGroups(cp) - endpointgroups
+        best = None
+        for (path, groups) in zip(paths, pathgroups):
+            devices = set([getElementDevice(cp) for cp in path]) - endpointdevices
+            bannednodes = set()
+            for cp in path:
+                if isinstance(cp, pynt.elements.Interface) and (cp not in (self.sourcecp, self.destinationcp)):
+                    bannednodes.add(cp)
+            for (cp, cpgroups) in riskgroups.iteritems():
+                if (getElementDevice(cp) in devices) or (cpgroups & groups):
+                    bannednodes.add(cp)
+            other = self.searchPath(self.sourcecp, self.destinationcp, bandwidth, None, bannednodes)
+            if other == None:
+                continue
+            metric = self.getPathMetric(path, bandwidth) + self.getPathMetric(other, bandwidth)
+            if (best == None) or (metric < best[0]):
+                best = (metric, [path, other])
+        if best == None:
+            logger.warning("No shared risk group disjoint path found from %s to %s" % (self.sourcecp, self.destinationcp))
+            paths.sort(key=lambda path: self.getPathMetric(path, bandwidth))
+            return paths[:1]
+        return best[1]
     
 class DijkstraAbstract(Dijkstra):
     """Dijkstra pathfinding on a fully abstracted inter-domain graph.
     
     Each domain is collapsed onto a single 'Device'. The interfaces of this
     'device' are the interfaces with inter-domain connections."""
+    abstractgraph = True
     def getGraph(self, bandwidth=None):
         result = []
         for dom in pynt.xmlns.GetAllRDFObjects(klass=pynt.elements.Domain):
@@ -183,6 +735,7 @@ class DijkstraStar(Dijkstra):
     to the center is only created if there are intra-domain interfaces with sufficient
     bandwidth.
     """
+    abstractgraph = True
 
     def __init__(self,outfile=sys.stdout, subject=None,bandwidth=None):
         self.graph = None
@@ -195,22 +748,22 @@ class DijkstraStar(Dijkstra):
         return self.graph
 
     def generateGraph(self, bandwidth=None):
-        self.graph = StarGraph()
-        for dom in pynt.xmlns.GetAllRDFObjects(klass=pynt.elements.AdminDomain):
-            # Get all devices that have an external interface
-            for intf in dom.getInterfaces():
-                if intf.getAvailableCapacity() >= bandwidth:
-                    self.graph.addEdgeInterface(dom,intf,bandwidth)
+        """Bring the star graph up to date, and select the part for the given bandwidth.
+        By default the persistent graph of GetStarGraph() is used, which is only updated
+        for the elements that changed since the previous search."""
+        if self.graph == None:
+            self.graph = GetStarGraph()
+        self.graph.update()
+        self.graph.setBandwidth(bandwidth)
         return self.graph
 
     def addEndpoints(self):
         if not self.graph:
             raise Exception("Cannot add endpoints if no graph is defined.")
-        for endp in (self.sourcecp,self.destinationcp):
+        for endp in self.getEndpoints():
             self.graph.addDevice(endp)
 
     def initNeighbors(self, bandwidth=None):
-        # if not self.graph:
         self.generateGraph(bandwidth)
         self.addEndpoints()
 
@@ -218,28 +771,22 @@ class DijkstraStar(Dijkstra):
         if isinstance(cp, pynt.elements.Interface):
             return [cp.getConnectedInterfaces()[0], cp.getDevice()]
         elif isinstance(cp, pynt.elements.Device):
+            result = self.graph.getInterdomInterfaces(cp)
             # An edge-node only has a connection to the domain if it has available 
             # internal bandwidth.
-            result = self.graph.getInterdomInterfaces(cp)
-            for intf in cp.getLogicalInterfaces():
-                if intf in result:
-                    # This is an inter-domain interface we already have
-                    continue
-                if intf.getAvailableCapacity() >= self.bandwidth:
-                    # This is an internal interface, which has available bandwidth,
-                    # so we have a connection to the domain.
-                    result.append(cp.getDomain())
-                    break
+            if self.graph.hasDomainConnection(cp):
+                result.append(cp.getDomain())
             return result
         elif isinstance(cp, pynt.elements.AdminDomain):
             return self.graph.getDomainDevices(cp)
 
-    def findShortestPath(self, startid=None, endid=None, bandwidth=None):
+    def initSearch(self, startid=None, endid=None, bandwidth=None):
+        Dijkstra.initSearch(self, startid, endid, bandwidth)
         self.initNeighbors(bandwidth)
-        result = Dijkstra.findShortestPath(self,startid,endid,bandwidth)
-        for endp in [self.sourcecp,self.destinationcp]:
+
+    def finishSearch(self):
+        for endp in self.getEndpoints():
             self.graph.removeDevice(endp)
-        return result
 
 class DijkstraSemiAbstract(Dijkstra):
     """Dijkstra pathfinding on a semi-abstracted inter-domain graph.
@@ -249,44 +796,82 @@ class DijkstraSemiAbstract(Dijkstra):
     devices. Thehese connections only exist if a valid path can be found when
     we start pathfinding.
     """
+    abstractgraph = True
     
     def __init__(self,outfile=sys.stdout, subject=None,bandwidth=None):
         self.graph = None
         self.bandwidth = bandwidth
+        self.processes = None
         Dijkstra.__init__(self,outfile,subject)
 
     def generateGraph(self, bandwidth=None):
-        self.graph = SemiAbstractGraph()
+        """Create the semi-abstract graph. The intra-domain neighbours of the edge devices are
+        taken from semiabstractcache; only domains which changed since are recomputed."""
+        self.graph = SemiAbstractGraph(bandwidth=bandwidth)
+        outdated = []
         for dom in pynt.xmlns.GetAllRDFObjects(klass=pynt.elements.AdminDomain):
             # Get all devices that have an external interface
+            self.graph.addDomain(dom)
             for intf in dom.getInterfaces():
                 if intf.getAvailableCapacity() >= bandwidth:
-                    dev = intf.getDevice()
-                    self.graph.addDomainDevice(dom,dev)
-                # Initialize the neighbor dict, this lists all intradomain devs that we can reach
-                # Note that we explicitly do not check if these paths overlap!
-                # We also want to add the source and target to that list if they are in the domain
-                algorithm = Dijkstra(outfile=None, subject=dom.getNamespace())
-                for dev in self.graph.getDomainDevices(dom):
-                    self.graph.intraDomNeighbors[dev] = []
-                    # Initialize the neighborlist with our own inter-domain interfaces
-                    for intf in dev.getLogicalInterfaces():
-                        if intf in dev.getDomain().getInterfaces():
-                            self.graph.intraDomNeighbors[dev].append(intf)
-                for dev in self.graph.getDomainDevices(dom):
-                    for trg in self.graph.getDomainDevices(dom):
-                        if (dev is trg) or (trg in self.graph.intraDomNeighbors[dev]) :
-                            continue
-                        algorithm.setEndpoints(dev, trg)
-                        if algorithm.findShortestPath(bandwidth=bandwidth):
-                            self.graph.intraDomNeighbors[dev].append(trg)
-                            self.graph.intraDomNeighbors[trg].append(dev)
+                    self.graph.addDomainDevice(dom,intf.getDevice())
+            version = pynt.elements.GetNamespaceVersion(dom.getNamespace())
+            self.graph.versions[dom] = version
+            (cachedversion, neighbors) = semiabstractcache.get((dom, bandwidth), (None, None))
+            if cachedversion != version:
+                outdated.append(dom)
+        for (dom, neighbors) in zip(outdated, self.getDomainNeighbors(outdated, bandwidth)):
+            semiabstractcache[(dom, bandwidth)] = (self.graph.versions[dom], neighbors)
+        for dom in self.graph.domains.keys():
+            neighbors = semiabstractcache[(dom, bandwidth)][1]
+            for dev in self.graph.getDomainDevices(dom):
+                # Initialize the neighborlist with our own inter-domain interfaces
+                self.graph.intraDomNeighbors[dev] = []
+                for intf in dev.getLogicalInterfaces():
+                    if intf in dev.getDomain().getInterfaces():
+                        self.graph.intraDomNeighbors[dev].append(intf)
+                self.graph.intraDomNeighbors[dev].extend(neighbors[dev])
         return self.graph
+
+    def setProcesses(self, processes):
+        """Set the number of worker processes to compute domains in parallel. None (the default)
+        uses the number of CPUs, 1 computes all domains in this process."""
+        self.processes = processes
+
+    def getDomainNeighbors(self, domains, bandwidth=None):
+        """Return a list with for each domain the intra-domain neighbors of its edge devices
+        (see GetSemiAbstractNeighbors). If possible, domains are processed in parallel."""
+        # Worker processes (e.g. of a batch run) may not start a pool themselves.
+        if (multiprocessing == None) or (self.processes == 1) or (len(domains) < 2) or \
+                multiprocessing.current_process().daemon:
+            return [GetSemiAbstractNeighbors(dom, self.graph.getDomainDevices(dom), bandwidth) for dom in domains]
+        # Worker processes are forked, and thus have a copy of all network elements.
+        # Objects are passed back and forth by (namespace URI, identifier).
+        arguments = []
+        for dom in domains:
+            devices = [(dev.getNamespace().getURI(), dev.getIdentifier()) for dev in self.graph.getDomainDevices(dom)]
+            arguments.append(((dom.getNamespace().getURI(), dom.getIdentifier()), devices, bandwidth))
+        pool = multiprocessing.Pool(self.processes)
+        try:
+            results = pool.map(semiAbstractNeighborsWorker, arguments)
+        finally:
+            pool.close()
+            pool.join()
+        domainneighbors = []
+        for (dom, pairs) in zip(domains, results):
+            devices = self.graph.getDomainDevices(dom)
+            neighbors = {}
+            for dev in devices:
+                neighbors[dev] = []
+            for (i, j) in pairs:
+                neighbors[devices[i]].append(devices[j])
+            domainneighbors.append(neighbors)
+        return domainneighbors
     
     def addEndpoints(self):
         if not self.graph:
             raise Exception("Cannot add endpoints if no graph is defined.")
-        for endp in (self.sourcecp,self.destinationcp):
+        for endp in self.getEndpoints():
             self.graph.addDevice(endp,self.bandwidth)
     
     def setGraph(self, graph):
@@ -295,7 +880,7 @@ class DijkstraSemiAbstract(Dijkstra):
         return self.graph
 
     def initNeighbors(self, bandwidth=None):
-        if not self.graph:
+        if (not self.graph) or (self.graph.bandwidth != bandwidth) or (not self.graph.isCurrent()):
             self.generateGraph(bandwidth)
         self.addEndpoints()
 
@@ -305,75 +890,242 @@ class DijkstraSemiAbstract(Dijkstra):
         elif isinstance(cp, pynt.elements.Device):
             return self.graph.intraDomNeighbors[cp]
     
-    def findShortestPath(self, startid=None, endid=None, bandwidth=None):
+    def initSearch(self, startid=None, endid=None, bandwidth=None):
+        Dijkstra.initSearch(self, startid, endid, bandwidth)
         self.initNeighbors(bandwidth)
-        result = Dijkstra.findShortestPath(self,startid,endid,bandwidth)
-        for endp in [self.sourcecp,self.destinationcp]:
+
+    def finishSearch(self):
+        for endp in self.getEndpoints():
             self.graph.removeDevice(endp)
-        return result
     
     def findShortestPathOld(self, startid=None, endid=None, bandwidth=None):
         return Dijkstra.findShortestPathOld(self, startid, endid, bandwidth)
 
+def getElementDevice(cp):
+    """Return the Device of a connection point, switch matrix or device, or None."""
+    if isinstance(cp, pynt.elements.Device):
+        return cp
+    elif hasattr(cp, "getDevice"):
+        return cp.getDevice()
+    return None
+
+def getPathConnections(path):
+    """Return the set of (cp, cp) connections of a path (a list of connection points)."""
+    return set(zip(path[:-1], path[1:]))
+
+def thresholdKey(entry):
+    """Sort key for (threshold, RDF object) tuples: the highest threshold first, and in order
+    of the objects for equal thresholds. The order does not depend on the order of updates."""
+    if entry[0] == None:
+        # unknown capacity
+        return (1, 0, pynt.xmlns.rdfObjectKey(entry[1]))
+    return (0, -entry[0], pynt.xmlns.rdfObjectKey(entry[1]))
+
 class StarGraph(object):
-    """Object to represent the StarGraph"""
-    def __init__(self, domains = {}):
-        self.domains = domains
-        self.interDomainInterfaces = {}
-        
-    def addEdgeInterface(self, domain, interface, bandwidth):
-        device = interface.getDevice()
-        # We only add the edge device to the graph if it has any other capacity.
-        for i in device.getLogicalInterfaces():
-            if i == interface:
-                continue
-            if i.getAvailableCapacity() >= bandwidth:
-                self.addInterDomainInterface(device,interface)
+    """Object to represent the StarGraph, for all bandwidths at once.
+    
+    Each inter-domain interface is stored with its capacity threshold: the highest bandwidth
+    for which it is part of the graph. That is the lowest of its own available capacity and
+    the highest available capacity of the other interfaces of its device. The interfaces of a
+    device and the devices of a domain are kept sorted on threshold (highest first), so the
+    lookups only walk the part of the graph for the selected bandwidth.
+    
+    The graph can be updated incrementally: elementChanged() marks the domain or device of a
+    changed element, and update() only recomputes those. Use GetStarGraph() for a graph which
+    is notified of all changes."""
+    def __init__(self):
+        self.domains = {}               # dict of domain: list of (threshold, device), highest first
+        self.interDomainInterfaces = {} # dict of device: list of (threshold, interface), highest first
+        self.internalCapacity = {}      # dict of device: highest available capacity of its intra-domain interfaces
+        self.deviceDomains = {}         # dict of device: domain in which the device is stored
+        self.endpoints = {}             # dict of domain: list of devices added with addDevice()
+        self.bandwidth = None           # the selected bandwidth
+        self.complete = False           # True if all domains are added to the graph
+        self.changedDomains = set()
+        self.changedDevices = set()
+
+    def setBandwidth(self, bandwidth):
+        self.bandwidth = bandwidth
+    def getBandwidth(self):
+        return self.bandwidth
 
-    def addInterDomainInterface(self,device,interface):
+    def elementChanged(self, element, capacity=False):
+        """Mark the domain or device of a changed element, to be recomputed by update()."""
+        if isinstance(element, pynt.elements.AdminDomain):
+            self.changedDomains.add(element)
+        elif isinstance(element, pynt.elements.ConnectionPoint):
+            device = element.getDevice()
+            if device != None:
+                self.changedDevices.add(device)
+
+    def update(self):
+        """Recompute the domains and devices which changed since the last update, or the whole
+        graph if it was never build."""
+        if not self.complete:
+            for dom in pynt.xmlns.GetAllRDFObjects(klass=pynt.elements.AdminDomain):
+                self.changedDomains.add(dom)
+            self.complete = True
+        for dom in self.changedDomains:
+            self.updateDomain(dom)
+        for device in self.changedDevices:
+            if device.getDomain() not in self.changedDomains:
+                self.updateDevice(device)
+        self.changedDomains = set()
+        self.changedDevices = set()
+
+    def updateDomain(self, domain):
+        # Remove devices which are no longer in this domain
+        for (threshold, device) in self.domains.get(domain, []):
+            if device.getDomain() != domain:
+                self.removeDeviceEntries(device)
+        for device in domain.getDevices():
+            self.updateDevice(device)
+
+    def updateDevice(self, device):
+        """Recompute the capacity thresholds of the inter-domain interfaces of the device."""
+        self.removeDeviceEntries(device)
         domain = device.getDomain()
-        if self.domains.has_key(domain):
-            if device not in self.domains[domain]:
-                self.domains[domain].append(device)
-        else:
-            self.domains[domain] = [device]
-        if not self.interDomainInterfaces.has_key(device):
-            self.interDomainInterfaces[device] = [interface]
-        elif interface not in self.interDomainInterfaces[device]:
-            self.interDomainInterfaces[device].append(interface)
+        if domain == None:
+            return
+        domaininterfaces = domain.getInterfaces()
+        # The two highest available capacities of the device
+        capacities = [intf.getAvailableCapacity() for intf in device.getLogicalInterfaces()]
+        capacities.sort()
+        capacities.reverse()
+        entries = []
+        internal = []
+        for intf in device.getLogicalInterfaces():
+            if intf not in domaininterfaces:
+                internal.append(intf.getAvailableCapacity())
+                continue
+            # We only add the edge device to the graph if it has any other capacity.
+            if len(capacities) < 2:
+                continue
+            if capacities[0] == intf.getAvailableCapacity():
+                othercapacity = capacities[1]
+            else:
+                othercapacity = capacities[0]
+            entries.append((min(intf.getAvailableCapacity(), othercapacity), intf))
+        if internal:
+            self.internalCapacity[device] = max(internal)
+        if not entries:
+            return
+        entries.sort(key=thresholdKey)
+        self.interDomainInterfaces[device] = entries
+        self.deviceDomains[device] = domain
+        devices = self.domains.setdefault(domain, [])
+        devices.append((entries[0][0], device))
+        devices.sort(key=thresholdKey)
+
+    def removeDeviceEntries(self, device):
+        self.internalCapacity.pop(device, None)
+        if device not in self.interDomainInterfaces:
+            return
+        del self.interDomainInterfaces[device]
+        domain = self.deviceDomains.pop(device)
+        self.domains[domain] = [entry for entry in self.domains[domain] if entry[1] is not device]
 
     def addDevice(self, device):
-        # Add the device to its domain
-        if device not in self.domains[device.getDomain()]:
-            self.domains[device.getDomain()].append(device)
-        if not self.interDomainInterfaces.has_key(device):
-            self.interDomainInterfaces[device] = []
+        """Add a device (typically an endpoint) to its domain, until removeDevice() is called."""
+        if device in self.getDomainDevices(device.getDomain()):
+            return
+        if not self.internalCapacity.has_key(device):
+            self.updateDevice(device)
+        self.endpoints.setdefault(device.getDomain(), []).append(device)
         
     def getInterdomInterfaces(self,device):
-        try:
-            result = self.interDomainInterfaces[device]
-        except KeyError:
-            result = []
+        result = []
+        for (threshold, interface) in self.interDomainInterfaces.get(device, []):
+            if threshold < self.bandwidth:
+                break
+            result.append(interface)
         return result
+    
+    def hasDomainConnection(self,device):
+        """Return True if the device has an intra-domain interface with sufficient available capacity."""
+        return self.internalCapacity.has_key(device) and (self.internalCapacity[device] >= self.bandwidth)
         
     def getDomainDevices(self,domain):
-        return self.domains[domain]
+        result = []
+        for (threshold, device) in self.domains.get(domain, []):
+            if threshold < self.bandwidth:
+                break
+            result.append(device)
+        return result + self.endpoints.get(domain, [])
     
     def removeDevice(self,device):
-        # First check if this is not an inter-domain device we should keep
-        for intf in device.getLogicalInterfaces():
-            if intf.getConnectedInterfaces():
-                if device.getDomain() != intf.getConnectedInterfaces()[0].getDevice().getDomain():
-                    return
-        # Remove it from the devices in the domain
-        self.domains[device.getDomain()].remove(device)
-        self.interDomainInterfaces.pop(device)
-        
+        """Remove a device which was added with addDevice()."""
+        endpoints = self.endpoints.get(device.getDomain(), [])
+        if device in endpoints:
+            endpoints.remove(device)
+
+stargraph = None
+
+def GetStarGraph():
+    """Return the persistent StarGraph, which is notified of each change in the network elements."""
+    global stargraph
+    if stargraph == None:
+        stargraph = StarGraph()
+        pynt.elements.AddChangeListener(stargraph.elementChanged)
+    return stargraph
         
+def GetSemiAbstractNeighbors(domain, devices, bandwidth=None):
+    """Return the intra-domain neighbors of the given edge devices of a domain: a dict of
+    device: list of devices which can be reached with sufficient bandwidth. Runs a single
+    search from each device (on a snapshot of the domain), which finds all reachable devices.
+    Note that we explicitly do not check if these paths overlap!"""
+    algorithm = Dijkstra(outfile=None, subject=domain.getNamespace())
+    algorithm.createSnapshot()
+    neighbors = {}
+    for dev in devices:
+        neighbors[dev] = []
+    for dev in devices:
+        (metrics, predecessors) = algorithm.shortestPathTree(dev, None, bandwidth)
+        for trg in devices:
+            if (trg is dev) or (trg not in predecessors):
+                continue
+            if trg not in neighbors[dev]:
+                neighbors[dev].append(trg)
+            if dev not in neighbors[trg]:
+                neighbors[trg].append(dev)
+    return neighbors
+
+def semiAbstractNeighborsWorker(arguments):
+    """GetSemiAbstractNeighbors() for a worker process. Takes objects as (namespace URI,
+    identifier) tuples, and returns a list of (index, index) tuples of the neighboring devices."""
+    ((uri, identifier), devicekeys, bandwidth) = arguments
+    domain = pynt.xmlns.GetRDFObject(identifier, namespace=pynt.xmlns.GetNamespaceByURI(uri), klass=pynt.elements.AdminDomain)
+    devices = []
+    for (uri, identifier) in devicekeys:
+        devices.append(pynt.xmlns.GetRDFObject(identifier, namespace=pynt.xmlns.GetNamespaceByURI(uri), klass=pynt.elements.Device))
+    neighbors = GetSemiAbstractNeighbors(domain, devices, bandwidth)
+    pairs = []
+    for i in range(len(devices)):
+        for trg in neighbors[devices[i]]:
+            pairs.append((i, devices.index(trg)))
+    return pairs
+
 class SemiAbstractGraph(object):
-    def __init__(self,domains={},intraDomNeighbors={}):
+    def __init__(self,domains=None,intraDomNeighbors=None,bandwidth=None):
+        if domains == None:
+            domains = {}
+        if intraDomNeighbors == None:
+            intraDomNeighbors = {}
         self.domains = domains
         self.intraDomNeighbors = intraDomNeighbors
+        self.bandwidth = bandwidth
+        self.versions = {}  # dict of domain: namespace version when the graph was created
+    
+    def isCurrent(self):
+        """Return True if none of the domains changed since the graph was created."""
+        for (domain, version) in self.versions.items():
+            if pynt.elements.GetNamespaceVersion(domain.getNamespace()) != version:
+                return False
+        return True
+    
+    def addDomain(self,domain):
+        if not self.domains.has_key(domain):
+            self.domains[domain] = []
     
     def addDomainDevice(self,domain,device):
         if self.domains.has_key(domain):
@@ -396,11 +1148,11 @@ class SemiAbstractGraph(object):
         if not self.intraDomNeighbors.has_key(device):
             self.intraDomNeighbors[device] = []
             algorithm = Dijkstra(outfile=None, subject=device.getDomain().getNamespace())
+            (metrics, predecessors) = algorithm.shortestPathTree(device, None, bandwidth)
             for domdev in self.getDomainDevices(device.getDomain()):
                 if domdev is device:
                     continue
-                algorithm.setEndpoints(domdev, device)
-                if algorithm.findShortestPath(bandwidth=bandwidth):
+                if domdev in predecessors:
                     self.intraDomNeighbors[domdev].append(device)
                     self.intraDomNeighbors[device].append(domdev)
         
@@ -0,0 +1,385 @@
+# -*- coding: utf-8 -*-
+"""Frontier (outer leaves) for the breadth first search algorithms. The frontier keeps the list of
+Paths which are not yet examined, and quickly returns the Path with the smallest metric.
+
+The frontier is a heap with lazy deletion: removing a Path only marks it as gone, and the heap
+entry is skipped once it reaches the top of the heap. This makes both getting the smallest leaf
+and removing a leaf O(log n), instead of the O(n) scan of a plain list.
+
+A BeamFrontier bounds the number of leaves in memory, for flooding searches (like PathWalk and
+PFUnrestrictedFlooding) which otherwise keep every outer leaf. It only keeps the best beamsize
+leaves per band: either per number of hops (the default) or per metric band of the given width.
+Leaves which fall out of the beam are not discarded, but spilled to a SpillQueue on disk. When
+no leaves are left in memory, spilled leaves are resumed, in the order in which they were evicted.
+
+A spilled Path is stored compactly, as a list of (connection point, connection) numbers. It is
+rebuilt by following the same connections from the source with the algorithm's
+getCachedNextCCpList() and createHop(). Each rebuilt hop is checked with IsValidPath() again,
+since that is where the label sets of the path are narrowed; a path which is no longer valid
+is dropped."""
+
+# standard modules
+import array
+import heapq
+import logging
+import tempfile
+
+# local modules
+import pynt.paths
+
+
+def pathMetric(path):
+    """Default sort key of the frontier: the metric of the path so far."""
+    return path.getMetric()
+
+
+class Frontier(object):
+    """A list of Paths (the outer leaves of the search tree), which returns the leaf with the
+    smallest key (by default the metric).
+    If multiple leaves have the same key, lastmatch determines which one is returned:
+    - lastmatch True: the most recently added leaf (this looks most like the previous one,
+      which looks better in path finding vizualisation)
+    - lastmatch False: the earliest added leaf (FIFO: first finish earliest branches, before
+      continuing on deeper branches)
+    The frontier can still be iterated over (in the order in which the leaves were added), so
+    algorithms which walk all outer leaves themselves keep working."""
+    heap        = None  # heap of (key, tiebreak, sequence number) tuples, including removed leaves
+    leaves      = None  # dict of sequence number: Path, with the leaves that are still present
+    sequences   = None  # dict of id(Path): sequence number
+    counter     = 0     # sequence number of the next leaf
+    lastmatch   = True  # on equal key, return the last added leaf
+    key         = None  # function, returning the sort key for a given Path
+    def __init__(self, lastmatch=True, key=None):
+        self.heap       = []
+        self.leaves     = {}
+        self.sequences  = {}
+        self.counter    = 0
+        self.lastmatch  = bool(lastmatch)
+        if key == None:
+            key = pathMetric
+        self.key        = key
+
+    def append(self, path):
+        """Add a leaf to the frontier."""
+        sequence = self.counter
+        self.counter += 1
+        if self.lastmatch:
+            tiebreak = -sequence
+        else:
+            tiebreak = sequence
+        heapq.heappush(self.heap, (self.key(path), tiebreak, sequence))
+        self.leaves[sequence] = path
+        self.sequences[id(path)] = sequence
+
+    def extend(self, paths):
+        for path in paths:
+            self.append(path)
+
+    def remove(self, path):
+        """Remove a leaf from the frontier. Like list.remove(), raises a ValueError if the
+        leaf is not present. The heap entry is only removed once it is at the top of the heap."""
+        try:
+            sequence = self.sequences.pop(id(path))
+        except KeyError:
+            raise ValueError("Frontier.remove(path): %s not in frontier" % (path))
+        del self.leaves[sequence]
+        if len(self.heap) > 2 * len(self.leaves) + 64:
+            self.compact()
+
+    def compact(self):
+        """Drop the heap entries of removed leaves."""
+        self.heap = [entry for entry in self.heap if entry[2] in self.leaves]
+        heapq.heapify(self.heap)
+
+    def peek(self):
+        """Return the leaf with the smallest key, without removing it. Returns None if the
+        frontier is empty."""
+        heap = self.heap
+        while heap and (heap[0][2] not in self.leaves):
+            heapq.heappop(heap)
+        if not heap:
+            return None
+        return self.leaves[heap[0][2]]
+
+    def pop(self):
+        """Remove and return the leaf with the smallest key. Returns None if the frontier is empty."""
+        path = self.peek()
+        if path != None:
+            self.remove(path)
+        return path
+
+    def getLeaves(self):
+        """Return a list of all leaves, in the order they were added."""
+        sequences = self.leaves.keys()
+        sequences.sort()
+        return [self.leaves[sequence] for sequence in sequences]
+
+    def __len__(self):
+        return len(self.leaves)
+
+    def __nonzero__(self):
+        return len(self.leaves) > 0
+
+    def __iter__(self):
+        return iter(self.getLeaves())
+
+    def __getitem__(self, index):
+        return self.getLeaves()[index]
+
+    def __contains__(self, path):
+        return id(path) in self.sequences
+
+    def __str__(self):
+        return "<%s with %d leaves>" % (self.__class__.__name__, len(self.leaves))
+    def __repr__(self):
+        return "<%s with %d leaves>" % (self.__class__.__name__, len(self.leaves))
+
+
+def connectionSignature(connection):
+    """Return a hashable signature of a connection, which identifies the connection among the
+    connections returned by getNextCCpList() towards the same connection point."""
+    return (connection.__class__, getattr(connection, "adaptationfunction", None),
+            getattr(connection, "switchmatrix", None), getattr(connection, "segment", None))
+
+
+class SpillQueue(object):
+    """First in, first out queue of Paths in a temporary file. Each Path is stored as an array
+    of integers: the number of hops, followed by a (connection point, connection signature)
+    pair for each hop after the first. The numbers index tables kept in memory, which are
+    bounded by the size of the network."""
+    algorithm       = None  # the BaseAlgorithm which created the Paths
+    file            = None  # temporary file with the spilled Paths
+    readoffset      = 0     # position of the next Path to read
+    writeoffset     = 0     # end of the file
+    count           = 0     # number of Paths in the queue
+    cps             = None  # list of connection points
+    cpids           = None  # dict of connection point: number
+    signatures      = None  # list of connection signatures
+    signatureids    = None  # dict of connection signature: number
+    spilled         = 0     # total number of Paths written
+    resumed         = 0     # total number of Paths read
+    typecode        = 'i'
+    def __init__(self, algorithm, directory=None):
+        self.algorithm    = algorithm
+        self.file         = tempfile.TemporaryFile(prefix="pynt-spill-", dir=directory)
+        self.cps          = []
+        self.cpids        = {}
+        self.signatures   = []
+        self.signatureids = {}
+
+    def close(self):
+        if self.file != None:
+            self.file.close()
+            self.file = None
+        self.count = 0
+
+    def getCpId(self, cp):
+        cpid = self.cpids.get(cp)
+        if cpid == None:
+            cpid = len(self.cps)
+            self.cps.append(cp)
+            self.cpids[cp] = cpid
+        return cpid
+
+    def getSignatureId(self, connection):
+        signature = connectionSignature(connection)
+        signatureid = self.signatureids.get(signature)
+        if signatureid == None:
+            signatureid = len(self.signatures)
+            self.signatures.append(signature)
+            self.signatureids[signature] = signatureid
+        return signatureid
+
+    def encode(self, path):
+        """Return the Path as an array of integers."""
+        numbers = array.array(self.typecode, [len(path)])
+        for hop in path.getHops()[1:]:
+            numbers.append(self.getCpId(hop.getConnectionPoint()))
+            numbers.append(self.getSignatureId(hop.getPreviousConnection()))
+        return numbers
+
+    def decode(self, numbers):
+        """Rebuild a Path from an array of integers. Returns None if the Path can no longer be
+        created or is no longer valid (e.g. because the topology changed)."""
+        logger = logging.getLogger("pynt.algorithm")
+        algorithm = self.algorithm
+        path = algorithm.createHop(algorithm.sourcecp, pynt.paths.StartingPoint(), pynt.paths.Path()).getPath()
+        prevcp = None
+        for i in range(1, len(numbers), 2):
+            nextcp = self.cps[numbers[i]]
+            signature = self.signatures[numbers[i+1]]
+            curcp = path.getLastHop().getConnectionPoint()
+            nextconnection = None
+            for (connection, cp) in algorithm.getCachedNextCCpList(curcp, prevcp, algorithm.getAllowedNextDirections(path)):
+                if (cp == nextcp) and (connectionSignature(connection) == signature):
+                    nextconnection = connection
+                    break
+            if nextconnection == None:
+                logger.warning("Can not resume spilled path: no connection from %s to %s" % (curcp, nextcp))
+                return None
+            algorithm.resuming = True
+            try:
+                try:
+                    path = algorithm.createHop(nextcp, nextconnection, path).getPath()
+                    if not algorithm.IsValidPath(path):
+                        logger.warning("Can not resume spilled path: %s is no longer valid" % (path))
+                        return None
+                except pynt.algorithm.InvalidPath, e:
+                    logger.warning("Can not resume spilled path at %s: %s" % (nextcp, e))
+                    return None
+            finally:
+                algorithm.resuming = False
+            prevcp = curcp
+        return path
+
+    def push(self, path):
+        numbers = self.encode(path)
+        self.file.seek(self.writeoffset)
+        self.file.write(numbers.tostring())
+        self.writeoffset = self.file.tell()
+        self.count += 1
+        self.spilled += 1
+
+    def pop(self):
+        """Return the oldest Path in the queue, or None if the queue is empty. A Path which can
+        no longer be created is skipped."""
+        while self.count > 0:
+            self.file.seek(self.readoffset)
+            numbers = array.array(self.typecode)
+            numbers.fromfile(self.file, 1)
+            numbers.fromfile(self.file, 2 * (numbers[0] - 1))
+            self.readoffset = self.file.tell()
+            self.count -= 1
+            self.resumed += 1
+            if self.count == 0:
+                # all Paths are read: reuse the file from the start
+                self.file.seek(0)
+                self.file.truncate()
+                self.readoffset = 0
+                self.writeoffset = 0
+            path = self.decode(numbers)
+            if path != None:
+                return path
+        return None
+
+    def getSize(self):
+        """Return the number of bytes in use by the queue on disk."""
+        return self.writeoffset - self.readoffset
+
+    def __len__(self):
+        return self.count
+
+
+class BeamFrontier(Frontier):
+    """Frontier, which keeps at most beamsize leaves per band in memory. The band of a leaf
+    is its number of hops, or, if bandsize is set, its key (metric) divided by bandsize.
+    When a band is full, the leaf with the largest key in that band is spilled to disk.
+    The length of the frontier includes the spilled leaves."""
+    beamsize        = 100   # maximum number of leaves per band in memory
+    bandsize        = None  # width of a metric band, or None to use the number of hops as band
+    bands           = None  # dict of band: heap of (-key, -sequence number, sequence number)
+    bandcounts      = None  # dict of band: number of leaves in memory
+    leafbands       = None  # dict of sequence number: band
+    spill           = None  # SpillQueue with the evicted leaves
+    resumesize      = None  # number of spilled leaves resumed when the beam is empty
+    def __init__(self, algorithm, beamsize=100, bandsize=None, directory=None, lastmatch=True, key=None):
+        Frontier.__init__(self, lastmatch=lastmatch, key=key)
+        self.beamsize   = beamsize
+        self.bandsize   = bandsize
+        self.bands      = {}
+        self.bandcounts = {}
+        self.leafbands  = {}
+        self.spill      = SpillQueue(algorithm, directory)
+        self.resumesize = beamsize
+
+    def getBand(self, path):
+        if self.bandsize:
+            return int(self.key(path) / self.bandsize)
+        return len(path)
+
+    def append(self, path):
+        """Add a leaf to the frontier. If the band of the leaf is full, the worst leaf of that
+        band (possibly the new leaf) is spilled to disk."""
+        Frontier.append(self, path)
+        sequence = self.counter - 1
+        band = self.getBand(path)
+        self.leafbands[sequence] = band
+        heap = self.bands.setdefault(band, [])
+        heapq.heappush(heap, (-self.key(path), -sequence, sequence))
+        self.bandcounts[band] = self.bandcounts.get(band, 0) + 1
+        if self.bandcounts[band] > self.beamsize:
+            self.evict(band)
+
+    def evict(self, band):
+        """Spill the leaf with the largest key (the most recent one on equal key) of a band."""
+        heap = self.bands[band]
+        while heap[0][2] not in self.leaves:
+            heapq.heappop(heap)
+        (key, tiebreak, sequence) = heapq.heappop(heap)
+        path = self.leaves[sequence]
+        self.remove(path)
+        self.spill.push(path)
+
+    def remove(self, path):
+        sequence = self.sequences.get(id(path))
+        Frontier.remove(self, path)
+        band = self.leafbands.pop(sequence)
+        self.bandcounts[band] -= 1
+        if self.bandcounts[band] == 0:
+            del self.bandcounts[band]
+            del self.bands[band]
+        elif len(self.bands[band]) > 2 * self.bandcounts[band] + 64:
+            heap = [entry for entry in self.bands[band] if entry[2] in self.leaves]
+            heapq.heapify(heap)
+            self.bands[band] = heap
+
+    def resume(self):
+        """Move up to resumesize spilled leaves back in memory."""
+        logger = logging.getLogger("pynt.algorithm")
+        logger.debug("Beam is empty; resume %d of %d spilled leaves" % (min(self.resumesize, len(self.spill)), len(self.spill)))
+        for i in range(self.resumesize):
+            path = self.spill.pop()
+            if path == None:
+                break
+            self.append(path)
+
+    def peek(self):
+        """Return the leaf with the smallest key. If no leaves are in memory, spilled leaves
+        are resumed first."""
+        path = Frontier.peek(self)
+        while (path == None) and len(self.spill):
+            self.resume()
+            path = Frontier.peek(self)
+        return path
+
+    def getLeaves(self):
+        """Return a list of the leaves in memory, in the order they were added."""
+        return Frontier.getLeaves(self)
+
+    def getMemoryCount(self):
+        """Return the number of leaves in memory."""
+        return len(self.leaves)
+
+    def getSpillCount(self):
+        """Return the number of leaves spilled to disk."""
+        return len(self.spill)
+
+    def getSpilledTotal(self):
+        """Return the number of leaves spilled to disk since the frontier was created, including
+        those which are resumed since."""
+        return self.spill.spilled
+
+    def close(self):
+        """Remove the spilled leaves."""
+        self.spill.close()
+
+    def __len__(self):
+        return len(self.leaves) + len(self.spill)
+
+    def __nonzero__(self):
+        return len(self) > 0
+
+    def __str__(self):
+        return "<%s with %d leaves in memory and %d spilled>" % (self.__class__.__name__, len(self.leaves), len(self.spill))
+    def __repr__(self):
+        return self.__str__()
@@ -0,0 +1,332 @@
+# -*- coding: utf-8 -*-
+"""Contraction hierarchy of the graph walked by the Dijkstra algorithms, for fast point to
+point queries on topologies which rarely change (like inter-domain graphs).
+
+The nodes of a TopologySnapshot are contracted one by one, in order of importance (the number
+of shortcuts needed minus the number of connections removed). Contracting a node removes it
+from the graph, and adds a shortcut between two of its neighbours if the path through the
+node is the only shortest path between them; a bounded witness search looks for another path.
+Each shortcut remembers the node it bypasses, so it can be unpacked into the original path.
+
+A query runs two searches which only go up in the hierarchy: forward from the source and
+backward from the destination. They meet at the most important node of the shortest path, and
+only settle a small part of the graph.
+
+The metric of a connection is the sum of the metrics of both nodes (see Dijkstra._getMetric()).
+For each node, the hierarchy remembers the first contraction which depends on its metric: the
+contraction of the node itself or of a neighbour, or one whose witness searches reached the
+node (a skipped shortcut may rely on a witness path through it). If the metric of some nodes
+changes, updateMetrics() contracts the nodes again from the first contraction which depends on
+one of them, in the same order. update() does this for all nodes whose metric changed."""
+
+# standard modules
+import array
+import heapq
+import logging
+
+# local modules
+import pynt.elements
+import pynt.algorithm.snapshot
+
+
+class ContractionHierarchy(object):
+    """Contraction hierarchy of a TopologySnapshot. Node IDs are those of the snapshot."""
+    snapshot        = None  # the TopologySnapshot
+    metric          = None  # function returning the metric of an RDF object
+    nodemetrics     = None  # array of node ID: metric
+    original        = None  # dict of node ID: dict of node ID: metric of the original connections
+    reverse         = None  # dict of node ID: set of node IDs with an original connection to it
+    order           = None  # list of node IDs, in order of contraction
+    rank            = None  # array of node ID: position in order
+    shortcuts       = None  # dict of (node ID, node ID): (metric, node ID of the bypassed node)
+    created         = None  # list of node ID: list of (node ID, node ID, metric) shortcuts added by contracting the node
+    dependency      = None  # array of node ID: first position in order of a contraction which depends on the node's metric
+    changecount     = None  # pynt.elements.changecounter when the metrics were last compared
+    up              = None  # list of node ID: list of (higher node ID, metric) of outgoing connections
+    down            = None  # list of node ID: list of (higher node ID, metric) of incoming connections
+    witnesslimit    = 64    # maximum number of nodes settled by a witness search
+    def __init__(self, snapshot=None, subjects=None, metric=None):
+        if metric == None:
+            metric = pynt.algorithm.snapshot.defaultNodeMetric
+        self.metric = metric
+        if snapshot == None:
+            snapshot = pynt.algorithm.snapshot.TopologySnapshot(subjects, metric=metric)
+        self.snapshot = snapshot
+        self.nodemetrics = array.array('d', snapshot.metrics)
+        self.original = {}
+        self.reverse = {}
+        for v in xrange(len(snapshot)):
+            self.original[v] = {}
+            self.reverse[v] = set()
+        for v1 in xrange(len(snapshot)):
+            for v2 in snapshot.getNeighbourIds(v1):
+                if v2 != v1:
+                    self.original[v1][v2] = self.nodemetrics[v1] + self.nodemetrics[v2]
+                    self.reverse[v2].add(v1)
+        self.order = None
+        self.shortcuts = {}
+        self.changecount = snapshot.changecount
+        self.contract()
+
+    def isCurrent(self):
+        """Return True if no network element changed since the hierarchy was contracted (or
+        since the last update())."""
+        return self.snapshot.isTopologyCurrent() and (self.changecount == pynt.elements.changecounter)
+
+    def update(self):
+        """Contract the hierarchy again if the metric of nodes changed. Returns False if the
+        topology changed, in which case a new hierarchy must be made."""
+        if not self.snapshot.isTopologyCurrent():
+            return False
+        if self.changecount != pynt.elements.changecounter:
+            self.changecount = pynt.elements.changecounter
+            self.updateMetrics(self.snapshot.nodes)
+        return True
+
+    def getOverlay(self, start):
+        """Return (outgoing, incoming): dicts of node ID: dict of node ID: metric, with the
+        graph that remains after contracting the first start nodes of the order."""
+        outgoing = {}
+        incoming = {}
+        if self.order == None:
+            remaining = xrange(len(self.snapshot))
+        else:
+            remaining = self.order[start:]
+        for v in remaining:
+            outgoing[v] = {}
+            incoming[v] = {}
+        for v1 in remaining:
+            for (v2, m) in self.original[v1].iteritems():
+                if v2 in outgoing:
+                    outgoing[v1][v2] = m
+                    incoming[v2][v1] = m
+        for ((v1, v2), (m, middle)) in self.shortcuts.iteritems():
+            if (v1 in outgoing) and (v2 in outgoing) and (m < outgoing[v1].get(v2, m + 1)):
+                outgoing[v1][v2] = m
+                incoming[v2][v1] = m
+        return (outgoing, incoming)
+
+    def witnessSearch(self, outgoing, source, skip, targets, limit):
+        """Return a dict of node ID: metric of the shortest paths from source which do not pass
+        skip, up to metric limit, and settling at most witnesslimit nodes."""
+        metrics = {source: 0.0}
+        q = [(0.0, source)]
+        visited = set()
+        remaining = len(targets)
+        while q and (len(visited) < self.witnesslimit):
+            (cost, v1) = heapq.heappop(q)
+            if v1 in visited:
+                continue
+            visited.add(v1)
+            if v1 in targets:
+                remaining -= 1
+                if remaining == 0:
+                    break
+            if cost > limit:
+                break
+            for (v2, m) in outgoing[v1].iteritems():
+                if (v2 == skip) or (v2 in visited):
+                    continue
+                if (v2 not in metrics) or (cost + m < metrics[v2]):
+                    metrics[v2] = cost + m
+                    heapq.heappush(q, (cost + m, v2))
+        return metrics
+
+    def getShortcuts(self, outgoing, incoming, v, touched=None):
+        """Return a list of (node ID, node ID, metric) shortcuts needed to contract v. The
+        nodes reached by the witness searches are added to touched, if given."""
+        shortcuts = []
+        targets = outgoing[v]
+        if not targets:
+            return shortcuts
+        maxout = max(targets.values())
+        for (u, m1) in incoming[v].iteritems():
+            witnesses = self.witnessSearch(outgoing, u, v, targets, m1 + maxout)
+            if touched != None:
+                touched.update(witnesses)
+            for (x, m2) in targets.iteritems():
+                if x == u:
+                    continue
+                if witnesses.get(x, m1 + m2 + 1) > m1 + m2:
+                    shortcuts.append((u, x, m1 + m2))
+        return shortcuts
+
+    def getPriority(self, outgoing, incoming, v, contracted):
+        return len(self.getShortcuts(outgoing, incoming, v)) - len(outgoing[v]) - len(incoming[v]) + contracted.get(v, 0)
+
+    def contractNode(self, outgoing, incoming, v, position):
+        """Remove v, the node at the given position in the order, from the overlay graph,
+        adding the shortcuts between its neighbours."""
+        touched = set(outgoing[v].keys() + incoming[v].keys())
+        touched.add(v)
+        created = []
+        for (u, x, m) in self.getShortcuts(outgoing, incoming, v, touched):
+            if m < outgoing[u].get(x, m + 1):
+                outgoing[u][x] = m
+                incoming[x][u] = m
+                if m < self.original[u].get(x, m + 1):
+                    self.shortcuts[(u, x)] = (m, v)
+                    created.append((u, x, m))
+        self.created[v] = created
+        for w in touched:
+            if self.dependency[w] > position:
+                self.dependency[w] = position
+        self.up[v] = outgoing[v].items()
+        self.down[v] = incoming[v].items()
+        for x in outgoing[v]:
+            del incoming[x][v]
+        for u in incoming[v]:
+            del outgoing[u][v]
+        del outgoing[v]
+        del incoming[v]
+
+    def contract(self, start=0):
+        """Contract all nodes, or only the nodes from position start in the order. If the order
+        is not yet known, it is determined while contracting."""
+        logger = logging.getLogger("pynt.algorithm")
+        size = len(self.snapshot)
+        if self.order == None:
+            self.up = size * [[]]
+            self.down = size * [[]]
+            self.created = size * [[]]
+            self.dependency = array.array('l', size * [size])
+        else:
+            # forget the contractions from position start: keep the shortcuts added before
+            self.shortcuts = {}
+            for v in self.order[:start]:
+                for (u, x, m) in self.created[v]:
+                    self.shortcuts[(u, x)] = (m, v)
+            for w in xrange(size):
+                if self.dependency[w] >= start:
+                    self.dependency[w] = size
+        (outgoing, incoming) = self.getOverlay(start)
+        if self.order == None:
+            self.order = []
+            contracted = {}
+            q = [(self.getPriority(outgoing, incoming, v, contracted), v) for v in outgoing]
+            heapq.heapify(q)
+            while q:
+                (priority, v) = heapq.heappop(q)
+                # lazy update: the priority may have increased since it was computed
+                priority = self.getPriority(outgoing, incoming, v, contracted)
+                if q and (priority > q[0][0]):
+                    heapq.heappush(q, (priority, v))
+                    continue
+                for neighbour in set(outgoing[v].keys() + incoming[v].keys()):
+                    contracted[neighbour] = contracted.get(neighbour, 0) + 1
+                self.contractNode(outgoing, incoming, v, len(self.order))
+                self.order.append(v)
+        else:
+            for position in xrange(start, size):
+                self.contractNode(outgoing, incoming, self.order[position], position)
+        self.rank = array.array('l', size * [0])
+        for (position, v) in enumerate(self.order):
+            self.rank[v] = position
+        # only keep the connections to more important nodes
+        for v in self.order[start:]:
+            self.up[v] = [(x, m) for (x, m) in self.up[v] if self.rank[x] > self.rank[v]]
+            self.down[v] = [(u, m) for (u, m) in self.down[v] if self.rank[u] > self.rank[v]]
+        logger.debug("Contracted %d nodes; %d shortcuts" % (size - start, len(self.shortcuts)))
+
+    def updateMetrics(self, nodes):
+        """Recompute the metric of the given RDF objects, and contract the hierarchy again from
+        the first contraction which depends on these metrics, keeping the order of the nodes."""
+        changed = []
+        for node in nodes:
+            v = self.snapshot.getNodeId(node)
+            if v == None:
+                continue
+            metric = self.metric(node)
+            if metric != self.nodemetrics[v]:
+                self.nodemetrics[v] = metric
+                changed.append(v)
+        if not changed:
+            return
+        start = len(self.order)
+        for v in changed:
+            for x in self.original[v]:
+                self.original[v][x] = self.nodemetrics[v] + self.nodemetrics[x]
+            for u in self.reverse[v]:
+                self.original[u][v] = self.nodemetrics[u] + self.nodemetrics[v]
+            # this includes the contraction of v itself
+            start = min(start, self.dependency[v])
+        self.contract(start)
+
+    def query(self, sourceid, targetid):
+        """Return (metric, node ID path) of the shortest path between two node IDs, or
+        (None, None) if there is no path."""
+        if sourceid == targetid:
+            return (0.0, [sourceid])
+        metrics = ({sourceid: 0.0}, {targetid: 0.0})
+        predecessors = ({sourceid: -1}, {targetid: -1})
+        queues = ([(0.0, sourceid)], [(0.0, targetid)])
+        graphs = (self.up, self.down)
+        visited = (set(), set())
+        best = None
+        meeting = None
+        side = 0
+        while queues[0] or queues[1]:
+            if not queues[side]:
+                side = 1 - side
+            (cost, v1) = heapq.heappop(queues[side])
+            if (best != None) and (cost >= best):
+                # this side can not improve the best path anymore
+                del queues[side][:]
+                side = 1 - side
+                continue
+            if v1 not in visited[side]:
+                visited[side].add(v1)
+                if v1 in metrics[1 - side]:
+                    total = cost + metrics[1 - side][v1]
+                    if (best == None) or (total < best):
+                        best = total
+                        meeting = v1
+                for (v2, m) in graphs[side][v1]:
+                    if (v2 not in metrics[side]) or (cost + m < metrics[side][v2]):
+                        metrics[side][v2] = cost + m
+                        predecessors[side][v2] = v1
+                        heapq.heappush(queues[side], (cost + m, v2))
+            if queues[1 - side]:
+                side = 1 - side
+        if meeting == None:
+            return (None, None)
+        forward = []
+        v = meeting
+        while v >= 0:
+            forward.append(v)
+            v = predecessors[0][v]
+        forward.reverse()
+        v = predecessors[1][meeting]
+        while v >= 0:
+            forward.append(v)
+            v = predecessors[1][v]
+        path = [forward[0]]
+        for i in range(len(forward) - 1):
+            path.extend(self.unpack(forward[i], forward[i+1]))
+        return (best, path)
+
+    def unpack(self, v1, v2):
+        """Return the original node IDs after v1 up to and including v2."""
+        if (v1, v2) not in self.shortcuts:
+            return [v2]
+        middle = self.shortcuts[(v1, v2)][1]
+        return self.unpack(v1, middle) + self.unpack(middle, v2)
+
+    def findShortestPath(self, source, target):
+        """Return the shortest path from source to target as a list of RDF objects, or None."""
+        sourceid = self.snapshot.getNodeId(source)
+        targetid = self.snapshot.getNodeId(target)
+        if (sourceid == None) or (targetid == None):
+            return None
+        (metric, path) = self.query(sourceid, targetid)
+        if path == None:
+            return None
+        return [self.snapshot.getNode(v) for v in path]
+
+    def getDistance(self, source, target):
+        """Return the metric of the shortest path from source to target, or None."""
+        sourceid = self.snapshot.getNodeId(source)
+        targetid = self.snapshot.getNodeId(target)
+        if (sourceid == None) or (targetid == None):
+            return None
+        return self.query(sourceid, targetid)[0]
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""Cache of the neighbours of connection points, as returned by BaseAlgorithm.getNextCCpList().
+The neighbours are the list of (connection, connection point) tuples which can be reached from
+a connection point in the given direction(s). Finding them is relatively expensive, and the
+same connection point is usually examined many times during a search.
+
+The cache is emptied if the topology has changed since it was filled (see
+pynt.elements.GetTopologyVersion())."""
+
+# local modules
+import pynt.elements
+import pynt.paths
+
+
+def directionKey(direction):
+    """Return a hashable key for a direction or list of directions."""
+    if isinstance(direction, pynt.paths.Direction):
+        return (direction,)
+    return tuple(direction)
+
+
+class NeighbourCache(object):
+    """Cache of (connection, connection point) lists, keyed by (connection point, directions)."""
+    neighbours  = None  # dict of (cp, directions): list of (connection, cp) tuples
+    version     = None  # topology version of the cached values
+    hits        = 0
+    misses      = 0
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.neighbours = {}
+        self.version    = pynt.elements.GetTopologyVersion()
+
+    def get(self, cp, direction):
+        """Return a copy of the cached list of (connection, cp) tuples, or None if it is not cached."""
+        if self.version != pynt.elements.GetTopologyVersion():
+            self.clear()
+        try:
+            ccplist = self.neighbours[(cp, directionKey(direction))]
+        except KeyError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return ccplist[:]  # make a copy, as the caller may modify the list
+
+    def set(self, cp, direction, ccplist):
+        if self.version != pynt.elements.GetTopologyVersion():
+            self.clear()
+        self.neighbours[(cp, directionKey(direction))] = ccplist[:]
+
+
+classcaches = {}  # dict of algorithm class: NeighbourCache
+
+def GetClassCache(klass):
+    """Return the NeighbourCache which is shared by all instances of the given algorithm class,
+    so that repeated searches on the same topology only find the neighbours once."""
+    if klass not in classcaches:
+        classcaches[klass] = NeighbourCache()
+    return classcaches[klass]
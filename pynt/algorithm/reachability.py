@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""Map of the connection points which can be reached from one source, as found by
+BaseAlgorithm.findReachable().
+
+The search examines paths in order of metric, so the first path that arrives at a connection
+point with an empty stack is the shortest valid path to that connection point. Only the last
+Hop of that path is stored: since each Hop points to its previous Hop (see pynt.paths), the
+full path can be reconstructed later, and all paths share the hops they have in common."""
+
+
+class ReachabilityMap(object):
+    """Dict-like map of connection point: last Hop of the first valid arrival with an empty
+    stack. The source itself is reachable with metric 0."""
+    source      = None  # the source ConnectionPoint
+    arrivals    = None  # dict of ConnectionPoint: Hop
+    order       = None  # list of ConnectionPoints, in order of arrival
+    def __init__(self, source):
+        self.source     = source
+        self.arrivals   = {}
+        self.order      = []
+
+    def add(self, path):
+        """Record the path if it is the first arrival with an empty stack at its last connection
+        point. Returns True if the path was recorded."""
+        hop = path.getLastHop()
+        cp  = hop.getConnectionPoint()
+        if (cp in self.arrivals) or not hop.getStack().isempty():
+            return False
+        self.arrivals[cp] = hop
+        self.order.append(cp)
+        return True
+
+    def getConnectionPoints(self):
+        """Return the reachable connection points, in order of metric."""
+        return self.order[:]
+
+    def getHop(self, cp):
+        """Return the last Hop of the path to cp, or None if cp is not reachable."""
+        return self.arrivals.get(cp)
+
+    def getPath(self, cp):
+        """Return the shortest valid Path to cp, or None if cp is not reachable."""
+        hop = self.arrivals.get(cp)
+        if hop == None:
+            return None
+        return hop.getPath()
+
+    def getMetric(self, cp):
+        """Return the metric of the shortest valid path to cp, or None if cp is not reachable."""
+        hop = self.arrivals.get(cp)
+        if hop == None:
+            return None
+        return hop.getMetric()
+
+    def getPredecessor(self, cp):
+        """Return the connection point before cp on the shortest valid path to cp, or None for
+        the source and for unreachable connection points. Note that the predecessor itself may
+        only be reachable with a non-empty stack."""
+        hop = self.arrivals.get(cp)
+        if (hop == None) or (hop.getPreviousHop() == None):
+            return None
+        return hop.getPreviousHop().getConnectionPoint()
+
+    def getMetrics(self):
+        """Return a dict of reachable connection point: metric."""
+        metrics = {}
+        for (cp, hop) in self.arrivals.iteritems():
+            metrics[cp] = hop.getMetric()
+        return metrics
+
+    def containsAll(self, cps):
+        for cp in cps:
+            if cp not in self.arrivals:
+                return False
+        return True
+
+    def __contains__(self, cp):
+        return cp in self.arrivals
+
+    def __len__(self):
+        return len(self.arrivals)
+
+    def __iter__(self):
+        return iter(self.getConnectionPoints())
+
+    def __str__(self):
+        return "<%s from %s with %d reachable connection points>" % (self.__class__.__name__, self.source, len(self.arrivals))
+    def __repr__(self):
+        return self.__str__()
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""Cache of path finding results, so the same request on an unchanged topology is answered
+without running the algorithm again.
+
+A ResultCache is a bounded LRU (least recently used) cache. The keys are made by the algorithm
+(see BaseAlgorithm.getResultCacheKey() and Dijkstra.getResultCacheKey()) from the algorithm
+class, the URIs of the endpoints and the constraints.
+
+The cache is notified of each change of an element (see pynt.elements.ElementChanged), and
+only invalidates the entries which may depend on that element:
+- entries with a path that traverses the element;
+- entries without any path, since the change may make a path possible;
+- after a change of capacity, entries of requests with a bandwidth constraint, since more
+  capacity elsewhere in the network may make a new (shorter) path feasible.
+Other changes which make a new shorter path possible elsewhere in the network (a new connection
+or a lower metric) are not detected for requests which already have a path."""
+
+# local modules
+import pynt.elements
+
+
+# Indices in the entry lists of the linked list
+PREVIOUS, NEXT, KEY, RESULT, ELEMENTS = 0, 1, 2, 3, 4
+
+
+class ResultCache(object):
+    """Bounded LRU cache of path finding results. The cache is notified of all element changes."""
+    maxsize         = 1024  # maximum number of entries
+    entries         = None  # dict of key: entry, with entry a [previous, next, key, result, elements] list
+    root            = None  # root of the circular linked list of entries, from least to most recently used
+    index           = None  # dict of element: set of keys of entries with a path that traverses element
+    emptykeys       = None  # set of keys of entries without a path
+    bandwidthkeys   = None  # set of keys of entries of requests with a bandwidth constraint
+    hits            = 0
+    misses          = 0
+    invalidations   = 0     # number of entries removed because of a change in the network
+    evictions       = 0     # number of entries removed because the cache was full
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.clear()
+        pynt.elements.AddChangeListener(self.elementChanged)
+
+    def close(self):
+        """Stop following changes of the network elements, and remove all entries."""
+        pynt.elements.RemoveChangeListener(self.elementChanged)
+        self.clear()
+
+    def clear(self):
+        """Remove all entries. The statistics are not reset."""
+        self.entries = {}
+        self.root = []
+        self.root[:] = [self.root, self.root, None, None, None]
+        self.index = {}
+        self.emptykeys = set()
+        self.bandwidthkeys = set()
+
+    def get(self, key):
+        """Return the cached result for key, or None."""
+        entry = self.entries.get(key)
+        if entry == None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.unlink(entry)
+        self.link(entry)
+        return entry[RESULT]
+
+    def add(self, key, result, elements, bandwidth=None):
+        """Add a result to the cache. elements is a list of all network elements traversed by
+        the paths in the result (an empty list if no path was found). bandwidth is the 
+        bandwidth constraint of the request, if any."""
+        if key in self.entries:
+            self.remove(key)
+        elements = set(elements)
+        entry = [None, None, key, result, elements]
+        self.link(entry)
+        self.entries[key] = entry
+        for element in elements:
+            self.index.setdefault(element, set()).add(key)
+        if not elements:
+            self.emptykeys.add(key)
+        if bandwidth:
+            self.bandwidthkeys.add(key)
+        while len(self.entries) > self.maxsize:
+            self.remove(self.root[NEXT][KEY])
+            self.evictions += 1
+
+    def remove(self, key):
+        entry = self.entries.pop(key)
+        self.unlink(entry)
+        for element in entry[ELEMENTS]:
+            keys = self.index[element]
+            keys.discard(key)
+            if not keys:
+                del self.index[element]
+        self.emptykeys.discard(key)
+        self.bandwidthkeys.discard(key)
+
+    def link(self, entry):
+        """Add the entry at the end (most recently used) of the linked list."""
+        last = self.root[PREVIOUS]
+        entry[PREVIOUS] = last
+        entry[NEXT] = self.root
+        last[NEXT] = entry
+        self.root[PREVIOUS] = entry
+
+    def unlink(self, entry):
+        entry[PREVIOUS][NEXT] = entry[NEXT]
+        entry[NEXT][PREVIOUS] = entry[PREVIOUS]
+
+    def elementChanged(self, element, capacity=False):
+        """Remove the entries which may no longer be valid after a change of element."""
+        keys = self.index.get(element, set()) | self.emptykeys
+        if capacity:
+            keys |= self.bandwidthkeys
+        for key in keys:
+            self.remove(key)
+        self.invalidations += len(keys)
+
+    def getStatistics(self):
+        """Return a dict with the number of entries, hits, misses, invalidations and evictions."""
+        return {"entries": len(self.entries), "hits": self.hits, "misses": self.misses,
+                "invalidations": self.invalidations, "evictions": self.evictions}
+
+    def resetStatistics(self):
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __str__(self):
+        return "<%s with %d of %d entries, %d hits, %d misses>" % (self.__class__.__name__,
+                len(self.entries), self.maxsize, self.hits, self.misses)
@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""Compiled snapshot of the topology, for graph algorithms which do not need the multi-layer
+details (like the Dijkstra algorithms).
+
+The algorithms normally walk the live object graph: getConnectedInterfaces() copies lists,
+and getDevice() and getSwitchMatrix() are called for every neighbour. A TopologySnapshot
+compiles the network elements once into integer node IDs, with array-backed CSR (compressed
+sparse row) adjacency per connection type: the neighbours of node n of a connection type are
+targets[offsets[n]:offsets[n+1]]. Node metrics and available capacity are kept in parallel
+arrays.
+
+A snapshot is a copy: it does not follow changes to the network elements. Use isCurrent() to
+see if any element changed since the snapshot was taken (see pynt.elements.ElementChanged), and
+isTopologyCurrent() to see if only the metrics and capacities may have changed. In that case,
+update() recomputes the metrics and capacities without compiling the connections again."""
+
+# standard modules
+import array
+import heapq
+import logging
+
+# local modules
+import pynt.xmlns
+import pynt.elements
+
+
+def defaultNodeMetric(node):
+    """Default metric of a node; the same as Dijkstra._getMetric()"""
+    if isinstance(node, pynt.elements.Interface) and node.getMetric():
+        return node.getMetric()
+    elif isinstance(node, pynt.elements.Device):
+        return 2
+    else:
+        return 1
+
+
+class TopologySnapshot(object):
+    """Integer-indexed copy of the devices, interfaces, switch matrices and broadcast segments
+    of the network (optionally limited to a list of subject namespaces)."""
+    # Connection types, in the order in which neighbours are returned:
+    # connected:    Interface or BroadcastSegment to a (bidirectionally) connected Interface
+    # switchmatrix: Interface to its SwitchMatrix
+    # device:       Interface to its Device
+    # member:       Device, SwitchMatrix to its Interfaces
+    connectiontypes = ("connected", "switchmatrix", "device", "member")
+    nodeclasses     = (pynt.elements.ConnectionPoint, pynt.elements.Device, pynt.elements.SwitchMatrix, pynt.elements.BroadcastSegment)
+    nodes           = None  # list of node ID: RDF object
+    ids             = None  # dict of RDF object: node ID
+    offsets         = None  # dict of connection type: array of offsets into targets, with length len(nodes)+1
+    targets         = None  # dict of connection type: array of target node IDs
+    metrics         = None  # array of node ID: metric
+    capacities      = None  # array of node ID: available capacity (0.0 if the node has no capacity)
+    hascapacity     = None  # array of node ID: 1 if the node has an available capacity, 0 otherwise
+    subjects        = None  # list of XMLNamespaces, or None for all namespaces
+    metric          = None  # function returning the metric of an RDF object
+    version         = None  # topology version at the time the snapshot was taken
+    changecount     = None  # pynt.elements.changecounter at the time the metrics and capacities were compiled
+    def __init__(self, subjects=None, metric=None):
+        if isinstance(subjects, pynt.xmlns.XMLNamespace):
+            subjects = [subjects]
+        self.subjects = subjects
+        if metric == None:
+            metric = defaultNodeMetric
+        self.metric = metric
+        self.version = pynt.elements.GetTopologyVersion()
+        self.compileNodes()
+        self.compileMetrics(metric)
+        self.compileConnections()
+        logger = logging.getLogger("pynt.algorithm")
+        logger.debug("Compiled topology snapshot with %d nodes and %d connections" % (len(self.nodes), self.getConnectionCount()))
+
+    def compileNodes(self):
+        self.nodes = []
+        for klass in self.nodeclasses:
+            for node in pynt.xmlns.GetAllRDFObjects(klass=klass):
+                if (self.subjects == None) or (node.getNamespace() in self.subjects):
+                    self.nodes.append(node)
+        self.ids = {}
+        for node in self.nodes:
+            self.ids[node] = len(self.ids)
+
+    def compileMetrics(self, metric):
+        self.changecount = pynt.elements.changecounter
+        self.metrics     = array.array('d')
+        self.capacities  = array.array('d')
+        self.hascapacity = array.array('b')
+        for node in self.nodes:
+            self.metrics.append(metric(node))
+            if hasattr(node, "getAvailableCapacity"):
+                self.capacities.append(node.getAvailableCapacity() or 0.0)
+                self.hascapacity.append(1)
+            else:
+                self.capacities.append(0.0)
+                self.hascapacity.append(0)
+
+    def compileConnections(self):
+        self.offsets = {}
+        self.targets = {}
+        for connectiontype in self.connectiontypes:
+            self.offsets[connectiontype] = array.array('l', [0])
+            self.targets[connectiontype] = array.array('l')
+        for node in self.nodes:
+            neighbours = self.getLiveNeighbours(node)
+            for connectiontype in self.connectiontypes:
+                targets = self.targets[connectiontype]
+                for neighbour in neighbours.get(connectiontype, []):
+                    if neighbour in self.ids:
+                        targets.append(self.ids[neighbour])
+                self.offsets[connectiontype].append(len(targets))
+
+    def getLiveNeighbours(self, node):
+        """Return a dict of connection type: list of neighbouring RDF objects, as found in the
+        live object graph."""
+        if isinstance(node, pynt.elements.Interface):
+            connected = []
+            for intf in node.getConnectedInterfacesOnly():
+                if node in intf.getConnectedInterfaces():
+                    connected.append(intf)
+            neighbours = {"connected": connected, "device": [node.getDevice()]}
+            if node.getSwitchMatrix():
+                neighbours["switchmatrix"] = [node.getSwitchMatrix()]
+            return neighbours
+        elif isinstance(node, pynt.elements.SwitchMatrix):
+            return {"member": node.getInterfaces()}
+        elif isinstance(node, pynt.elements.Device):
+            return {"member": node.getNativeInterfaces()}
+        elif isinstance(node, pynt.elements.BroadcastSegment):
+            connected = []
+            for intf in node.getConnectedInterfaces():
+                if node in intf.getConnectedInterfaces():
+                    connected.append(intf)
+            return {"connected": connected}
+        return {}
+
+    def isCurrent(self):
+        """Return True if no network element changed since the snapshot was taken (or since
+        the last update())."""
+        return self.isTopologyCurrent() and (self.changecount == pynt.elements.changecounter)
+
+    def isTopologyCurrent(self):
+        """Return True if the topology did not change since the snapshot was taken. The
+        metrics and available capacities may still have changed."""
+        return self.version == pynt.elements.GetTopologyVersion()
+
+    def update(self):
+        """Recompute the metrics and available capacities if network elements changed. Returns
+        False if the topology changed, in which case a new snapshot must be taken."""
+        if not self.isTopologyCurrent():
+            return False
+        if self.changecount != pynt.elements.changecounter:
+            self.compileMetrics(self.metric)
+        return True
+
+    def getNodeId(self, node):
+        """Return the node ID of an RDF object, or None if it is not part of the snapshot."""
+        return self.ids.get(node)
+    def getNode(self, nodeid):
+        """Return the RDF object with the given node ID."""
+        return self.nodes[nodeid]
+    def __len__(self):
+        return len(self.nodes)
+    def __contains__(self, node):
+        return node in self.ids
+
+    def getConnectionCount(self):
+        count = 0
+        for targets in self.targets.values():
+            count += len(targets)
+        return count
+
+    def getNeighbourIds(self, nodeid):
+        """Return the node IDs of the neighbours of a node ID, for all connection types."""
+        result = []
+        for connectiontype in self.connectiontypes:
+            offsets = self.offsets[connectiontype]
+            result.extend(self.targets[connectiontype][offsets[nodeid]:offsets[nodeid+1]])
+        return result
+
+    def getNeighbours(self, node):
+        """Return the neighbouring RDF objects of an RDF object."""
+        nodeid = self.ids.get(node)
+        if nodeid == None:
+            return []
+        return [self.nodes[neighbour] for neighbour in self.getNeighbourIds(nodeid)]
+
+    def shortestPathTree(self, source, target=None, bandwidth=None, bannededges=None, bannednodes=None):
+        """Dijkstra's algorithm on the snapshot, with the same metric as Dijkstra.getMetric():
+        the sum of the metrics of both nodes, and no connection to or from a node with less
+        available capacity than bandwidth. Takes and returns RDF objects, like
+        Dijkstra.shortestPathTree(): a tuple (metrics, predecessors), both dicts with RDF
+        objects as keys."""
+        sourceid = self.ids.get(source)
+        if sourceid == None:
+            return ({source: 0}, {source: None})
+        targetid = self.ids.get(target, -1)
+        skipnodes = set()
+        for node in bannednodes or ():
+            if node in self.ids:
+                skipnodes.add(self.ids[node])
+        skipedges = set()
+        for (node1, node2) in bannededges or ():
+            if (node1 in self.ids) and (node2 in self.ids):
+                skipedges.add((self.ids[node1], self.ids[node2]))
+        usable = None
+        if bandwidth:
+            usable = array.array('b', [1]) * len(self.nodes)
+            for nodeid in xrange(len(self.nodes)):
+                if self.hascapacity[nodeid] and (self.capacities[nodeid] < bandwidth):
+                    usable[nodeid] = 0
+            if not usable[sourceid]:
+                return ({source: 0}, {source: None})
+        nodemetrics = self.metrics
+        adjacency = [(self.offsets[connectiontype], self.targets[connectiontype]) for connectiontype in self.connectiontypes]
+        metrics = {sourceid: 0}
+        predecessors = {sourceid: -1}
+        counter = 0
+        q = [(0, counter, sourceid)]
+        visited = set()
+        while q:
+            (cost, c, v1) = heapq.heappop(q)
+            if v1 in visited:
+                continue
+            visited.add(v1)
+            if v1 == targetid:
+                break
+            for (offsets, targets) in adjacency:
+                for i in xrange(offsets[v1], offsets[v1+1]):
+                    v2 = targets[i]
+                    if (v2 in visited) or (v2 in skipnodes) or ((v1, v2) in skipedges):
+                        continue
+                    if (usable != None) and not usable[v2]:
+                        continue
+                    m = cost + nodemetrics[v1] + nodemetrics[v2]
+                    if (v2 not in metrics) or (m < metrics[v2]):
+                        metrics[v2] = m
+                        predecessors[v2] = v1
+                        counter += 1
+                        heapq.heappush(q, (m, counter, v2))
+        nodes = self.nodes
+        resultmetrics = {}
+        resultpredecessors = {}
+        for (nodeid, metric) in metrics.iteritems():
+            resultmetrics[nodes[nodeid]] = metric
+            previd = predecessors[nodeid]
+            if previd < 0:
+                resultpredecessors[nodes[nodeid]] = None
+            else:
+                resultpredecessors[nodes[nodeid]] = nodes[previd]
+        return (resultmetrics, resultpredecessors)
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""Table of expanded states for the breadth first search algorithms. A state is the situation
+at the end of a path: the connection point, the allowed next directions, and the adaptation
+stack (the layers, adaptations and the remaining label sets).
+
+A state A dominates state B if it is at the same connection point with the same stack layout,
+each label set of B is a subset of the label set of A, and the metric of A is equal or lower.
+Any extension of B is then also possible for A, at the same or lower cost, so B does not have
+to be examined.
+
+Note that the loop checks of the algorithms (see BaseAlgorithm.channelsAvailable()) look at
+the history of a path, not only at it's state. Pruning dominated paths may thus remove some
+alternative paths (like PFShortestPathOnce does for switch matrices)."""
+
+# local modules
+import pynt.paths
+
+
+def stateKey(path):
+    """Return the hashable part of the state of the end of the path: the connection point,
+    the allowed next directions, and the layer, adaptation function and interface count of
+    each layer in the stack. The label sets are not part of the key."""
+    lasthop = path.getLastHop()
+    directions = lasthop.getPreviousConnection().nextdirection
+    if isinstance(directions, pynt.paths.Direction):
+        directions = [directions]
+    layers = []
+    for layerprop in lasthop.getStack():
+        layers.append((layerprop.layer, layerprop.adaptationfunction, layerprop.interfacecount))
+    return (lasthop.getConnectionPoint(), tuple(directions), tuple(layers))
+
+
+class StateTable(object):
+    """Table of expanded states. For each state key (see stateKey()), it keeps a list of
+    (stack, metric) tuples of expanded paths, with only the non-dominated states.
+    Stacks are stored without copying them, since the stack of a Hop is not modified once
+    the path is extended (see BaseAlgorithm.createHop())."""
+    states      = None  # dict of state key: list of (Stack, metric)
+    def __init__(self):
+        self.states = {}
+
+    def isDominated(self, path):
+        """Return True if the state at the end of the path is dominated by an expanded state."""
+        stack  = path.getStack()
+        metric = path.getMetric()
+        for (expandedstack, expandedmetric) in self.states.get(stateKey(path), []):
+            if (expandedmetric <= metric) and stack.issubset(expandedstack):
+                return True
+        return False
+
+    def add(self, path):
+        """Record the state at the end of the path as expanded. States which are dominated by
+        this state are removed."""
+        key    = stateKey(path)
+        stack  = path.getStack()
+        metric = path.getMetric()
+        remaining = []
+        for (expandedstack, expandedmetric) in self.states.get(key, []):
+            if not ((metric <= expandedmetric) and expandedstack.issubset(stack)):
+                remaining.append((expandedstack, expandedmetric))
+        remaining.append((stack, metric))
+        self.states[key] = remaining
+
+    def clear(self):
+        self.states = {}
+
+    def __len__(self):
+        count = 0
+        for states in self.states.values():
+            count += len(states)
+        return count
@@ -11,8 +11,56 @@ import pynt.layers
 import pynt.logger
 
 
+# The topology version is increased after each change in the topology: switchedTo, connectedTo, 
+# linkedTo, adaptations, switch matrices or labels of connection points. Algorithms can use it 
+# to detect that cached results are no longer valid.
+topologyversion = 0
+# The namespace version is increased after each change of an element in that namespace: topology 
+# changes, but also changes in available capacity or domain membership. Algorithms which cache 
+# results per domain can use it to only invalidate results of the changed domain.
+changecounter = 0
+namespaceversions = {}  # dict of XMLNamespace: value of changecounter at the last change
+changelisteners = []    # list of functions, called as listener(element, capacity) after each change
+
+def TopologyChanged(element=None):
+    """Increase the topology version. Call this after each change of the topology."""
+    global topologyversion
+    topologyversion += 1
+    if element != None:
+        ElementChanged(element)
+
+def GetTopologyVersion():
+    return topologyversion
+
+def ElementChanged(element, capacity=False):
+    """Increase the version of the namespace of the element. Call this after each change of 
+    the element which may change path finding results. Set capacity to True if only the 
+    (available) capacity of the element changed."""
+    global changecounter
+    changecounter += 1
+    namespaceversions[element.getNamespace()] = changecounter
+    for listener in changelisteners:
+        listener(element, capacity)
+
+def GetNamespaceVersion(namespace):
+    return namespaceversions.get(namespace, 0)
+
+def AddChangeListener(listener):
+    """Call listener(element, capacity) after each change of an element (see ElementChanged)."""
+    if listener not in changelisteners:
+        changelisteners.append(listener)
+
+def RemoveChangeListener(listener):
+    if listener in changelisteners:
+        changelisteners.remove(listener)
+
+
 class NetworkElement(pynt.xmlns.RDFObject):
     """A network element; an RDF object representing a part of a physical network."""
+    __slots__ = (
+        'location',     # Location object or None
+        'logger',
+    )
     def __init__(self, identifier, namespace):
         # WARNING: A RDFObject should always be created using a [Get]CreateRDFObject() function
         # The init function must never create any other RDFObjects, even not indirectly
@@ -46,25 +94,12 @@ class ConnectionPoint(NetworkElement):
     
     Note if you want to create an Interface, use GetCreateConnectionPoint or 
     use the getCreateNativeInterface function of the relevant device."""
-    prefix              = ""    # string                           TODO: get rid of these?
-    blade               = 0     # int                              TODO: get rid of these?
-    port                = 0     # int                              TODO: get rid of these?
-    metric              = None
-    teaddress           = None
-    layer               = None  # Layer object or None (unknown)
-    device              = None  # parent device or None (unknown)
-    
     actual              = False # signifies that the CP has actual values associated with it. Opposite of potential.
     removable           = False # signifies that the CP may be marked as configued, and can be removed.
     configurable        = False # signifies that the CP has multiple values, one of them that can be picked.
     potential           = False # signifies that the CP is not "real", but one or more can be instantiated. Opposite of actual.
     ismultiple          = False # True if this one object (can) represent(s) multiple connection points
     
-    capacity                = None  # float (in Mbyte/s) or None (unknown)
-    maximumReservableCapacity = None
-    minimumReservableCapacity = None
-    granularity               = None
-    
     #                       actual      removable  configurable  potential  ismultiple
     # Interface               +           -           ?           -           -
     # StaticInterface         +           -           -           -           -
@@ -72,55 +107,110 @@ class ConnectionPoint(NetworkElement):
     # PotentialInterface      -           ?           +           +           -
     # InstantiatedInterface   +           +           -           -           -
     
-    clientadaptations   = None  # dict of adaptation instances, indexed by AdaptationFunction. 
-    serveradaptations   = None  # dict of adaptation instances, indexed by AdaptationFunction. 
-    # Only one interface in the list of adaptations may point to actual (non-potential) interfaces.
-    
-    linkedInterfaces    = None  # list of linkTo interfaces (currently: one at most)
-    linkedSegment       = None  # linkTo broadcast segment
-    connectedInterfaces = None  # connectedTo interfaces (excluding linked interfaces)
-    switchedInterfaces  = None  # switchedTo interfaces (excluding packetSwitched and circuitSwitched interfaces)
-    packetSwtInterfaces = None  # packetSwitchedTo interfaces
-    circuitSwtInterfaces = None # circuitSwitchedTo interfaces
-    switchmatrix        = None  # switchmatrix (for now, only one.)
-
-    properties          = None  # mapping of proptypes to propvalues
+    # Most connection points have no connections of a given type. The attributes with lists
+    # of interfaces are the empty tuple until the first interface is added, and the dicts are
+    # the shared pynt.xmlns.emptydict, so the millions of logical interfaces of a large network
+    # do not each allocate a list or dict per connection type.
+    __slots__ = (
+        'prefix',               # string                           TODO: get rid of these?
+        'blade',                # int                              TODO: get rid of these?
+        'port',                 # int                              TODO: get rid of these?
+        'metric',
+        'teaddress',
+        'layer',                # Layer object or None (unknown)
+        'device',               # parent device or None (unknown)
+        'capacity',             # float (in Mbyte/s) or None (unknown)
+        'maximumReservableCapacity',
+        'minimumReservableCapacity',
+        'granularity',
+        'clientadaptations',    # dict of adaptation instances, indexed by AdaptationFunction. 
+        'serveradaptations',    # dict of adaptation instances, indexed by AdaptationFunction. 
+        # Only one interface in the list of adaptations may point to actual (non-potential) interfaces.
+        'linkedInterfaces',     # list of linkTo interfaces (currently: one at most)
+        'linkedSegment',        # linkTo broadcast segment
+        'connectedInterfaces',  # connectedTo interfaces (excluding linked interfaces)
+        'switchedInterfaces',   # switchedTo interfaces (excluding packetSwitched and circuitSwitched interfaces)
+        'packetSwtInterfaces',  # packetSwitchedTo interfaces
+        'circuitSwtInterfaces', # circuitSwitchedTo interfaces
+        'switchFromInterfaces', # sources of switchedTo with self as sink
+        'switchmatrix',         # switchmatrix (for now, only one.)
+        'properties',           # mapping of proptypes to propvalues
+    )
     
     def __init__(self, identifier, namespace):
         # WARNING: A RDFObject should always be created using a [Get]CreateRDFObject() function
         # The init function must never create any other RDFObjects, even not indirectly
         NetworkElement.__init__(self, identifier=identifier, namespace=namespace)
-        # list of interfaces. We MUST create the new lists here, not above, otherwise
-        # each interface will share the same list instance.
-        self.clientadaptations   = {}   # adaptation towards the client layer (towards the internal switchmatrix)
-        self.serveradaptations   = {}   # adaptation towards the server layer (towards the external linkTo)
-        self.linkedInterfaces    = []  # linkTo interfaces
-        self.linkedSegment       = None  # linkTo broadcast segment
-        self.connectedInterfaces = []  # connectedTo interfaces
-        self.switchedInterfaces  = []  # switchedTo interfaces
-        self.packetSwtInterfaces = []  # packetSwitchedTo interfaces
-        self.circuitSwtInterfaces = []  # circuitSwitchedTo interfaces
-        self.switchFromInterfaces = []  # sources of switchedTo with self as sink
+        self.prefix              = ""
+        self.blade               = 0
+        self.port                = 0
+        self.metric              = None
+        self.teaddress           = None
+        self.layer               = None
+        self.device              = None
+        self.capacity            = None
+        self.maximumReservableCapacity = None
+        self.minimumReservableCapacity = None
+        self.granularity         = None
+        # The lists and dicts are created when the first item is added (see addToList() and getWritableDict()).
+        self.clientadaptations   = pynt.xmlns.emptydict # adaptation towards the client layer (towards the internal switchmatrix)
+        self.serveradaptations   = pynt.xmlns.emptydict # adaptation towards the server layer (towards the external linkTo)
+        self.linkedInterfaces    = ()   # linkTo interfaces
+        self.linkedSegment       = None # linkTo broadcast segment
+        self.connectedInterfaces = ()   # connectedTo interfaces
+        self.switchedInterfaces  = ()   # switchedTo interfaces
+        self.packetSwtInterfaces = ()   # packetSwitchedTo interfaces
+        self.circuitSwtInterfaces = ()  # circuitSwitchedTo interfaces
+        self.switchFromInterfaces = ()  # sources of switchedTo with self as sink
         self.namespace.networkschema = True
-        self.properties = {}
+        self.properties = pynt.xmlns.emptydict
         self.switchmatrix = None
     
+    def addToList(self, attribute, interface):
+        """Append interface to the list in the given attribute, replacing the empty tuple by 
+        a new list if this is the first interface."""
+        interfaces = getattr(self, attribute)
+        if not interfaces:
+            interfaces = []
+            setattr(self, attribute, interfaces)
+        interfaces.append(interface)
+    
+    def getWritableDict(self, attribute):
+        """Return the dict in the given attribute, replacing the shared pynt.xmlns.emptydict 
+        by a new dict if it does not have any items yet."""
+        items = getattr(self, attribute)
+        if items is pynt.xmlns.emptydict:
+            items = {}
+            setattr(self, attribute, items)
+        return items
+    
     def isConfigured(self):                         return self.removable
     def isPotential(self):                          return self.potential
     
     def setPrefix(self,prefix):                     self.prefix   = str(prefix)
     def setBlade(self,blade):                       self.blade    = int(blade)
     def setPort(self,port):                         self.port     = int(port)
-    def setMetric(self,metric):                     self.metric = int(metric)
+    def setMetric(self,metric):
+        self.metric = int(metric)
+        ElementChanged(self)
     def setTEAddress(self, teaddress):              self.teaddress = teaddress
-    def setCapacity(self, capacity):                self.capacity       = float(capacity)
-    def setMaximumReservableCapacity(self,maximumReservableCapacity):   self.maximumReservableCapacity = float(maximumReservableCapacity)
-    def setMinimumReservableCapacity(self,minimumReservableCapacity):   self.minimumReservableCapacity = float(minimumReservableCapacity)
-    def setGranularity(self,granularity):           self.granularity = float(granularity)
+    def setCapacity(self, capacity):
+        self.capacity       = float(capacity)
+        ElementChanged(self, capacity=True)
+    def setMaximumReservableCapacity(self,maximumReservableCapacity):
+        self.maximumReservableCapacity = float(maximumReservableCapacity)
+        ElementChanged(self, capacity=True)
+    def setMinimumReservableCapacity(self,minimumReservableCapacity):
+        self.minimumReservableCapacity = float(minimumReservableCapacity)
+        ElementChanged(self, capacity=True)
+    def setGranularity(self,granularity):
+        self.granularity = float(granularity)
+        ElementChanged(self, capacity=True)
     
     def setLayer(self,layer):
         assert(isinstance(layer, pynt.layers.Layer))
         self.layer = layer
+        TopologyChanged(self)
         # TODO: check if labels and labelsets are allowed with this new layer.
         # TODO: check if layer used to be something different.
     def setDevice(self, device):
@@ -164,7 +254,7 @@ class ConnectionPoint(NetworkElement):
         # for reference: type of objectvalue is either rdflib.Literal.Literal or rdflib.URIRef.URIRef 
         # FIXME: check for property existing for layer
         self.logger.debug("Setting property for %s to %s" % (identifier, value))
-        self.properties[str(identifier)] = value
+        self.getWritableDict('properties')[str(identifier)] = value
     def getProperty(self, identifier):
         """Looks for the identifier (for example egressStatus) in the list of
            properties and returns the value for the property. There are two
@@ -221,8 +311,9 @@ class ConnectionPoint(NetworkElement):
                     % (interface.getName(), self.getName(), currentAdaptation))
         adaptation.addServerInterface(self)
         adaptation.addClientInterface(interface)
-        self.clientadaptations[adaptationfunction] = adaptation
-        interface.serveradaptations[adaptationfunction] = adaptation
+        self.getWritableDict('clientadaptations')[adaptationfunction] = adaptation
+        interface.getWritableDict('serveradaptations')[adaptationfunction] = adaptation
+        TopologyChanged(self)
         #print "-> created adaptation %s" % adaptation
     def removeClientInterface(self, interface, adaptationfunction):
         """Remove a logical interface as a channel from the current interace"""
@@ -243,6 +334,7 @@ class ConnectionPoint(NetworkElement):
         if removeserver:
             adaptation.removeServerInterface(self)
             del self.clientadaptations[adaptationfunction]
+        TopologyChanged(self)
         # If all went well, we have no dangling adaptations.
         assert(adaptation.allServerInterfaceCount() + adaptation.allClientInterfaceCount() != 1)
     def addServerInterface(self, interface, adaptationfunction):
@@ -382,7 +474,7 @@ class ConnectionPoint(NetworkElement):
         """Return all linkedTo interface, either described by a linkedTo to an Interface or a 
         linkedTo via a broadcast segment"""
         if self.linkedSegment:
-            interfaces = self.linkedInterfaces[:]  # make a copy, as we modify the list
+            interfaces = list(self.linkedInterfaces)  # make a copy, as we modify the list
             interfaces.extend(self.linkedSegment.getOtherInterfaces(self))
             return interfaces
         else:
@@ -398,7 +490,7 @@ class ConnectionPoint(NetworkElement):
     
     def getConnectedInterfaces(self):
         """Return all connectedTo Interfaces, including linkedTo"""
-        interfaces =  self.connectedInterfaces[:]  #make a copy
+        interfaces =  list(self.connectedInterfaces)  #make a copy
         interfaces.extend(self.getLinkedInterfaces())
         return interfaces
     
@@ -416,7 +508,8 @@ class ConnectionPoint(NetworkElement):
                 raise pynt.ConsistencyException(("Can not link interface %s to %s: that interface is already linkedTo %s. " \
                         "While this is technically possible (unidirectional traffic), we do not recommend it now.") \
                         % (interface.getName(), self.getName(), interface.linkedInterfaces[0].getName()))
-            self.linkedInterfaces.append(interface)
+            self.addToList('linkedInterfaces', interface)
+            TopologyChanged(self)
     
     def addConnectedInterface(self, interface):
         assert(self.actual)  # only actual (not potential) interfaces can have connections
@@ -426,7 +519,8 @@ class ConnectionPoint(NetworkElement):
             self.logger.warning("Connecting interface %s to %s: non matching layers %s and %s." \
                     % (interface.getName(), self.getName(), interface.getLayer(), self.getLayer()))
         if not interface in self.connectedInterfaces:
-            self.connectedInterfaces.append(interface)
+            self.addToList('connectedInterfaces', interface)
+            TopologyChanged(self)
     
     def getActualSwitchedInterfaces(self, bidirectional=False):
         """Return all actual switched interfaces, including packet and circuit switched interfaces, and those 
@@ -442,14 +536,14 @@ class ConnectionPoint(NetworkElement):
     def getDirectlySwitchedInterfaces(self):
         """Return explicitly configured switched interfaces, including packet and circuit switched interfaces, 
         but excluding implicit switches, as defined in the switch matrix."""
-        interfaces = self.switchedInterfaces[:]
+        interfaces = list(self.switchedInterfaces)
         interfaces.extend(self.packetSwtInterfaces)
         interfaces.extend(self.circuitSwtInterfaces)
         return interfaces
     
     def getSwitchSourceInterfaces(self):
         """Return the source interface(s) which is crossed to this interface."""
-        return self.switchFromInterfaces[:]  # make a copy
+        return list(self.switchFromInterfaces)  # make a copy
     
     def getPotentialSwitchedInterfaces(self, bidirectional=False, honourlabel=False):
         """Return all possible switched interfaces, by quering the switchmatrix"""
@@ -474,6 +568,7 @@ class ConnectionPoint(NetworkElement):
                     "to switch matrix %s.") % (switchmatrix.getName(), self.getName(), self.switchmatrix.getName()))
         self.switchmatrix = switchmatrix
         switchmatrix.addInterface(self)
+        TopologyChanged(self)
     
     def getSwitchMatrix(self):
         return self.switchmatrix
@@ -508,28 +603,32 @@ class ConnectionPoint(NetworkElement):
                 self.logger.debug("Skip making switchTo from %s to %s: switch already implicitly exists." \
                         % self, interface)
                 return
-        self.switchedInterfaces.append(interface)
-        interface.switchFromInterfaces.append(self)
+        self.addToList('switchedInterfaces', interface)
+        interface.addToList('switchFromInterfaces', self)
+        TopologyChanged(self)
         try:
             if bidirectional and self not in interface.switchedInterfaces:
                 interface.addSwitchedInterface(self, bidirectional=bidirectional)
         except pynt.ConsistencyException:
             self.switchedInterfaces.remove(interface)
             interface.switchFromInterfaces.remove(self)
+            TopologyChanged(self)
             raise
     def addPacketSwitchedInterface(self, interface):
         if self.getLayer() != interface.getLayer():
             raise pynt.ConsistencyException("Can not switch interface %s to %s: non matching layers %s and %s." \
                     % (interface.getName(), self.getName(), interface.getLayer(), self.getLayer()))
         if not interface in self.packetSwtInterfaces:
-            self.packetSwtInterfaces.append(interface)
+            self.addToList('packetSwtInterfaces', interface)
+            TopologyChanged(self)
     
     def addCircuitSwitchedInterface(self, interface):
         if self.getLayer() != interface.getLayer():
             raise pynt.ConsistencyException("Can not switch interface %s to %s: non matching layers %s and %s." \
                     % (interface.getName(), self.getName(), interface.getLayer(), self.getLayer()))
         if not interface in self.circuitSwtInterfaces:
-            self.circuitSwtInterfaces.append(interface)
+            self.addToList('circuitSwtInterfaces', interface)
+            TopologyChanged(self)
     
     def getCreateAdaptationInterface(self, klass, identifier="", namespace=None, name="", identifierappend="", nameappend=""):
         """Create a new logical interface instance, with the properties inhereted from this interface, 
@@ -623,19 +722,28 @@ class ConnectionPoint(NetworkElement):
 
 # Note that all these mix-in MUST NOT OVERLAP, unless you know what you are doing: 
 # The ConfigurableInterface is a subclass of all 4 MixIns, and clashes must be prevented.
+# 
+# The mix-ins have no __slots__ of their own (multiple bases with slots can not be combined), 
+# and no class attributes either, since those would hide the slots of the connection point 
+# classes. The attributes are set in __init__, and are slots of the classes that use the 
+# mix-ins (see Interface, ConfigurableInterface and PotentialMuxInterface).
 
 class SingleLabelCPMixIn(object):
     """Mix-in for a connection point with a single label. Either for a static, instantiated or configurable interface."""
-    layer                   = None  # used to find label type (int, float, ...)
+    __slots__ = ()
+    # layer                         # used to find label type (int, float, ...)
     #hasinternallabel        = None  # None = unknown (use layer and switch matrix to determine), False = no, True = yes
-    hasexternallabel        = None  # None = unknown (use adaptation to determine), False = no, True = yes
+    # hasexternallabel              # None = unknown (use adaptation to determine), False = no, True = yes
     #labelvalue              = None  # label, used to identify channels in multiplexing.
-    ingresslabel            = None  # label used to signify traffic on an outgoing interface. subproperty of labelvalue.
-    egresslabel             = None  # label used to signify traffic received on an interface. subproperty of labelvalue.
+    # ingresslabel                  # label used to signify traffic on an outgoing interface. subproperty of labelvalue.
+    # egresslabel                   # label used to signify traffic received on an interface. subproperty of labelvalue.
     # internal label needs to be replaced by ingress/egress label
-    internallabel           = None  # label used to determine switching/swapping possibilities. subproperty of labelvalue.
+    # internallabel                 # label used to determine switching/swapping possibilities. subproperty of labelvalue.
     def __init__(self):
-        pass
+        self.hasexternallabel   = None
+        self.ingresslabel       = None
+        self.egresslabel        = None
+        self.internallabel      = None
     def hasExternalLabel(self):
         # NOTE: same function as MultiLabelCPMixIn.hasExternalLabel(). If you change this function, also change that one.
         if self.hasexternallabel != None:
@@ -650,6 +758,10 @@ class SingleLabelCPMixIn(object):
         return True
     def setHasExternalLabel(self, boolean):
         self.hasexternallabel = bool(boolean)
+        self.labelsChanged()
+    def labelsChanged(self):
+        """Called after each change of the labels."""
+        TopologyChanged(self)
     def getLabelTypeAndInterval(self):
         """Use the layer to return the tuplet (type, interval)"""
         if self.layer:
@@ -692,18 +804,21 @@ class SingleLabelCPMixIn(object):
             raise pynt.ConsistencyException(("Can not set internal label of configurable interface %s to %s, " \
                     "as this value is not part of the internal labelset %s") % (self, labelvalue, self.getLabelSet()))
         self.internallabel     = labelvalue
+        self.labelsChanged()
     def setIngressLabel(self, labelvalue):
         assert(not isinstance(labelvalue, pynt.rangeset.RangeSet)), "setIngressLabel only takes primitive labels. Got %s" % labelvalue
         if not self.isAllowedIngressLabel(labelvalue):
             raise pynt.ConsistencyException(("Can not set ingress label of configurable interface %s to %s, " \
                     "as this value is not part of the ingress labelset %s") % (self, labelvalue, self.getLabelSet()))
         self.ingresslabel     = labelvalue
+        self.labelsChanged()
     def setEgressLabel(self, labelvalue):
         assert(not isinstance(labelvalue, pynt.rangeset.RangeSet)), "setEgressLabel only takes primitive labels. Got %s" % labelvalue
         if not self.isAllowedEgressLabel(labelvalue):
             raise pynt.ConsistencyException(("Can not set egress label of configurable interface %s to %s, " \
                     "as this value is not part of the egress labelset %s") % (self, labelvalue, self.getLabelSet()))
         self.egresslabel     = labelvalue
+        self.labelsChanged()
     def getLabel(self):
         if self.internallabel != None:
             return self.internallabel
@@ -790,16 +905,21 @@ class SingleLabelCPMixIn(object):
 
 class MultiLabelCPMixIn(object):
     """Mix-in for a connection point with multiple labels. Either a list of interfaces, or a potential interface."""
-    layer                   = None  # used to find label type (int, float, ...)
+    __slots__ = ()
+    # layer                         # used to find label type (int, float, ...)
     #hasinternallabel        = None  # None = unknown (use layer and switch matrix to determine), False = no, True = yes
-    hasexternallabel        = None  # None = unknown (use adaptation to determine), False = no, True = yes
+    # hasexternallabel              # None = unknown (use adaptation to determine), False = no, True = yes
     # internallabels is to be replaced by ingress/egress labels
-    internallabels          = None  # None means: no checking. Set to Range(None) to only allow None value.
-    ingresslabels           = None  # None means: no checking. Set to Range(None) to only allow None value.
-    egresslabels            = None  # None means: no checking. Set to Range(None) to only allow None value.
+    # internallabels                # None means: no checking. Set to Range(None) to only allow None value.
+    # ingresslabels                 # None means: no checking. Set to Range(None) to only allow None value.
+    # egresslabels                  # None means: no checking. Set to Range(None) to only allow None value.
     def __init__(self):
         pynt.logger.InitLogger()
         self.logger = logging.getLogger("pynt.elements")
+        self.hasexternallabel   = None
+        self.internallabels     = None
+        self.ingresslabels      = None
+        self.egresslabels       = None
         
         # we do not set the labelvalues to an empty RangeSet, simply because we do not 
         # know the type (float, int, ...), since the layer may not be set during instantiation.
@@ -822,6 +942,10 @@ class MultiLabelCPMixIn(object):
         return True
     def setHasExternalLabel(self, boolean):
         self.hasexternallabel = bool(boolean)
+        self.labelsChanged()
+    def labelsChanged(self):
+        """Called after each change of the labels."""
+        TopologyChanged(self)
     def getLabelTypeAndInterval(self):
         """Use the layer to return the tuplet (type, interval)"""
         # TODO: Use layer
@@ -1000,6 +1124,7 @@ class MultiLabelCPMixIn(object):
             self.internallabels = None
         else:
             self.internallabels = labelvalues.copy()
+        self.labelsChanged()
         if hasattr(self,"internallabel") and not self.isAllowedInternalLabel(self.internallabel):
             # TODO: This should be a check beforehand with ConsistencyException
             self.logger.error("Internal label %s of interface %s is not allowed after setting the labelset to %s" % (self.internallabel, self.getURIdentifier(), self.internallabels))
@@ -1013,6 +1138,7 @@ class MultiLabelCPMixIn(object):
             self.ingresslabels = None
         else:
             self.ingresslabels = labelvalues.copy()
+        self.labelsChanged()
         if hasattr(self,"ingresslabel") and not self.isAllowedInternalLabel(self.ingresslabel):
             # TODO: This should be a check beforehand with ConsistencyException
             self.logger.error("Ingress label %s of interface %s is not allowed after setting the labelset to %s" % (self.ingresslabel, self.getURIdentifier(), self.ingresslabels))
@@ -1025,6 +1151,7 @@ class MultiLabelCPMixIn(object):
             self.egresslabels = None
         else:
             self.egresslabels = labelvalues.copy()
+        self.labelsChanged()
         if hasattr(self,"egresslabel") and not self.isAllowedInternalLabel(self.egresslabel):
             # TODO: This should be a check beforehand with ConsistencyException
             self.logger.error("Egress label %s of interface %s is not allowed after setting the labelset to %s" % (self.egresslabel, self.getURIdentifier(), self.egresslabels))
@@ -1063,6 +1190,7 @@ class MultiLabelCPMixIn(object):
 
 class NoLabelCPMixIn(object):
     """Mix-in for a connection point without associated labels. Defines default functions."""
+    __slots__ = ()
     def __init__(self):
         pass
     def setLabel(self, labelvalue):
@@ -1092,17 +1220,21 @@ class SinglePropertyCPMixIn(object):
     """A list of values of properties. Specified in the context of a acutal Connection Point.
     The types are now fixed, but should be dynamic, based upon the properties of a specfic layer 
     (see the properties attribute in the Layer object for details)"""
-    layer                   = None
+    __slots__ = ()
     # NOTE: capacity will be moved to properties/potentialproperties
-    ingressBandwidth        = None  # float (in Mbyte/s) or None (unknown)
-    egressBandwidth         = None  # float (in Mbyte/s) or None (unknown)
-    availableCapacity       = None
+    # ingressBandwidth              # float (in Mbyte/s) or None (unknown)
+    # egressBandwidth               # float (in Mbyte/s) or None (unknown)
+    # availableCapacity
     # TODO: make this generic; in particular, use the layer properties.
     def __init__(self):
-        pass
+        self.ingressBandwidth   = None
+        self.egressBandwidth    = None
+        self.availableCapacity  = None
     def setIngressBandwidth(self,ingressBandwidth): self.ingressBandwidth = float(ingressBandwidth)
     def setEgressBandwidth(self, egressBandwidth):  self.egressBandwidth  = float(egressBandwidth)
-    def setAvailableCapacity(self, available):      self.availableCapacity = float(available)
+    def setAvailableCapacity(self, available):
+        self.availableCapacity = float(available)
+        ElementChanged(self, capacity=True)
     def getIngressBandwidth(self):                  return self.ingressBandwidth
     def getEgressBandwidth(self):                   return self.egressBandwidth
     def getAvailableCapacity(self):                 return self.availableCapacity
@@ -1115,10 +1247,10 @@ class MultiPropertyCPMixIn(object):
     The types are now fixed, but should be dynamic, based upon the properties of a specfic layer 
     (see the properties attribute in the Layer object for details)"""
     # TODO: implement as described.
-    layer                   = None
-    allowedcapacities       = None
+    __slots__ = ()
+    # allowedcapacities
     def __init__(self):
-        pass
+        self.allowedcapacities  = None
     def setMultiPropertyValuesFromCP(self, cp):
         """Copy the values from the given connection point to self"""
         if cp.configurable:
@@ -1146,6 +1278,17 @@ class Interface(SingleLabelCPMixIn, SinglePropertyCPMixIn, ConnectionPoint):
     configurable        = False # signifies that the CP has multiple values, one of them that can be picked.
     potential           = False # signifies that the CP is not "real", but one or more can be instantiated.
     ismultiple          = False # True if this one object (can) represent(s) multiple connection points
+    __slots__ = (
+        # SingleLabelCPMixIn
+        'hasexternallabel',
+        'ingresslabel',
+        'egresslabel',
+        'internallabel',
+        # SinglePropertyCPMixIn
+        'ingressBandwidth',
+        'egressBandwidth',
+        'availableCapacity',
+    )
     
     def __init__(self, identifier, namespace):
         # WARNING: A RDFObject should always be created using a [Get]CreateRDFObject() function
@@ -1216,6 +1359,14 @@ class ConfigurableInterface(MultiLabelCPMixIn, MultiPropertyCPMixIn, Interface):
     configurable        = True  # signifies that the CP has multiple values, one of them that can be picked.
     potential           = False # signifies that the CP is not "real", but one or more can be instantiated.
     ismultiple          = False # True if this one object (can) represent(s) multiple connection points
+    __slots__ = (
+        # MultiLabelCPMixIn (hasexternallabel is a slot of Interface)
+        'internallabels',
+        'ingresslabels',
+        'egresslabels',
+        # MultiPropertyCPMixIn
+        'allowedcapacities',
+    )
     def __init__(self, identifier, namespace):
         ConnectionPoint.__init__(self, identifier=identifier, namespace=namespace)
         SingleLabelCPMixIn.__init__(self)
@@ -1232,6 +1383,15 @@ class PotentialMuxInterface(MultiLabelCPMixIn, MultiPropertyCPMixIn, ConnectionP
     configurable        = True  # signifies that the CP has multiple values, one of them that can be picked.
     potential           = True  # signifies that the CP is not "real", but one or more can be instantiated.
     ismultiple          = True  # True if this one object (can) represent(s) multiple connection points
+    __slots__ = (
+        # MultiLabelCPMixIn
+        'hasexternallabel',
+        'internallabels',
+        'ingresslabels',
+        'egresslabels',
+        # MultiPropertyCPMixIn
+        'allowedcapacities',
+    )
     def __init__(self, identifier, namespace):
         ConnectionPoint.__init__(self, identifier=identifier, namespace=namespace)
         MultiLabelCPMixIn.__init__(self)
@@ -1805,6 +1965,7 @@ class SwitchMatrix(NetworkElement):
     def setLayer(self, layer):
         assert(isinstance(layer, pynt.layers.Layer))
         self.layer = layer
+        TopologyChanged(self)
     def setDevice(self, device):
         if self.device not in [device, None]:
             raise pynt.ConsistencyException("SwitchMatrix %s is part of Device %s. Can not add it to Device %s" \
@@ -1814,10 +1975,15 @@ class SwitchMatrix(NetworkElement):
         if self not in device.getSwitchMatrices():
             device.addSwitchMatrix(self)
     
-    def setSwitchingCapability(self, switchingcapability):  self.hasswitchingcapability = bool(switchingcapability)
-    def setSwappingCapability(self, swappingcapability):    self.hasswappingcapability  = bool(swappingcapability)
+    def setSwitchingCapability(self, switchingcapability):
+        self.hasswitchingcapability = bool(switchingcapability)
+        TopologyChanged(self)
+    def setSwappingCapability(self, swappingcapability):
+        self.hasswappingcapability  = bool(swappingcapability)
+        TopologyChanged(self)
     def setUnicast(self, unicast=True):
         self.hasunicast = bool(unicast)
+        TopologyChanged(self)
         if self.hasunicast and self.hasbroadcast:
             self.logger.warning("Setting broadcast of SwitchMatrix %s to False, as unicast is set to True" % self.getName())
             self.hasbroadcast = False
@@ -1826,11 +1992,13 @@ class SwitchMatrix(NetworkElement):
             self.hasmulticast = False
     def setMulticast(self, multicast=True):
         self.hasmulticast = bool(multicast)
+        TopologyChanged(self)
         if self.hasmulticast and not self.hasunicast:
             self.logger.warning("Setting broadcast of SwitchMatrix %s to False, as unicast is set to True" % self.getName())
             self.hasunicast = True
     def setBroadcast(self, broadcast=True):
         self.hasbroadcast = bool(broadcast)
+        TopologyChanged(self)
         if self.hasbroadcast and (self.hasunicast or self.hasmulticast):
             self.logger.warning("Setting unicast of SwitchMatrix %s to False, as broadcast is set to True" % self.getName())
             self.hasunicast = False
@@ -2150,6 +2318,7 @@ class BroadcastSegment(NetworkElement):
         if interface in self.interfaces:
             self.interfaces.remove(interface)
         interface.linkedSegment = None
+        TopologyChanged(self)
     def addConnectedInterface(self, interface):
         if interface not in self.interfaces:
             self.interfaces.append(interface)
@@ -2161,6 +2330,7 @@ class BroadcastSegment(NetworkElement):
                     "Remove it there first." % (interface.getURIdentifier(), interface.linkedSegment.getURIdentifier()))
         if interface.linkedSegment != self:
             interface.linkedSegment = self
+        TopologyChanged(self)
     
     def getConnectedInterfaces(self):
         return self.interfaces
@@ -2214,12 +2384,14 @@ class AdminDomain(NetworkElement):
     def addDevice(self, device):
         if device not in self.devices:
             self.devices.append(device)
+            ElementChanged(self)
             self.logger.debug("Added device %s to domain %s" % (device.getName(), self.getName()))
         else:
             self.logger.warning("Device %s is already in domain %s" % (device.getName(), self.getName()))
     def removeDevice(self, device):
         if device in self.devices:
             self.devices.remove(device)
+            ElementChanged(self)
             self.logger.debug("Removed device %s from domain %s" % (device.getName(), self.getName()))
         else:
             self.logger.warning("Device %s not found in domain %s when removing device" % (device.getName(), self.getName()))
@@ -2231,6 +2403,7 @@ class AdminDomain(NetworkElement):
         logger = logging.getLogger("pynt.elements")
         if interface not in self.interfaces:
             self.interfaces.append(interface)
+            ElementChanged(self)
             self.logger.debug("Added interface %s to domain %s" % (interface.getName(), self.getName()))
         else:
             self.logger.warning("interface %s is already in domain %s" % (interface.getName(), self.getName()))
@@ -2238,6 +2411,7 @@ class AdminDomain(NetworkElement):
     def removeInterface(self, interface):
         if interface in self.interfaces:
             self.interfaces.remove(interface)
+            ElementChanged(self)
             self.logger.debug("Removed interface %s from domain %s" % (interface.getName(), self.getName()))
         else:
             self.logger.warning("Interface %s not found in domain %s when removing interface" % (interface.getName(), self.getName()))
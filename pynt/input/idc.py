@@ -211,6 +211,7 @@ def createLinks(links, multilinks=None):
         else:
             multiLinkPorts[link.port] = [link]
     links = createMultiLinkPorts(multiLinkPorts,links)
+    createLinkObjects(links)
     while links:
         (linkId,src) = links.popitem()
         if src.encodingType.lower() in "ethernet":
@@ -224,6 +225,20 @@ def createLinks(links, multilinks=None):
             raise NotImplementedError("Sorry, %s encoding is not \
                         supported at this point" % src.encodingType)
 
+def createLinkObjects(links):
+    """Create the tagged ports and switch matrices of the links, and the remote ports of 
+    unidirectional links, in bulk. createEthConnection() and createEthUniConnection() then 
+    find the existing objects."""
+    specifications = []
+    for link in links.itervalues():
+        if link.encodingType.lower() not in "ethernet":
+            continue
+        specifications.append((link.identifier, pynt.elements.PotentialMuxInterface, None))
+        specifications.append((link.port.getDevice().getIdentifier()+"_sm", pynt.elements.SwitchMatrix, None))
+        if not links.has_key(link.remoteLinkId):
+            specifications.append((link.remoteLinkId, type(link.port), None))
+    pynt.xmlns.GetCreateRDFObjects(specifications, ns)
+
 def createMultiLinkPorts(multiLinkPorts, links):
     # IDC describes:
     #            linkA
@@ -46,6 +46,7 @@ class OspfFetcher(pynt.input.BaseDeviceFetcher):
             for lsa in lsas:
                 if lsa.type == 10: self.handleAreaOpaqueLSA(lsa)
         else:
+            self.createRouterObjects(lsas)
             for lsa in lsas:
                 if   lsa.type == 1:
                     self.handleRouterLSA(lsa)
@@ -63,6 +64,41 @@ class OspfFetcher(pynt.input.BaseDeviceFetcher):
         self.createConnections(self.connections)
         
     
+    def createRouterObjects(self, lsas):
+        """Create the devices, switch matrices, interfaces and broadcast segments of all router 
+        and network LSAs in bulk. handleRouterLSA() and handleNetworkLSAs() then find the 
+        existing objects, and only need to set their properties and connections."""
+        routerLSAs = [lsa for lsa in lsas if lsa.type == 1]
+        specifications = []
+        for lsa in routerLSAs:
+            specifications.append(("dev"+lsa.getAdvertisingRouter(), pynt.technologies.ip.RouterDevice, None))
+            specifications.append(("dev"+lsa.getAdvertisingRouter()+"Switch", pynt.elements.SwitchMatrix, None))
+            for link in lsa.links:
+                if link.getType() == 1:
+                    specifications.append(("dev"+link.getLinkId(), pynt.technologies.ip.RouterDevice, None))
+                elif link.getType() == 2:
+                    specifications.append(("bc"+link.getLinkId(), pynt.elements.BroadcastSegment, None))
+                elif (link.getType() == 3) and not self._ignoreStubs:
+                    specifications.append(("stub"+link.getLinkId(), pynt.elements.BroadcastSegment, None))
+        for lsa in lsas:
+            if lsa.type == 2:
+                specifications.append(("bc"+lsa.getLinkStateId(), pynt.elements.BroadcastSegment, None))
+        pynt.xmlns.GetCreateRDFObjects(specifications, self.ns)
+        # The native interfaces are added to their device, so they are created after the devices
+        specifications = []
+        for lsa in routerLSAs:
+            dev = pynt.xmlns.GetRDFObject("dev"+lsa.getAdvertisingRouter(), self.ns)
+            for link in lsa.links:
+                if link.getType() == 1:
+                    specifications.append(("p"+lsa.getAdvertisingRouter()+"p"+link.getLinkId(), dev.nativeInterfaceClass, None, dev.setNewNativeInterfaceProperties))
+                    connectedDev = pynt.xmlns.GetRDFObject("dev"+link.getLinkId(), self.ns)
+                    specifications.append(("p"+link.getLinkId()+"p"+lsa.getAdvertisingRouter(), connectedDev.nativeInterfaceClass, None, connectedDev.setNewNativeInterfaceProperties))
+                elif link.getType() == 2:
+                    specifications.append((link.getLinkData(), dev.nativeInterfaceClass, None, dev.setNewNativeInterfaceProperties))
+                elif (link.getType() == 3) and not self._ignoreStubs:
+                    specifications.append(("stub"+lsa.getAdvertisingRouter()+"net"+link.getLinkId(), dev.nativeInterfaceClass, None, dev.setNewNativeInterfaceProperties))
+        pynt.xmlns.GetCreateRDFObjects(specifications, self.ns)
+    
     def handleRouterLSA(self, lsa):
         dev = pynt.elements.GetCreateDevice("dev"+lsa.getAdvertisingRouter(), self.ns, klass=pynt.technologies.ip.RouterDevice)
         devSwitch = pynt.elements.GetCreateSwitchMatrix("dev"+lsa.getAdvertisingRouter()+"Switch", self.ns)
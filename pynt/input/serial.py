@@ -35,5 +35,9 @@ class SerialInput(pynt.input.BaseFetcher):
             raise RuntimeWarning("pynt.xmlns.xmlnamespaces is non-empty. Overwriting old information.")
         data = pickle.load(self.io)
         pynt.xmlns.rdfobjects    = data['rdfobjects']
+        for (klass, objects) in pynt.xmlns.rdfobjects.items():
+            if isinstance(objects, list):   # written before rdfobjects contained RDFObjectSets
+                pynt.xmlns.rdfobjects[klass] = pynt.xmlns.RDFObjectSet(objects)
+        pynt.xmlns.ResetRDFViews()
         pynt.xmlns.xmlnamespaces = data['namespaces']
         self.subject                = data['subject']
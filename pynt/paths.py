@@ -6,9 +6,10 @@ The module is heavily based for use with the algorithm packages, but it should b
 In short, these objects are defined:
 
 Path: 
-    sequence of Hops
+    sequence of Hops (stored as a pointer to the last Hop)
 
 Hop:
+    previous hop
     connection point
     connection (from previous hop to this hop)
     stack
@@ -50,8 +51,13 @@ directionExternal   = Direction("external")  # towards the external of a device:
 
 
 class Hop(object):
+    """A hop in a Path. A hop points to the previous hop in the path, so that all paths with 
+    the same beginning share the same hops. A hop should not be modified after it is extended 
+    (the stack is copy-on-write: see BaseAlgorithm.createHop())."""
     cp = None               # The connection point
     prevconnection  = None  # pointer to the previous connection (between this and the previous item in the path)
+    prevhop         = None  # The previous Hop in the path, or None for the first Hop
+    length          = 1     # The number of hops in the path so far, including this last Hop
     stack           = None  # The adaptation stack so far
     path            = None  # The Path so far, including this last Hop
     metric          = 0.0   # The total metric so far
@@ -60,12 +66,13 @@ class Hop(object):
         assert(isinstance(connection, Connection))
         assert(isinstance(stack, Stack))
         assert(isinstance(prevpath, Path))
-        path = Path(prevpath + [self])
         self.metric = prevpath.getMetric() + connection.getMetric()
+        self.prevhop        = prevpath.getLastHop()
+        self.length         = len(prevpath) + 1
         self.cp             = cp
         self.prevconnection = connection
         self.stack          = stack
-        self.path           = path
+        self.path           = Path(self)
     # def getConnectedHops(self):
     #     pass
     # def getAdaptationStack(self):
@@ -74,6 +81,8 @@ class Hop(object):
     #     pass
     def getPreviousConnection(self):
         return self.prevconnection
+    def getPreviousHop(self):
+        return self.prevhop
     def getConnectionPoint(self):
         return self.cp
     def getStack(self):
@@ -92,8 +101,16 @@ class Hop(object):
         return "<Hop %s>" % self.cp.getURIdentifier()
 
 
-class Path(UserList.UserList):
-    """A Path is simply a list of hops."""
+class Path(object):
+    """A Path is a sequence of hops. Only the last hop is stored: each hop points to its 
+    previous hop, so extending or copying a path is O(1), and paths with the same beginning 
+    share their hops. The path behaves like a (read-only) list of hops; the list is only 
+    created on demand."""
+    lasthop         = None  # The last Hop of the path, or None for an empty path
+    hops            = None  # Cached list of hops, created when the path is indexed from the start
+    def __init__(self, lasthop=None):
+        assert(isinstance(lasthop, (types.NoneType, Hop)))
+        self.lasthop = lasthop
     def getStack(self):
         lasthop = self.getLastHop()
         if lasthop:
@@ -107,40 +124,48 @@ class Path(UserList.UserList):
         else:
             return 0.0
     def getLastHop(self):
-        try:
-            return self.data[-1]
-        except IndexError:
-            return None
+        return self.lasthop
+    def getHops(self):
+        """Return a new list of all hops, from the first to the last hop."""
+        hops = []
+        hop = self.lasthop
+        while hop != None:
+            hops.append(hop)
+            hop = hop.prevhop
+        hops.reverse()
+        return hops
     def copy(self):
-        """Make a deep copy of the Path, in particular from the LayerProperties in the stack of each Hop.
-        This is done so we can modify the properties in the copy, without affecting the parent.
-        As a special constraint: if two layerproperties have the same pointer, make sure the 
-        pointer remains the same in the copy. The same applies for the stack pointer."""
-        stackptrs = {} # old id -> new object
-        lpropptrs = {} # old id -> new object
-        newpath = Path()
-        for hop in self:
-            if id(hop.stack) in stackptrs:
-                newstack = stackptrs[id(hop.stack)]
-            else:
-                newstack = self.stackcopy(hop.stack, lpropptrs)
-                stackptrs[id(hop.stack)] = newstack
-            newhop = Hop(hop.cp, hop.prevconnection, newstack, newpath)
-            newpath.append(newhop)
-        return newpath
-    def stackcopy(self, stack, lpropptrs):
-        newstack = Stack()
-        for lprop in stack:
-            if id(lprop) in lpropptrs:
-                newlprop = lpropptrs[id(lprop)]
-            else:
-                newlprop = lprop.copy()
-                lpropptrs[id(lprop)] = newlprop
-            newstack.append(newlprop)
-        return newstack
-    # TODO: override append to verify that all objects are isinstance Hop
+        """Return a copy of the Path. Since hops are never modified once the path is extended, 
+        and each hop has its own stack, the copy shares all hops with the original."""
+        return Path(self.lasthop)
+    def __len__(self):
+        if self.lasthop == None:
+            return 0
+        return self.lasthop.length
+    def __getitem__(self, index):
+        if isinstance(index, (int, long)) and (index < 0) and (self.hops == None):
+            # walk back from the last hop
+            hop = self.lasthop
+            for i in range(-index-1):
+                if hop == None:
+                    break
+                hop = hop.prevhop
+            if hop == None:
+                raise IndexError("path index out of range")
+            return hop
+        if self.hops == None:
+            self.hops = self.getHops()
+        return self.hops[index]
+    def __iter__(self):
+        return iter(self.getHops())
+    def __eq__(self, other):
+        return isinstance(other, Path) and (self.lasthop is other.lasthop)
+    def __ne__(self, other):
+        return not self.__eq__(other)
+    def __hash__(self):
+        return id(self.lasthop)
     def prettyprint(self):
-        for hop in self.data:
+        for hop in self:
             connection  = hop.getPreviousConnection()
             cp          = hop.getConnectionPoint()
             string  = "%40s --> " % connection.getDescription()
@@ -164,7 +189,7 @@ class Path(UserList.UserList):
             print string
     def shortstr(self):
         data = []
-        for elt in self.data:
+        for elt in self:
             data.append(elt.getName())
         stack = []
         for elt in self.getStack():
@@ -172,7 +197,7 @@ class Path(UserList.UserList):
         return "<Path %s metric=%0.2f stack=%s>" % (data, self.getMetric(), stack)
     def __str__(self):
         path = []
-        for elt in self.data:
+        for elt in self:
             path.append(elt.getConnectionPoint().getName())
         stack = []
         for elt in self.getStack():
@@ -256,6 +281,10 @@ class LayerProperty(pynt.elements.MultiLabelCPMixIn, pynt.elements.MultiProperty
         """Based on the connection point, set the values."""
         self.setMultiLabelValuesFromCP(cp)
         self.setMultiPropertyValuesFromCP(cp)
+    def labelsChanged(self):
+        """The labels of a layer property describe a path, not the topology, so the topology 
+        version is not changed."""
+        pass
     def getLayer(self):
         return self.layer
     def getInterfaceCount(self):
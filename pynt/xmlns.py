@@ -10,9 +10,9 @@ using the functions GetRDFObjcet, GetCreateRDFObject, CreateObject and GetCreate
 # built-in modules
 import types
 import re
+import bisect
 import threading    # for lock object for thread safety
 import logging
-import time
 # import sys          # for sys.referencecount()
 # import distutils.version
 # local modules
@@ -37,11 +37,50 @@ class DuplicateNamespaceException(Exception):
 
 
 # global lock object for this module, shared among all threads.
-# object creation
+# protects the namespaces, and the global repository of objects (rdfobjects and its views)
 threadlock = threading.Lock()
 logger = logging.getLogger("pynt.xmlns")
 logger.debug("Created global lock object %s" % threadlock)
 
+# object creation is protected by one of a fixed number of locks, selected by the hash of the
+# URI, so threads creating different objects rarely wait for each other.
+stripecount = 64
+stripelocks = [threading.Lock() for i in range(stripecount)]
+pendingobjects = {}     # dict of (namespace, identifier) being created: threading.Event, or None if no thread waits for it
+creationtimeout = 10    # seconds to wait for an other thread to create an object
+
+
+def GetStripe(namespace, identifier):
+    """Return the index in stripelocks of the lock for the given namespace and identifier."""
+    return hash((namespace.uri, identifier)) % stripecount
+
+
+def GetStripeLock(namespace, identifier):
+    """Return the lock protecting the creation of the object with given namespace and identifier."""
+    return stripelocks[GetStripe(namespace, identifier)]
+
+
+def WaitForRDFObject(identifier, namespace):
+    """Wait till an other thread has created the object with given identifier, and return it.
+    Returns None if the other thread failed to create it."""
+    # The event is only made if a thread waits for the object; this is rare.
+    stripelock = GetStripeLock(namespace, identifier)
+    stripelock.acquire()
+    created = None
+    if (namespace, identifier) in pendingobjects:
+        created = pendingobjects[(namespace, identifier)]
+        if created == None:
+            created = threading.Event()
+            pendingobjects[(namespace, identifier)] = created
+    stripelock.release()
+    if created != None:
+        # the event is set as soon as the creating thread is done
+        created.wait(creationtimeout)
+    xmlobject = namespace.elements.get(identifier)
+    if (xmlobject == None) and (identifier in namespace.elements):
+        raise DuplicateNamespaceException("An other thread claims to create object %s in namespace %s, but after %d seconds, it still doesn't exist." % (identifier, namespace.getURI(), creationtimeout))
+    return xmlobject
+
 
 def splitURI(uri):
     """Split the URI of a subject into a namespace and a identifier part"""
@@ -65,16 +104,205 @@ def splitURI(uri):
 
 # singleton design pattern
 
-rdfobjects = {}     # dict, sorted by class, pointing to a list of RDF objects of that class
+class RDFObjectSet(object):
+    """Insertion-ordered set of RDF objects. Adding, removing and membership tests take 
+    constant time, where a list would require a linear scan. Iteration returns the objects 
+    in the order in which they were added."""
+    positions   = None  # dict of RDF object: index in objects
+    objects     = None  # list of RDF objects, with None at the index of removed objects
+    removed     = 0     # number of None entries in objects
+    def __init__(self, objects=()):
+        self.positions = {}
+        self.objects = []
+        self.removed = 0
+        for rdfobject in objects:
+            self.add(rdfobject)
+    
+    def add(self, rdfobject):
+        if rdfobject not in self.positions:
+            self.positions[rdfobject] = len(self.objects)
+            self.objects.append(rdfobject)
+    
+    def discard(self, rdfobject):
+        if rdfobject in self.positions:
+            self.objects[self.positions.pop(rdfobject)] = None
+            self.removed += 1
+            if self.removed > len(self.positions):
+                self.compact()
+    
+    def remove(self, rdfobject):
+        if rdfobject not in self.positions:
+            raise ValueError("%s is not in the set" % rdfobject)
+        self.discard(rdfobject)
+    
+    def compact(self):
+        """Remove the None entries of removed objects from the list."""
+        self.objects = [rdfobject for rdfobject in self.objects if rdfobject != None]
+        for (index, rdfobject) in enumerate(self.objects):
+            self.positions[rdfobject] = index
+        self.removed = 0
+    
+    def __getstate__(self):
+        # only pickle the objects; the positions are rebuilt when unpickling. Use a tuple,
+        # since __setstate__ is not called for an empty (false) state.
+        return (list(self),)
+    def __setstate__(self, state):
+        self.__init__(state[0])
+    
+    def __contains__(self, rdfobject):
+        return rdfobject in self.positions
+    def __len__(self):
+        return len(self.positions)
+    def __iter__(self):
+        for rdfobject in self.objects:
+            if rdfobject != None:
+                yield rdfobject
+    def __str__(self):
+        return "<%s with %d objects>" % (type(self).__name__, len(self.positions))
+
+
+rdfobjects = {}     # dict, sorted by class, pointing to a RDFObjectSet of RDF objects of that class
+
+
+class RDFObjectView(object):
+    """Sorted list of the RDF objects of a class (or, unless exactclass is set, of the class
+    and its subclasses), optionally limited to a namespace. The view is kept sorted by 
+    rdfObjectKey while objects are created and deleted, so GetAllRDFObjects() does not need
+    to collect and sort the objects again."""
+    klass       = None  # RDFObject (sub)class
+    exactclass  = False # if True, objects of a subclass of klass are not included
+    namespace   = None  # XMLNamespace, or None for all namespaces
+    keys        = None  # sorted list of rdfObjectKey of the objects
+    objects     = None  # list of RDF objects, in the same order as keys
+    def __init__(self, klass, exactclass, namespace, objects):
+        self.klass      = klass
+        self.exactclass = exactclass
+        self.namespace  = namespace
+        objects = [rdfobject for rdfobject in objects if self.matches(rdfobject)]
+        objects.sort(key=rdfObjectKey)
+        self.objects    = objects
+        self.keys       = [rdfObjectKey(rdfobject) for rdfobject in objects]
+    
+    def matches(self, rdfobject):
+        if (self.namespace != None) and (rdfobject.namespace != self.namespace):
+            return False
+        if self.exactclass:
+            return type(rdfobject) == self.klass
+        return isinstance(rdfobject, self.klass)
+    
+    def add(self, rdfobject):
+        key = rdfObjectKey(rdfobject)
+        index = bisect.bisect_right(self.keys, key)
+        self.keys.insert(index, key)
+        self.objects.insert(index, rdfobject)
+    
+    def discard(self, rdfobject):
+        key = rdfObjectKey(rdfobject)
+        index = bisect.bisect_left(self.keys, key)
+        while (index < len(self.keys)) and (self.keys[index] == key):
+            if self.objects[index] is rdfobject:
+                del self.keys[index]
+                del self.objects[index]
+                return
+            index += 1
+    
+    def extend(self, rdfobjects):
+        """Add many objects at once, sorting the view only once."""
+        pairs = zip(self.keys, self.objects)
+        pairs.extend([(rdfObjectKey(rdfobject), rdfobject) for rdfobject in rdfobjects])
+        pairs.sort(key=lambda pair: pair[0])
+        self.keys = [key for (key, rdfobject) in pairs]
+        self.objects = [rdfobject for (key, rdfobject) in pairs]
+    
+    def __len__(self):
+        return len(self.objects)
+
+
+rdfviews = {}           # dict of (class, exactclass, namespace): RDFObjectView
+rdfviewsbyclass = {}    # dict of class: list of RDFObjectViews of that class
+classancestors = {}     # dict of class: list of the class and its RDFObject superclasses
+
+
+def GetClassAncestors(klass):
+    """Return the class and its superclasses that are a subclass of RDFObject."""
+    if klass not in classancestors:
+        classancestors[klass] = [ancestor for ancestor in klass.__mro__ if issubclass(ancestor, RDFObject)]
+    return classancestors[klass]
+
+
+def AddToRDFViews(rdfobject):
+    """Add a new RDF object to the views that include it. Call with threadlock acquired."""
+    for ancestor in GetClassAncestors(type(rdfobject)):
+        for view in rdfviewsbyclass.get(ancestor, ()):
+            if view.matches(rdfobject):
+                view.add(rdfobject)
+
+
+def ExtendRDFViews(rdfobjects):
+    """Add many new RDF objects to the views that include them. Call with threadlock acquired."""
+    additions = {}  # dict of view: list of RDF objects
+    for rdfobject in rdfobjects:
+        for ancestor in GetClassAncestors(type(rdfobject)):
+            for view in rdfviewsbyclass.get(ancestor, ()):
+                if view.matches(rdfobject):
+                    additions.setdefault(view, []).append(rdfobject)
+    for (view, objects) in additions.iteritems():
+        view.extend(objects)
+
+
+def RemoveFromRDFViews(rdfobject):
+    """Remove a deleted RDF object from the views. Call with threadlock acquired."""
+    for ancestor in GetClassAncestors(type(rdfobject)):
+        for view in rdfviewsbyclass.get(ancestor, ()):
+            if view.matches(rdfobject):
+                view.discard(rdfobject)
+
+
+def ResetRDFViews(namespace=None):
+    """Forget the views of the given namespace, or all views. They are rebuilt when needed."""
+    global rdfviews
+    global rdfviewsbyclass
+    if namespace == None:
+        rdfviews = {}
+        rdfviewsbyclass = {}
+    else:
+        for (key, view) in rdfviews.items():
+            if view.namespace == namespace:
+                del rdfviews[key]
+                rdfviewsbyclass[view.klass].remove(view)
+
+
+class EmptyDict(dict):
+    """Read-only empty dict. A single instance, emptydict, is shared by all objects as the 
+    value of a dict attribute which is still empty; the object replaces it with a new dict 
+    when the first item is added. This saves a dict per object for attributes which are 
+    empty for most objects."""
+    def readonly(self, *args, **kwargs):
+        raise TypeError("%s is read-only; replace it by a new dict before adding items" % (type(self).__name__))
+    __setitem__ = __delitem__ = setdefault = update = pop = popitem = clear = readonly
+    def __reduce__(self):
+        # unpickle as the shared instance
+        return "emptydict"
+
+emptydict = EmptyDict()
 
 
 class RDFObject(object):
-    """XML/RDF object, identified by a namespace+identifier"""
-    identifier          = ""    # string, MUST be non empty (set in __init__); local to namespace
-    name                = ""    # string, with rdfs:label
-    namespace           = None  # namespace object; MUST be non empty (set in __init__)
-    description         = ""    # string
-    sources             = None  # list of seeAlso URIs
+    """XML/RDF object, identified by a namespace+identifier. 
+    The attributes are stored in __slots__ instead of a per-object dict, since networks may 
+    contain millions of objects. Subclasses without __slots__ and attributes which are not in 
+    any __slots__ use the __dict__, which is only allocated once such an attribute is set."""
+    __slots__ = (
+        'identifier',   # string, MUST be non empty (set in __init__); local to namespace
+        'name',         # string, with rdfs:label
+        'namespace',    # namespace object; MUST be non empty (set in __init__)
+        'description',  # string
+        'sources',      # list of seeAlso URIs (empty tuple if there are none)
+        'rdfProperties', # dict of (namespace, predicate): value (emptydict if there are none)
+        'rdfobject_initfunction_wascalled',
+        '__dict__',
+        '__weakref__',
+    )
     
     class __metaclass__(type):
         def __call__(cls, *args, **kwargs):
@@ -90,49 +318,60 @@ class RDFObject(object):
         if identifier not in namespace.elements:
             logger = logging.getLogger("pynt.xmlns")
             logger.debug("Creating %s object %s in namespace %s" % (klass.__name__, identifier, namespace.getURI()))
-            global threadlock
             # we do the thread-safe part in two stages:
-            # first we do a quick global lock, and create a "lock" for this object only
-            # we then release the global lock, and create the new object using the object-specific lock.
-            # start global lock (only called if identifier did not exist, so not too often)
-            threadlock.acquire()
+            # first we take the lock for this URI, and mark the object as being created.
+            # we then release the lock, and create the new object without holding any lock.
+            # Threads creating objects with a different URI (almost always) use a different lock.
+            stripelock = GetStripeLock(namespace, identifier)
+            stripelock.acquire()
             # check if it still doesn't exist (another thread may have created it in the last few miliseconds)
             if identifier not in namespace.elements:
-                # None means: it's not there yet, but we're creating it. Other threads: stay off and wait till we assign it
+                # None means: it's not there yet, but we're creating it. Other threads: wait for the event
                 namespace.elements[identifier] = None
-                threadlock.release() # end global lock.
-                # create a new object, and call __init__.
-                xmlobject = object.__new__(klass)
-                #klass.__init__(xmlobject, identifier, namespace, *args, **kwargs)
-                xmlobject.__init__(identifier, namespace, *args, **kwargs)
-                if not hasattr(xmlobject, 'rdfobject_initfunction_wascalled'):
-                    raise pynt.ConsistencyException("The __init__ function of %s did not call the parent __init__ function in RDFObject" % (klass.__name__))
-                del xmlobject.rdfobject_initfunction_wascalled
-                global rdfobjects
-                if klass not in rdfobjects:
-                    rdfobjects[klass] = []
-                threadlock.acquire() # second short global lock; probably not needed though
-                if xmlobject not in rdfobjects[klass]:
-                    rdfobjects[klass].append(xmlobject)
-                namespace.elements[identifier] = xmlobject
-                threadlock.release() # end lock
+                pendingobjects[(namespace, identifier)] = None
+                stripelock.release()
+                xmlobject = None
+                try:
+                    # create a new object, and call __init__.
+                    xmlobject = object.__new__(klass)
+                    xmlobject.__init__(identifier, namespace, *args, **kwargs)
+                    if not hasattr(xmlobject, 'rdfobject_initfunction_wascalled'):
+                        raise pynt.ConsistencyException("The __init__ function of %s did not call the parent __init__ function in RDFObject" % (klass.__name__))
+                    del xmlobject.rdfobject_initfunction_wascalled
+                    threadlock.acquire() # short global lock for the global repository
+                    try:
+                        if klass not in rdfobjects:
+                            rdfobjects[klass] = RDFObjectSet()
+                        rdfobjects[klass].add(xmlobject)
+                        AddToRDFViews(xmlobject)
+                    finally:
+                        threadlock.release()
+                finally:
+                    stripelock.acquire()
+                    if (xmlobject != None) and xmlobject.isRegistered():
+                        namespace.elements[identifier] = xmlobject
+                    elif (identifier in namespace.elements) and (namespace.elements[identifier] == None):
+                        # __init__ failed; remove the mark, so the object can be created again
+                        del namespace.elements[identifier]
+                    created = pendingobjects.pop((namespace, identifier))
+                    stripelock.release()
+                    if created != None:
+                        # wake up the threads waiting for this object
+                        created.set()
                 logger.info("Created  %s object %s in namespace %s" % (type(xmlobject).__name__, identifier, namespace.getURI()))
             else:
-                threadlock.release()
+                stripelock.release()
                 logger.debug("Object creation lock released")
-        xmlobject = namespace.elements[identifier]
+        xmlobject = namespace.elements.get(identifier)
         if xmlobject == None:
             # Another thread is in the process of creating the object
             logger = logging.getLogger("pynt.xmlns")
             logger.debug("Wait for other thread to create object %s in namespacce %s" % (identifier, namespace.getURI()))
-            end_time = time.time() + 10 # 10 second time-out
-            while namespace.elements[identifier] == None:
-                if time.time() > end_time:
-                    raise DuplicateNamespaceException("An other thread claims to create object %s in namespace %s, but after 10 seconds, it still doesn't exist." % (identifier, namespace.getURI()))
-                    break
-                time.sleep(0.05)
+            xmlobject = WaitForRDFObject(identifier, namespace)
+            if xmlobject == None:
+                # the other thread failed to create the object; try it ourself.
+                return klass.__new__(klass, identifier, namespace, *args, **kwargs)
             logger.debug("Got newly created object %s in namespace %s" % (identifier, namespace.getURI()))
-            xmlobject = namespace.elements[identifier]
         if klass and not isinstance(xmlobject,klass):
             raise UndefinedNamespaceException("Object %s in namespace %s is a %s, instead of a %s" % (identifier, namespace.getURI(), type(xmlobject).__name__, klass.__name__))
         return xmlobject
@@ -142,10 +381,26 @@ class RDFObject(object):
         assert (isinstance(namespace, XMLNamespace))
         self.identifier = identifier
         self.namespace  = namespace
-        self.sources = []
-        self.rdfProperties = {}
+        self.name = ""
+        self.description = ""
+        self.sources = ()
+        self.rdfProperties = emptydict
         self.rdfobject_initfunction_wascalled = True
     
+    def __getstate__(self):
+        """Return a dict with the attributes in __slots__ and __dict__, for pickle."""
+        state = {}
+        for klass in type(self).__mro__:
+            for attribute in klass.__dict__.get('__slots__', ()):
+                if (attribute not in ('__dict__', '__weakref__')) and hasattr(self, attribute):
+                    state[attribute] = getattr(self, attribute)
+        if hasattr(self, '__dict__'):
+            state.update(self.__dict__)
+        return state
+    def __setstate__(self, state):
+        for (attribute, value) in state.iteritems():
+            setattr(self, attribute, value)
+    
     def __str__(self): # normal program output (no "" around strings)
         return '<%s %s>' % (type(self).__name__, self.identifier)
     def __repr__(self): # debugging output ("" around string to distinguish "2" from 2)
@@ -162,10 +417,20 @@ class RDFObject(object):
     #     else:
     #         return comp
     
+    def isRegistered(self):
+        """Return True if the object is in the global repository (it is fully created, and not deleted)"""
+        return (type(self) in rdfobjects) and (self in rdfobjects[type(self)])
+    
     def setIdentifier(self,identifier):
         identifier = UTF8(identifier)
         if identifier != self.identifier:
             assert (self.namespace != None)
+            registered = self.isRegistered()
+            if registered:
+                # the identifier is part of the sort key of the views
+                threadlock.acquire()
+                RemoveFromRDFViews(self)
+                threadlock.release()
             if self.identifier:
                 del self.namespace.elements[self.identifier]
             self.identifier = identifier
@@ -173,6 +438,10 @@ class RDFObject(object):
                 raise DuplicateNamespaceException("An other %s object with identifier %s already exists in namespace %s" % 
                         (type(self.namespace.elements[identifier]).__name__, identifier, self.namespace.getURI()))
             self.namespace.elements[identifier] = self
+            if registered:
+                threadlock.acquire()
+                AddToRDFViews(self)
+                threadlock.release()
     
     def setNamespace(self,namespace):
         if namespace == self.namespace:
@@ -180,6 +449,12 @@ class RDFObject(object):
         if not isinstance(namespace, XMLNamespace):
             raise TypeError("Namespace must be of type pynt.xmlns.XMLNamespace")
         else:
+            registered = self.isRegistered()
+            if registered:
+                # the namespace is part of the sort key of the views
+                threadlock.acquire()
+                RemoveFromRDFViews(self)
+                threadlock.release()
             if self.identifier:
                 if self.namespace:
                     del self.namespace.elements[self.identifier]
@@ -188,6 +463,10 @@ class RDFObject(object):
                         (type(namespace.elements[self.identifier]).__name__, self.identifier, namespace.uri))
                 namespace.elements[self.identifier] = self
             self.namespace = namespace
+            if registered:
+                threadlock.acquire()
+                AddToRDFViews(self)
+                threadlock.release()
     
     def setName(self,name):                         self.name = UTF8(name)
     def setDescription(self,description):           self.description = UTF8(description)
@@ -205,11 +484,15 @@ class RDFObject(object):
     def attachSource(self, url):
         """Add a related (seeAlso) source to a subject. The given URL will NOT be fetched automatically."""
         if url not in self.sources:
+            if not self.sources:
+                self.sources = []
             self.sources.append(url)
     def getSources(self):
         return self.sources
     
     def addRDFProperty(self, ns, predicate, value):
+        if self.rdfProperties is emptydict:
+            self.rdfProperties = {}
         self.rdfProperties[(ns,predicate)] = value
     def getRDFProperty(self,ns,predicate):
         return self.rdfProperties[(ns,predicate)]
@@ -284,8 +567,13 @@ def GetCreateRDFObject(identifier, namespace=None, klass=None, mayCreate=True, m
             initfunction(xmlobject, **arguments)
     elif not mayExist:
         raise DuplicateNamespaceException("An other %s object with identifier %s already exists in namespace %s" % (klass.__name__, identifier, namespace.getURI()))
-    xmlobject = namespace.elements[identifier]
-    assert xmlobject != None    # None is an intermediate state in RDFObject.__new__(), but should be resolved before it returns
+    xmlobject = namespace.elements.get(identifier)
+    if xmlobject == None:
+        # None is an intermediate state in RDFObject.__new__(): an other thread is creating the object
+        xmlobject = WaitForRDFObject(identifier, namespace)
+        if xmlobject == None:
+            # the other thread failed; try again
+            return GetCreateRDFObject(identifier, namespace, klass, mayCreate, mayExist, verifyAttributes, initfunction, **arguments)
     if klass and not isinstance(xmlobject,klass):
         raise UndefinedNamespaceException("Object %s in namespace %s is a %s, instead of a %s" % (identifier, namespace.getURI(), type(xmlobject).__name__, klass.__name__))
     if verifyAttributes:
@@ -293,6 +581,100 @@ def GetCreateRDFObject(identifier, namespace=None, klass=None, mayCreate=True, m
     return xmlobject
 
 
+def GetCreateRDFObjects(specifications, namespace=None):
+    """Returns a list of objects in the given namespace, one for each (identifier, klass, arguments)
+    tuple in specifications. Objects that do not exist yet are created with __init__(identifier, 
+    namespace, **arguments); arguments may be None. An optional fourth item in the tuple is an 
+    initfunction, which is called as initfunction(newobject, **arguments) for new objects only.
+    This is the same as calling GetCreateRDFObject() for each tuple, but faster for many objects:
+    the locks are acquired once for all objects, the new objects are added to the global 
+    repository at once, and only one line is logged.
+    This function is thread-safe."""
+    if namespace == None:
+        namespace = GetDefaultNamespace()
+    assert(isinstance(namespace, XMLNamespace))
+    requests = []   # list of (identifier, klass, arguments, initfunction)
+    for specification in specifications:
+        (identifier, klass, arguments) = specification[:3]
+        initfunction = None
+        if len(specification) > 3:
+            initfunction = specification[3]
+        if klass == None:
+            klass = RDFObject
+        if not issubclass(klass, RDFObject):
+            raise TypeError("GetCreateRDFObjects: klass %s is not an %s subclass." % (klass, RDFObject))
+        requests.append((UTF8(identifier), klass, arguments or {}, initfunction))
+    # Mark the objects that do not exist yet as being created (see RDFObject.__new__())
+    stripes = [GetStripe(namespace, request[0]) for request in requests if request[0] not in namespace.elements]
+    stripes = sorted(set(stripes))   # always acquire locks in the same order, to prevent deadlocks
+    for stripe in stripes:
+        stripelocks[stripe].acquire()
+    newrequests = []
+    for request in requests:
+        identifier = request[0]
+        if identifier not in namespace.elements:
+            namespace.elements[identifier] = None
+            pendingobjects[(namespace, identifier)] = None
+            newrequests.append(request)
+    for stripe in stripes:
+        stripelocks[stripe].release()
+    created = []    # list of new objects, in the same order as newrequests
+    registered = False
+    try:
+        for (identifier, klass, arguments, initfunction) in newrequests:
+            xmlobject = object.__new__(klass)
+            xmlobject.__init__(identifier, namespace, **arguments)
+            if not hasattr(xmlobject, 'rdfobject_initfunction_wascalled'):
+                raise pynt.ConsistencyException("The __init__ function of %s did not call the parent __init__ function in RDFObject" % (klass.__name__))
+            del xmlobject.rdfobject_initfunction_wascalled
+            created.append(xmlobject)
+        threadlock.acquire()    # one short global lock for the global repository
+        try:
+            for xmlobject in created:
+                klass = type(xmlobject)
+                if klass not in rdfobjects:
+                    rdfobjects[klass] = RDFObjectSet()
+                rdfobjects[klass].add(xmlobject)
+            ExtendRDFViews(created)
+            registered = True
+        finally:
+            threadlock.release()
+    finally:
+        # Publish the new objects, or remove the marks if creation failed
+        for stripe in stripes:
+            stripelocks[stripe].acquire()
+        events = []
+        for (index, request) in enumerate(newrequests):
+            identifier = request[0]
+            if registered:
+                namespace.elements[identifier] = created[index]
+            elif (identifier in namespace.elements) and (namespace.elements[identifier] == None):
+                del namespace.elements[identifier]
+            event = pendingobjects.pop((namespace, identifier), None)
+            if event != None:
+                events.append(event)
+        for stripe in stripes:
+            stripelocks[stripe].release()
+        for event in events:
+            # wake up the threads waiting for these objects
+            event.set()
+    for (index, (identifier, klass, arguments, initfunction)) in enumerate(newrequests):
+        if initfunction != None:
+            initfunction(created[index], **arguments)
+    logger = logging.getLogger("pynt.xmlns")
+    logger.info("Created  %d objects in namespace %s (%d requested)" % (len(created), namespace.getURI(), len(requests)))
+    xmlobjects = []
+    for (identifier, klass, arguments, initfunction) in requests:
+        xmlobject = namespace.elements.get(identifier)
+        if xmlobject == None:
+            # an other thread is creating the object, or failed to do so
+            xmlobject = GetCreateRDFObject(identifier, namespace, klass, initfunction=initfunction, **arguments)
+        if not isinstance(xmlobject, klass):
+            raise UndefinedNamespaceException("Object %s in namespace %s is a %s, instead of a %s" % (identifier, namespace.getURI(), type(xmlobject).__name__, klass.__name__))
+        xmlobjects.append(xmlobject)
+    return xmlobjects
+
+
 def GetRDFObject(identifier, namespace=None, klass=None, mayCreate=False, mayExist=True, verifyAttributes=False, initfunction=None, **arguments):
     """Returns the object with given identifier in the given namespace. 
     Verifies that it is of the correct class. Raises an UndefinedNamespaceException
@@ -315,9 +697,11 @@ def DeleteRDFObject(rdfobject):
     pass
     global rdfobjects
     klass = type(rdfobject)
-    if klass in rdfobjects:
-        if rdfobject in rdfobjects[klass]:
-            rdfobjects[klass].remove(rdfobject)
+    threadlock.acquire()
+    if (klass in rdfobjects) and (rdfobject in rdfobjects[klass]):
+        rdfobjects[klass].discard(rdfobject)
+        RemoveFromRDFViews(rdfobject)
+    threadlock.release()
     namespace = rdfobject.namespace
     identifier = rdfobject.identifier
     if namespace and identifier in namespace.elements:
@@ -333,6 +717,7 @@ def DeleteAllRDFObjects():
     # method 2:
     global rdfobjects
     rdfobjects = {}
+    ResetRDFViews()
     for namespace in GetNamespaces():
         namespace.elements = {}
 
@@ -340,20 +725,32 @@ def DeleteAllRDFObjects():
 def GetAllRDFObjects(klass=RDFObject, exactclass=False, namespace=None):
     """Return a list of all RDF objects of the given class. 
     If exactclass is False (the default), including objects of a subclass
-    If a namespace is provided, then we search only in that namespace."""
+    If a namespace is provided, then we search only in that namespace.
+    The result is a copy of a RDFObjectView, which is created at the first call with these
+    arguments, and kept sorted afterwards."""
     if not namespace:
-        global rdfobjects
-        objectlist = []
-        for rdfklass in GetRDFClasses():
-            if (klass == rdfklass) or ((not exactclass) and issubclass(rdfklass, klass)):
-                objectlist.extend(rdfobjects[rdfklass])
-    else:
-        objectlist = []
-        for obj in namespace.getElements():
-            if (obj.__class__ == klass) or ((not exactclass) and issubclass(obj.__class__, klass)):
-                objectlist.append(obj)
-    objectlist.sort(key=rdfObjectKey)
-    return objectlist
+        namespace = None
+    key = (klass, bool(exactclass), namespace)
+    view = rdfviews.get(key)
+    if view == None:
+        threadlock.acquire()
+        try:
+            view = rdfviews.get(key)
+            if view == None:
+                if namespace == None:
+                    candidates = []
+                    for rdfklass in GetRDFClasses():
+                        if klass in GetClassAncestors(rdfklass):
+                            candidates.extend(rdfobjects[rdfklass])
+                else:
+                    # objects that are still being created (None) are not yet in the global repository
+                    candidates = [obj for obj in namespace.getElements().values() if (obj != None) and obj.isRegistered()]
+                view = RDFObjectView(klass, bool(exactclass), namespace, candidates)
+                rdfviews[key] = view
+                rdfviewsbyclass.setdefault(klass, []).append(view)
+        finally:
+            threadlock.release()
+    return view.objects[:]
 
 
 
@@ -561,6 +958,7 @@ def DeleteNamespace(namespace):
     for rdfobject in namespace.elements.values():
         DeleteRDFObject(rdfobject)
     assert(len(namespace.elements) == 0)
+    ResetRDFViews(namespace)
     global xmlnamespaces
     del xmlnamespaces[namespace.uri]
 
@@ -569,6 +967,7 @@ def DeleteAllNamespaces():
     """Delete all global namespace objects, and removes all elements in the namespaces"""
     global rdfobjects
     rdfobjects = {}
+    ResetRDFViews()
     global xmlnamespaces
     xmlnamespaces = {}
 
@@ -0,0 +1,70 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""Benchmark of concurrent RDF object creation in pynt.xmlns: 32 threads each create their own
+interfaces, and all threads ask for the same shared devices at the same time (like parallel
+fetchers which all refer to the same neighbour). Creating a shared device takes 1 ms, so most
+threads have to wait for the thread that creates it; the benchmark prints how long they wait."""
+
+import sys
+import time
+import threading
+import logging
+sys.path.append('../')
+import pynt.xmlns
+import pynt.elements
+
+threadcount = 32
+privatecount = 2000     # interfaces per thread
+sharedcount = 50        # devices created by all threads
+
+
+class SlowDevice(pynt.elements.Device):
+    """Device with an __init__ that takes some time, e.g. because it does a lookup."""
+    def __init__(self, identifier, namespace):
+        pynt.elements.Device.__init__(self, identifier, namespace)
+        time.sleep(0.001)
+
+
+def Worker(number, namespace, barrier, waits):
+    barrier.wait()
+    for i in xrange(privatecount):
+        pynt.xmlns.GetCreateRDFObject("t%d-intf%d" % (number, i), namespace, klass=pynt.elements.Interface)
+    for i in xrange(sharedcount):
+        start = time.time()
+        pynt.xmlns.GetCreateRDFObject("shared%d" % i, namespace, klass=SlowDevice)
+        waits.append(time.time() - start)
+
+
+class Barrier(object):
+    """Let all threads start at the same time."""
+    def __init__(self, count):
+        self.count = count
+        self.condition = threading.Condition()
+    def wait(self):
+        self.condition.acquire()
+        self.count -= 1
+        if self.count <= 0:
+            self.condition.notifyAll()
+        while self.count > 0:
+            self.condition.wait()
+        self.condition.release()
+
+
+if __name__ == '__main__':
+    logging.getLogger("pynt").setLevel(logging.WARNING)
+    namespace = pynt.xmlns.GetCreateNamespace("http://example.net/concurrent#")
+    barrier = Barrier(threadcount)
+    waits = []
+    threads = [threading.Thread(target=Worker, args=(number, namespace, barrier, waits)) for number in range(threadcount)]
+    start = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duration = time.time() - start
+    count = threadcount * privatecount + sharedcount
+    assert len(pynt.xmlns.GetAllRDFObjects(namespace=namespace)) == count
+    waits.sort()
+    print "%d threads created %d objects in %.2f s (%.0f objects/s)" % (threadcount, count, duration, count / duration)
+    print "shared object lookups: median %.1f ms, 99th percentile %.1f ms, maximum %.1f ms" % \
+            (1e3 * waits[len(waits) // 2], 1e3 * waits[int(0.99 * len(waits))], 1e3 * waits[-1])
@@ -0,0 +1,73 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""Benchmark of the memory use of connection points: create physical Ethernet interfaces
+with 99 tagged VLAN channels each (the bulk of the interfaces in a large network), and print
+the growth of the resident memory per interface. Also prints the size of a single object,
+including its __dict__ and empty containers, for a few connection point classes.
+The resident memory is read from /proc/self/statm, so this only works on Linux."""
+
+import sys
+import os
+import gc
+import logging
+sys.path.append('../')
+import pynt.xmlns
+import pynt.elements
+import pynt.technologies.ethernet
+
+
+def GetResidentMemory():
+    """Return the resident memory of this process in bytes."""
+    pages = int(open("/proc/self/statm").read().split()[1])
+    return pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def GetObjectSize(rdfobject):
+    """Return the size of an object in bytes, including its __dict__ and the (empty) lists
+    and dicts it refers to. Shared objects, like the layer and the namespace, are excluded."""
+    size = sys.getsizeof(rdfobject)
+    for referent in gc.get_referents(rdfobject):
+        if type(referent) == dict:
+            size += sys.getsizeof(referent)
+            for value in referent.values():
+                if type(value) in (list, dict):
+                    size += sys.getsizeof(value)
+        elif type(referent) in (list, dict):
+            size += sys.getsizeof(referent)
+    return size
+
+
+def CreateChannels(count, channels=99):
+    """Create count interfaces in a new namespace: physical interfaces, each with the given
+    number of tagged VLAN channels. Return the number of created interfaces."""
+    namespace = pynt.xmlns.GetCreateNamespace("http://example.net/memory%d#" % count)
+    tagged = pynt.technologies.ethernet.GetCreateWellKnownAdaptationFunction("Tagged-Ethernet")
+    created = 0
+    while created < count:
+        identifier = "port%d" % created
+        port = pynt.technologies.ethernet.EthernetInterface(identifier, namespace)
+        created += 1
+        for vlanid in xrange(1, channels + 1):
+            channel = pynt.technologies.ethernet.EthernetInterface("%s.%d" % (identifier, vlanid), namespace)
+            port.addClientInterface(channel, tagged)
+            channel.setLabel(vlanid)
+            created += 1
+    return created
+
+
+if __name__ == '__main__':
+    logging.getLogger("pynt").setLevel(logging.WARNING)
+    namespace = pynt.xmlns.GetCreateNamespace("http://example.net/memory#")
+    print "%-24s %14s" % ("class", "object (bytes)")
+    for klass in (pynt.elements.Interface, pynt.elements.ConfigurableInterface,
+                    pynt.elements.PotentialMuxInterface, pynt.technologies.ethernet.EthernetInterface):
+        print "%-24s %14d" % (klass.__name__, GetObjectSize(klass("sample" + klass.__name__, namespace)))
+    print
+    print "%10s %12s %16s" % ("interfaces", "memory (MB)", "memory (B/intf)")
+    for count in (25000, 50000, 100000, 200000):
+        gc.collect()
+        before = GetResidentMemory()
+        created = CreateChannels(count)
+        gc.collect()
+        used = GetResidentMemory() - before
+        print "%10d %12.1f %16.0f" % (created, used / 1048576.0, float(used) / created)
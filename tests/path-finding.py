@@ -0,0 +1,179 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""Regression tests of the path finding algorithms, on small Ethernet networks which are
+created in memory (so no schema files are needed)."""
+
+import unittest
+import sys
+import logging
+import StringIO
+sys.path.append('../')
+import pynt.xmlns
+import pynt.elements
+import pynt.algorithm
+import pynt.algorithm.output
+import pynt.algorithm.resultcache
+import pynt.algorithm.dijkstra
+import pynt.technologies.ethernet
+
+
+def CreateRing(name, devicecount, portcount=3, connected=False):
+    """Create devicecount devices in a ring, each with a switch matrix and portcount Ethernet
+    interfaces. Port 1 of each device is linked to port 2 of the next device (or connected,
+    as Dijkstra expects, if connected is True); port 0 is free, to be used as an endpoint.
+    Returns a dict of (device number, port number): interface."""
+    namespace = pynt.xmlns.GetCreateNamespace("http://example.net/%s#" % name)
+    layer = pynt.technologies.ethernet.GetLayer('ethernet')
+    interfaces = {}
+    for d in range(devicecount):
+        device = pynt.elements.GetCreateDevice("%s%d" % (name, d), namespace)
+        switchmatrix = pynt.elements.GetCreateSwitchMatrix("%s%d-switch" % (name, d), namespace)
+        switchmatrix.setLayer(layer)
+        switchmatrix.setDevice(device)
+        switchmatrix.setSwitchingCapability(True)
+        for p in range(portcount):
+            interface = pynt.elements.GetCreateInterface("%s%d-port%d" % (name, d, p), namespace)
+            interface.setLayer(layer)
+            interface.setDevice(device)
+            switchmatrix.addInterface(interface)
+            interfaces[(d, p)] = interface
+    for d in range(devicecount):
+        (interface1, interface2) = (interfaces[(d, 1)], interfaces[((d + 1) % devicecount, 2)])
+        if connected:
+            interface1.addConnectedInterface(interface2)
+            interface2.addConnectedInterface(interface1)
+        else:
+            interface1.addLinkedInterface(interface2)
+            interface2.addLinkedInterface(interface1)
+    return interfaces
+
+
+def CreateAlgorithm(klass, source, destination):
+    """Return an algorithm instance for the given endpoints, which does not print its progress."""
+    algorithm = klass()
+    algorithm.setPrinter(pynt.algorithm.output.ProgressPrinter())
+    algorithm.setEndpoints(source, destination)
+    return algorithm
+
+
+class TestFallbackSearch(unittest.TestCase):
+    def test_SolutionInFrontier(self):
+        """The fallback search must return a solution which is already in the frontier
+        when the budget runs out."""
+        interfaces = CreateRing("fallback", 4)
+        source = interfaces[(0, 0)]
+        destination = interfaces[(2, 0)]
+        exact = CreateAlgorithm(pynt.algorithm.PFAvailable, source, destination).findShortestPath()
+        self.assertEqual(len(exact), 1)
+        for fallback in ("greedy", "beam"):
+            for expansionlimit in range(1, 20):
+                algorithm = CreateAlgorithm(pynt.algorithm.PFAvailable, source, destination)
+                algorithm.setBudget(expansionlimit=expansionlimit, fallback=fallback)
+                self.assertTrue(algorithm.findShortestPath(),
+                        "%s fallback after %d expansions found no path" % (fallback, expansionlimit))
+
+
+class TestResultCache(unittest.TestCase):
+    def test_SwitchingCapability(self):
+        """A change of a switch matrix on the cached path must invalidate the cached result."""
+        interfaces = CreateRing("cache", 4)
+        source = interfaces[(0, 0)]
+        destination = interfaces[(1, 0)]
+        cache = pynt.algorithm.resultcache.ResultCache()
+        try:
+            algorithm = CreateAlgorithm(pynt.algorithm.PFAvailable, source, destination)
+            algorithm.setResultCache(cache)
+            self.assertEqual(len(algorithm.findShortestPath()), 1)
+            algorithm = CreateAlgorithm(pynt.algorithm.PFAvailable, source, destination)
+            algorithm.setResultCache(cache)
+            algorithm.findShortestPath()
+            self.assertEqual(cache.hits, 1)
+            interfaces[(1, 0)].getSwitchMatrix().setSwitchingCapability(False)
+            algorithm = CreateAlgorithm(pynt.algorithm.PFAvailable, source, destination)
+            algorithm.setResultCache(cache)
+            self.assertEqual(algorithm.findShortestPath(), [])
+            self.assertEqual(cache.hits, 1)
+            self.assertEqual(cache.misses, 2)
+        finally:
+            cache.close()
+
+
+class TestContractionHierarchy(unittest.TestCase):
+    def test_MetricChange(self):
+        """After a metric change, a search with the contraction hierarchy must find the same
+        shortest path as a search without it."""
+        interfaces = CreateRing("hierarchy", 6, connected=True)
+        source = interfaces[(0, 0)]
+        destination = interfaces[(3, 0)]
+        algorithm = CreateAlgorithm(pynt.algorithm.dijkstra.Dijkstra, source, destination)
+        hierarchy = algorithm.createHierarchy()
+        path = algorithm.searchPath(source, destination)
+        self.assertTrue(path)
+        for cp in path[1:-1]:
+            if isinstance(cp, pynt.elements.Interface):
+                cp.setMetric(100)
+        self.assertFalse(hierarchy.isCurrent())
+        path = algorithm.searchPath(source, destination)
+        self.assertTrue(hierarchy.isCurrent())
+        algorithm.setHierarchy(None)
+        expected = algorithm.searchPath(source, destination)
+        self.assertEqual(algorithm.getPathMetric(path), algorithm.getPathMetric(expected))
+        self.assertTrue(algorithm.getPathMetric(path) < 100)
+
+
+class TestDisjointPaths(unittest.TestCase):
+    def test_SameDevice(self):
+        """For endpoints on the same device, the path through the switch matrix must be
+        returned once, not twice."""
+        interfaces = CreateRing("samedevice", 4, portcount=4, connected=True)
+        source = interfaces[(0, 0)]
+        destination = interfaces[(0, 3)]
+        for disjoint in pynt.algorithm.dijkstra.disjointmodes:
+            algorithm = CreateAlgorithm(pynt.algorithm.dijkstra.Dijkstra, source, destination)
+            paths = algorithm.findDisjointPaths(disjoint=disjoint)
+            self.assertEqual(paths, [[source, source.getSwitchMatrix(), destination]], disjoint)
+
+    def test_OtherDevice(self):
+        """Endpoints on opposite devices of the ring have a disjoint pair of paths."""
+        interfaces = CreateRing("otherdevice", 4, connected=True)
+        for disjoint in pynt.algorithm.dijkstra.disjointmodes:
+            algorithm = CreateAlgorithm(pynt.algorithm.dijkstra.Dijkstra, interfaces[(0, 0)], interfaces[(2, 0)])
+            paths = algorithm.findDisjointPaths(disjoint=disjoint)
+            self.assertEqual(len(paths), 2, disjoint)
+            self.assertNotEqual(paths[0], paths[1], disjoint)
+
+
+class TestPathWalk(unittest.TestCase):
+    def runPathWalk(self, beamsize=None):
+        """Flood a ring of broadcast switch matrices up to metric 6, and return the algorithm."""
+        interfaces = CreateRing("pathwalk%s" % beamsize, 4)
+        for d in range(4):
+            interfaces[(d, 0)].getSwitchMatrix().setBroadcast(True)
+        algorithm = CreateAlgorithm(pynt.algorithm.PathWalk, interfaces[(0, 0)], interfaces[(2, 0)])
+        algorithm.setMetricLimit(6)
+        if beamsize:
+            algorithm.setBeam(beamsize=beamsize)
+        stdout = sys.stdout
+        sys.stdout = StringIO.StringIO()  # PathWalk prints its progress
+        try:
+            algorithm.findShortestPath()
+        finally:
+            sys.stdout = stdout
+        return algorithm
+
+    def test_MetricLimit(self):
+        """The flooding search stops at the metric limit, with both paths around the ring."""
+        algorithm = self.runPathWalk()
+        self.assertEqual(algorithm.getStatus(), "complete")
+        self.assertEqual([path.getMetric() for path in algorithm.solution], [5.0, 5.0])
+
+    def test_BeamStatus(self):
+        """If leaves were spilled, the status is "beam"."""
+        algorithm = self.runPathWalk(beamsize=1)
+        self.assertEqual(algorithm.getStatus(), "beam")
+        self.assertEqual(len(algorithm.solution), 2)
+
+
+if __name__ == '__main__':
+    logging.getLogger("pynt").setLevel(logging.ERROR)
+    unittest.main()
@@ -0,0 +1,43 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""Benchmark of the global RDF object registry in pynt.xmlns: create up to 100k interfaces,
+and print the time per interface for increasing numbers of interfaces. With constant time
+registry operations, the time per interface stays (roughly) the same. Part of the remaining
+increase is caused by the cyclic garbage collector, which inspects all objects in its oldest
+generation; run with gc.disable() to exclude it."""
+
+import sys
+import time
+import logging
+sys.path.append('../')
+import pynt.xmlns
+import pynt.elements
+
+
+def CreateInterfaces(count):
+    """Create count interfaces in a new namespace, and return the time it took in seconds."""
+    namespace = pynt.xmlns.GetCreateNamespace("http://example.net/benchmark%d#" % count)
+    start = time.time()
+    for i in xrange(count):
+        pynt.elements.GetCreateInterface("intf%d" % i, namespace)
+    return time.time() - start
+
+
+def DeleteInterfaces(count):
+    """Delete all interfaces created by CreateInterfaces(count), and return the time it took."""
+    namespace = pynt.xmlns.GetNamespaceByURI("http://example.net/benchmark%d#" % count)
+    start = time.time()
+    for rdfobject in namespace.elements.values():
+        pynt.xmlns.DeleteRDFObject(rdfobject)
+    return time.time() - start
+
+
+if __name__ == '__main__':
+    logging.getLogger("pynt").setLevel(logging.WARNING)
+    print "%10s %12s %16s %16s" % ("interfaces", "create (s)", "create (us/intf)", "delete (us/intf)")
+    for count in (12500, 25000, 50000, 100000):
+        created = CreateInterfaces(count)
+        objectcount = len(pynt.xmlns.GetAllRDFObjects(pynt.elements.Interface))
+        assert objectcount == count, "Expected %d interfaces, found %d" % (count, objectcount)
+        deleted = DeleteInterfaces(count)
+        print "%10d %12.2f %16.1f %16.1f" % (count, created, 1e6 * created / count, 1e6 * deleted / count)